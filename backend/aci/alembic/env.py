@@ -1,5 +1,6 @@
 import os
 from logging.config import fileConfig
+from typing import Any
 
 from alembic import context
 from dotenv import load_dotenv
@@ -24,6 +25,15 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# The quantized embedding HNSW indexes (see versions/..._add_quantized_embedding_indexes.py) are
+# expression indexes over pgvector casts that are managed by hand in the migration and not declared
+# on the models, so they must be skipped here or autogenerate would emit drop_index for them.
+UNMANAGED_INDEXES = {
+    f"ix_{table}_embedding_{mode}"
+    for table in ("apps", "functions")
+    for mode in ("halfvec", "binary")
+}
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -50,6 +60,12 @@ def _get_db_url() -> str:
     return f"{DB_SCHEME}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 
+def _include_object(
+    object: Any, name: str | None, type_: str, reflected: bool, compare_to: Any
+) -> bool:
+    return not (type_ == "index" and name in UNMANAGED_INDEXES)
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -65,6 +81,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=_get_db_url(),
         target_metadata=target_metadata,
+        include_object=_include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -89,7 +106,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=_include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
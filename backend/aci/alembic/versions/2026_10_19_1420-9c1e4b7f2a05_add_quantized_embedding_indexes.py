@@ -0,0 +1,40 @@
+"""add quantized embedding indexes
+
+Revision ID: 9c1e4b7f2a05
+Revises: 3f6a0d2c8b19
+Create Date: 2026-10-19 14:20:37.261904+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e4b7f2a05'
+down_revision: Union[str, None] = '3f6a0d2c8b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# NOTE: expression indexes for the approximate embedding search modes (see
+# aci/common/db/embedding_search.py), the embeddings themselves stay in full precision for exact
+# re-ranking. halfvec and binary_quantize require pgvector >= 0.7.0.
+TABLES = ['apps', 'functions']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(
+            f'CREATE INDEX ix_{table}_embedding_halfvec ON {table} '
+            'USING hnsw ((embedding::halfvec(1024)) halfvec_cosine_ops)'
+        )
+        op.execute(
+            f'CREATE INDEX ix_{table}_embedding_binary ON {table} '
+            'USING hnsw ((binary_quantize(embedding)::bit(1024)) bit_hamming_ops)'
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'DROP INDEX ix_{table}_embedding_binary')
+        op.execute(f'DROP INDEX ix_{table}_embedding_halfvec')
@@ -3,12 +3,14 @@ import click
 from aci.cli.commands import (
     billing,
     create_agent,
+    create_profiling_token,
     create_project,
     create_random_api_key,
     delete_app,
     fuzzy_test_function_execution,
     get_app,
     rename_app,
+    sync_catalog,
     update_agent,
     upsert_app,
     upsert_functions,
@@ -31,7 +33,9 @@ cli.add_command(get_app.get_app)
 cli.add_command(rename_app.rename_app)
 cli.add_command(delete_app.delete_app)
 cli.add_command(upsert_functions.upsert_functions)
+cli.add_command(sync_catalog.sync_catalog)
 cli.add_command(create_random_api_key.create_random_api_key)
+cli.add_command(create_profiling_token.create_profiling_token)
 cli.add_command(fuzzy_test_function_execution.fuzzy_test_function_execution)
 cli.add_command(billing.populate_subscription_plans)
 
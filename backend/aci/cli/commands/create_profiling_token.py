@@ -0,0 +1,32 @@
+import click
+from rich.console import Console
+
+from aci.common.profiling_token import MAX_TTL_SECONDS
+from aci.common.profiling_token import create_profiling_token as create_token
+
+console = Console()
+
+
+@click.command()
+@click.option(
+    "--signing-key",
+    "signing_key",
+    required=True,
+    envvar="SERVER_PROFILING_SIGNING_KEY",
+    help="profiling signing key of the server, defaults to $SERVER_PROFILING_SIGNING_KEY",
+)
+@click.option(
+    "--ttl-seconds",
+    "ttl_seconds",
+    type=click.IntRange(1, MAX_TTL_SECONDS),
+    default=600,
+    show_default=True,
+    help=f"how long the token is valid, at most {MAX_TTL_SECONDS} seconds",
+)
+def create_profiling_token(signing_key: str, ttl_seconds: int) -> None:
+    """
+    Create a token that enables the profiling of requests, to be sent in the X-ACI-Profile header.
+    The profiles are stored by request ID (the X-Request-ID response header) on the server.
+    """
+    token = create_token(signing_key, ttl_seconds)
+    console.print(f"X-ACI-Profile: {token}", soft_wrap=True)
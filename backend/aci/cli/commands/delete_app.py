@@ -3,7 +3,7 @@ from rich.console import Console
 
 from aci.cli import config
 from aci.common import utils
-from aci.common.db import crud
+from aci.common.db import catalog_version, crud
 
 console = Console()
 
@@ -109,6 +109,8 @@ def delete_app(
 
             # Commit changes
             if skip_dry_run:
+                # invalidates the caches of data derived from the catalog, e.g., search results
+                catalog_version.mark_catalog_changed(db_session)
                 db_session.commit()
                 console.rule(f"[bold green]Successfully deleted app '{app_name}'[/bold green]")
             else:
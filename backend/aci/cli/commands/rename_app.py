@@ -5,7 +5,7 @@ from rich.console import Console
 
 from aci.cli import config
 from aci.common import utils
-from aci.common.db import crud
+from aci.common.db import catalog_version, crud
 
 console = Console()
 
@@ -142,6 +142,8 @@ def rename_app(
                     "[bold yellow]Run with [bold green]--skip-dry-run[/bold green] to apply these changes[/bold yellow]"
                 )
             else:
+                # invalidates the caches of data derived from the catalog, e.g., search results
+                catalog_version.mark_catalog_changed(db_session)
                 db_session.commit()
                 console.rule(
                     f"[bold green]Successfully renamed app from '{current_name}' to '{new_name}'[/bold green]"
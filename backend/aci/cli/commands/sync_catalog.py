@@ -0,0 +1,316 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import click
+from pydantic import BaseModel
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy.orm import Session
+
+from aci.cli import config
+from aci.cli.commands.upsert_app import _render_template_to_string
+from aci.cli.utils import get_embedding_provider
+from aci.common import embeddings, utils
+from aci.common.db import crud
+from aci.common.schemas.app import AppEmbeddingFields, AppUpsert
+from aci.common.schemas.function import FunctionEmbeddingFields, FunctionUpsert
+
+console = Console()
+
+APP_FILE_NAME = "app.json"
+APP_SECRETS_FILE_NAME = ".app.secrets.json"
+FUNCTIONS_FILE_NAME = "functions.json"
+
+
+@dataclass
+class CatalogSyncPlan:
+    """
+    What a catalog sync writes. Rows are upserted with a new embedding only if the text their
+    embedding is generated from changed, otherwise the current embedding is kept.
+    """
+
+    apps_upsert: list[AppUpsert] = field(default_factory=list)
+    apps_embedding_changed: list[bool] = field(default_factory=list)
+    functions_upsert: list[FunctionUpsert] = field(default_factory=list)
+    functions_embedding_changed: list[bool] = field(default_factory=list)
+    # (entity type, name, change) rows for the report
+    changes: list[tuple[str, str, str]] = field(default_factory=list)
+    num_apps_unchanged: int = 0
+    num_functions_unchanged: int = 0
+
+
+@click.command()
+@click.option(
+    "--apps-dir",
+    "apps_dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=Path("./apps"),
+    show_default=True,
+    help="Path to the directory with one sub directory (app.json, functions.json and optionally "
+    ".app.secrets.json) per app",
+)
+@click.option(
+    "--max-workers",
+    "max_workers",
+    type=int,
+    default=None,
+    help="Number of processes used to parse the catalog files, defaults to the number of CPUs",
+)
+@click.option(
+    "--skip-dry-run",
+    is_flag=True,
+    help="Provide this flag to run the command and apply changes to the database",
+)
+def sync_catalog(apps_dir: Path, max_workers: int | None, skip_dry_run: bool) -> CatalogSyncPlan:
+    """
+    Sync all apps and functions under a directory to the DB in one transaction.
+
+    Changes are detected by comparing the content hashes stored on the rows, so unchanged apps
+    and functions are neither loaded nor diffed, and embeddings are only regenerated for apps and
+    functions whose embedding fields changed.
+    """
+    with utils.create_db_session(config.DB_FULL_URL) as db_session:
+        return sync_catalog_helper(db_session, apps_dir, max_workers, skip_dry_run)
+
+
+def sync_catalog_helper(
+    db_session: Session, apps_dir: Path, max_workers: int | None, skip_dry_run: bool
+) -> CatalogSyncPlan:
+    catalog = _parse_catalog(apps_dir, max_workers)
+    embedding_provider = get_embedding_provider()
+    plan = _plan_catalog_sync(db_session, catalog, embedding_provider.model_id)
+
+    # only the changed rows need new embeddings
+    apps_embeddings: list[list[float] | None] = [
+        embeddings.generate_app_embedding(
+            AppEmbeddingFields.model_validate(app_upsert.model_dump()),
+            embedding_provider,
+        )
+        if embedding_changed
+        else None
+        for app_upsert, embedding_changed in zip(
+            plan.apps_upsert, plan.apps_embedding_changed, strict=True
+        )
+    ]
+    functions_to_embed = [
+        function_upsert
+        for function_upsert, embedding_changed in zip(
+            plan.functions_upsert, plan.functions_embedding_changed, strict=True
+        )
+        if embedding_changed
+    ]
+    new_functions_embeddings = iter(
+        embeddings.generate_function_embeddings(
+            [
+                FunctionEmbeddingFields.model_validate(function_upsert.model_dump())
+                for function_upsert in functions_to_embed
+            ],
+            embedding_provider,
+        )
+    )
+    functions_embeddings: list[list[float] | None] = [
+        next(new_functions_embeddings) if embedding_changed else None
+        for embedding_changed in plan.functions_embedding_changed
+    ]
+
+    # apps first, the functions are linked to their app by app name
+    if plan.apps_upsert:
+        crud.apps.upsert_apps(
+            db_session,
+            plan.apps_upsert,
+            apps_embeddings,
+            embedding_model=embedding_provider.model_id,
+        )
+    if plan.functions_upsert:
+        crud.functions.upsert_functions(
+            db_session,
+            plan.functions_upsert,
+            functions_embeddings,
+            embedding_model=embedding_provider.model_id,
+        )
+
+    _print_report(plan)
+    if not skip_dry_run:
+        console.rule("Provide [bold green]--skip-dry-run[/bold green] to apply the changes")
+        db_session.rollback()
+    else:
+        db_session.commit()
+        console.rule("Catalog synced")
+
+    return plan
+
+
+def _parse_catalog(
+    apps_dir: Path, max_workers: int | None
+) -> list[tuple[AppUpsert, list[FunctionUpsert]]]:
+    """
+    Parse and validate the app and functions files of every app directory, in parallel processes
+    since validating the whole catalog is CPU bound.
+    """
+    app_dirs = sorted(path.parent for path in apps_dir.glob(f"*/{APP_FILE_NAME}"))
+    console.rule(f"Parsing {len(app_dirs)} apps under {apps_dir}")
+
+    catalog = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(app_dir, executor.submit(_parse_app_dir, app_dir)) for app_dir in app_dirs]
+        for app_dir, future in futures:
+            try:
+                catalog.append(future.result())
+            except Exception as e:
+                raise click.ClickException(f"Failed to parse app directory {app_dir}: {e}") from e
+
+    app_names = [app_upsert.name for app_upsert, _ in catalog]
+    duplicate_app_names = {name for name in app_names if app_names.count(name) > 1}
+    if duplicate_app_names:
+        raise click.ClickException(f"Found duplicate apps={duplicate_app_names}")
+
+    return catalog
+
+
+def _parse_app_dir(app_dir: Path) -> tuple[AppUpsert, list[FunctionUpsert]]:
+    """
+    Parse one app directory. Runs in a worker process.
+    """
+    secrets = {}
+    secrets_file = app_dir / APP_SECRETS_FILE_NAME
+    if secrets_file.exists():
+        secrets = json.loads(secrets_file.read_text())
+    app_upsert = AppUpsert.model_validate(
+        json.loads(_render_template_to_string(app_dir / APP_FILE_NAME, secrets))
+    )
+
+    functions_upsert = []
+    functions_file = app_dir / FUNCTIONS_FILE_NAME
+    if functions_file.exists():
+        functions_upsert = [
+            FunctionUpsert.model_validate(function_data)
+            for function_data in json.loads(functions_file.read_text())
+        ]
+    for function_upsert in functions_upsert:
+        if utils.parse_app_name_from_function_name(function_upsert.name) != app_upsert.name:
+            raise ValueError(
+                f"Function={function_upsert.name} does not belong to App={app_upsert.name}"
+            )
+
+    return app_upsert, functions_upsert
+
+
+def _plan_catalog_sync(
+    db_session: Session,
+    catalog: list[tuple[AppUpsert, list[FunctionUpsert]]],
+    embedding_model: str,
+) -> CatalogSyncPlan:
+    """
+    Compare the parsed catalog with the hashes stored in the DB. A function embedding is only
+    regenerated if the text it is generated from changed. Only apps whose content hash differs are
+    loaded, to find out if their embedding fields changed.
+    Embeddings generated with a different model than embedding_model (the configured embedding
+    provider's) or without model metadata are always regenerated.
+    """
+    app_hashes = crud.apps.get_app_hashes(db_session)
+    function_hashes = crud.functions.get_function_hashes(db_session)
+
+    apps_to_check: list[AppUpsert] = []
+    plan = CatalogSyncPlan()
+    for app_upsert, functions_upsert in catalog:
+        if app_upsert.name not in app_hashes:
+            plan.apps_upsert.append(app_upsert)
+            plan.apps_embedding_changed.append(True)
+            plan.changes.append(("App", app_upsert.name, "create"))
+        elif app_hashes[app_upsert.name][1] != embedding_model:
+            plan.apps_upsert.append(app_upsert)
+            plan.apps_embedding_changed.append(True)
+            plan.changes.append(("App", app_upsert.name, "re-embed"))
+        elif app_hashes[app_upsert.name][0] != utils.compute_content_hash(app_upsert):
+            apps_to_check.append(app_upsert)
+        else:
+            plan.num_apps_unchanged += 1
+
+        for function_upsert in functions_upsert:
+            if function_upsert.name not in function_hashes:
+                plan.functions_upsert.append(function_upsert)
+                plan.functions_embedding_changed.append(True)
+                plan.changes.append(("Function", function_upsert.name, "create"))
+                continue
+
+            content_hash, embedding_text_hash, function_embedding_model = function_hashes[
+                function_upsert.name
+            ]
+            if function_embedding_model != embedding_model:
+                plan.functions_upsert.append(function_upsert)
+                plan.functions_embedding_changed.append(True)
+                plan.changes.append(("Function", function_upsert.name, "re-embed"))
+                continue
+            if content_hash == utils.compute_content_hash(function_upsert):
+                plan.num_functions_unchanged += 1
+                continue
+
+            embedding_changed = embedding_text_hash != embeddings.get_function_embedding_text_hash(
+                FunctionEmbeddingFields.model_validate(function_upsert.model_dump())
+            )
+            plan.functions_upsert.append(function_upsert)
+            plan.functions_embedding_changed.append(embedding_changed)
+            plan.changes.append(
+                (
+                    "Function",
+                    function_upsert.name,
+                    "update" + (" (embedding)" if embedding_changed else ""),
+                )
+            )
+
+    if apps_to_check:
+        existing_apps = {
+            app.name: AppUpsert.model_validate(app, from_attributes=True)
+            for app in crud.apps.get_apps(
+                db_session,
+                False,
+                False,
+                [app_upsert.name for app_upsert in apps_to_check],
+                None,
+                None,
+            )
+        }
+        for app_upsert in apps_to_check:
+            existing_app_upsert = existing_apps[app_upsert.name]
+            # NOTE: rows without a hash yet (or with a stale one) are written anyway to store it
+            embedding_changed = _embedding_fields_changed(
+                existing_app_upsert, app_upsert, AppEmbeddingFields
+            )
+            plan.apps_upsert.append(app_upsert)
+            plan.apps_embedding_changed.append(embedding_changed)
+            if existing_app_upsert == app_upsert:
+                plan.num_apps_unchanged += 1
+            else:
+                plan.changes.append(
+                    (
+                        "App",
+                        app_upsert.name,
+                        "update" + (" (embedding)" if embedding_changed else ""),
+                    )
+                )
+
+    return plan
+
+
+def _embedding_fields_changed(
+    old: BaseModel, new: BaseModel, embedding_fields_model: type[BaseModel]
+) -> bool:
+    fields = set(embedding_fields_model.model_fields.keys())
+    return bool(old.model_dump(include=fields) != new.model_dump(include=fields))
+
+
+def _print_report(plan: CatalogSyncPlan) -> None:
+    if plan.changes:
+        table = Table("Type", "Name", "Change", title="Catalog changes")
+        for entity_type, name, change in plan.changes:
+            table.add_row(entity_type, name, change)
+        console.print(table)
+
+    console.print(
+        f"{len(plan.changes)} changes, "
+        f"{sum(plan.apps_embedding_changed)} app and "
+        f"{sum(plan.functions_embedding_changed)} function embeddings to generate, "
+        f"{plan.num_apps_unchanged} apps and {plan.num_functions_unchanged} functions unchanged"
+    )
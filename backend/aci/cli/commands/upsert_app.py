@@ -5,11 +5,11 @@ from uuid import UUID
 import click
 from deepdiff import DeepDiff
 from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
-from openai import OpenAI
 from rich.console import Console
 from sqlalchemy.orm import Session
 
 from aci.cli import config
+from aci.cli.utils import get_embedding_provider
 from aci.common import embeddings, utils
 from aci.common.db import crud
 from aci.common.db.sql_models import App
@@ -17,8 +17,6 @@ from aci.common.schemas.app import AppEmbeddingFields, AppUpsert
 
 console = Console()
 
-openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
-
 
 @click.command()
 @click.option(
@@ -85,22 +83,26 @@ def create_app_helper(db_session: Session, app_upsert: AppUpsert, skip_dry_run:
     # Generate app embedding using the fields defined in AppEmbeddingFields
     app_embedding = embeddings.generate_app_embedding(
         AppEmbeddingFields.model_validate(app_upsert.model_dump()),
-        openai_client,
-        config.OPENAI_EMBEDDING_MODEL,
-        config.OPENAI_EMBEDDING_DIMENSION,
+        get_embedding_provider(),
     )
 
     # Create the app entry in the database
-    app = crud.apps.create_app(db_session, app_upsert, app_embedding)
+    app = crud.apps.upsert_apps(
+        db_session, [app_upsert], [app_embedding], embedding_model=get_embedding_provider().model_id
+    )[0]
+    # NOTE: read the id before a dry run rollback, which discards the upserted row
+    app_id = app.id
 
     if not skip_dry_run:
-        console.rule(f"Provide [bold green]--skip-dry-run[/bold green] to create App={app.name}")
+        console.rule(
+            f"Provide [bold green]--skip-dry-run[/bold green] to create App={app_upsert.name}"
+        )
         db_session.rollback()
     else:
         db_session.commit()
-        console.rule(f"Created App={app.name}")
+        console.rule(f"Created App={app_upsert.name}")
 
-    return app.id
+    return app_id
 
 
 def update_app_helper(
@@ -123,13 +125,13 @@ def update_app_helper(
     if _need_embedding_regeneration(existing_app_upsert, app_upsert):
         new_embedding = embeddings.generate_app_embedding(
             AppEmbeddingFields.model_validate(app_upsert.model_dump()),
-            openai_client,
-            config.OPENAI_EMBEDDING_MODEL,
-            config.OPENAI_EMBEDDING_DIMENSION,
+            get_embedding_provider(),
         )
 
     # Update the app in the database with the new fields and optional embedding update
-    updated_app = crud.apps.update_app(db_session, existing_app, app_upsert, new_embedding)
+    updated_app = crud.apps.upsert_apps(
+        db_session, [app_upsert], [new_embedding], embedding_model=get_embedding_provider().model_id
+    )[0]
 
     diff = DeepDiff(existing_app_upsert.model_dump(), app_upsert.model_dump(), ignore_order=True)
 
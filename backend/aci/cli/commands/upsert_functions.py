@@ -3,20 +3,18 @@ from pathlib import Path
 
 import click
 from deepdiff import DeepDiff
-from openai import OpenAI
 from rich.console import Console
 from rich.table import Table
 from sqlalchemy.orm import Session
 
 from aci.cli import config
+from aci.cli.utils import get_embedding_provider
 from aci.common import embeddings, utils
 from aci.common.db import crud
 from aci.common.schemas.function import FunctionEmbeddingFields, FunctionUpsert
 
 console = Console()
 
-openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
-
 
 @click.command()
 @click.option(
@@ -58,26 +56,44 @@ def upsert_functions_helper(functions_file: Path, skip_dry_run: bool) -> list[st
         console.rule(f"App={app_name}")
         _validate_app_exists(db_session, app_name)
 
+        # load all existing functions with one query
+        existing_functions = crud.functions.get_functions_by_names(
+            db_session, [function_upsert.name for function_upsert in functions_upsert]
+        )
+        existing_functions_by_name = {
+            function.name: FunctionUpsert.model_validate(function, from_attributes=True)
+            for function in existing_functions
+        }
+        existing_embedding_text_hashes = {
+            function.name: function.embedding_text_hash for function in existing_functions
+        }
         new_functions: list[FunctionUpsert] = []
-        existing_functions: list[FunctionUpsert] = []
+        functions_to_check: list[FunctionUpsert] = []
 
         for function_upsert in functions_upsert:
-            existing_function = crud.functions.get_function(
-                db_session, function_upsert.name, public_only=False, active_only=False
-            )
-
-            if existing_function is None:
+            if function_upsert.name not in existing_functions_by_name:
                 new_functions.append(function_upsert)
             else:
-                existing_functions.append(function_upsert)
+                functions_to_check.append(function_upsert)
 
         console.rule("Checking functions to create...")
-        functions_created = create_functions_helper(db_session, new_functions)
+        functions_to_create, functions_to_create_embeddings = create_functions_helper(new_functions)
         console.rule("Checking functions to update...")
-        functions_updated = update_functions_helper(db_session, existing_functions)
-        # for functions that are in existing_functions but not in functions_updated
+        functions_to_update, functions_to_update_embeddings = update_functions_helper(
+            functions_to_check, existing_functions_by_name, existing_embedding_text_hashes
+        )
+        # all creates and updates in one bulk upsert
+        crud.functions.upsert_functions(
+            db_session,
+            functions_to_create + functions_to_update,
+            functions_to_create_embeddings + functions_to_update_embeddings,
+            embedding_model=get_embedding_provider().model_id,
+        )
+        functions_created = [func.name for func in functions_to_create]
+        functions_updated = [func.name for func in functions_to_update]
+        # for functions that are in functions_to_check but not in functions_updated
         functions_unchanged = [
-            func.name for func in existing_functions if func.name not in functions_updated
+            func.name for func in functions_to_check if func.name not in functions_updated
         ]
 
         if not skip_dry_run:
@@ -101,50 +117,51 @@ def upsert_functions_helper(functions_file: Path, skip_dry_run: bool) -> list[st
 
 
 def create_functions_helper(
-    db_session: Session, functions_upsert: list[FunctionUpsert]
-) -> list[str]:
+    functions_upsert: list[FunctionUpsert],
+) -> tuple[list[FunctionUpsert], list[list[float] | None]]:
     """
-    Batch creates functions in the database.
-    Generates embeddings for each new function and calls the CRUD layer for creation.
-    Returns a list of created function names.
+    Generates embeddings for each new function.
+    Returns the functions to create and their embeddings.
     """
     functions_embeddings = embeddings.generate_function_embeddings(
         [FunctionEmbeddingFields.model_validate(func.model_dump()) for func in functions_upsert],
-        openai_client,
-        embedding_model=config.OPENAI_EMBEDDING_MODEL,
-        embedding_dimension=config.OPENAI_EMBEDDING_DIMENSION,
-    )
-    created_functions = crud.functions.create_functions(
-        db_session, functions_upsert, functions_embeddings
+        get_embedding_provider(),
     )
 
-    return [func.name for func in created_functions]
+    return functions_upsert, list(functions_embeddings)
 
 
 def update_functions_helper(
-    db_session: Session, functions_upsert: list[FunctionUpsert]
-) -> list[str]:
+    functions_upsert: list[FunctionUpsert],
+    existing_functions_by_name: dict[str, FunctionUpsert],
+    existing_embedding_text_hashes: dict[str, str | None],
+) -> tuple[list[FunctionUpsert], list[list[float] | None]]:
     """
-    Batch updates functions in the database.
-
-    For each function to update, determines if the embedding needs to be regenerated.
-    Regenerates embeddings in batch for those that require it and updates the functions accordingly.
-    Returns a list of updated function names.
+    For each function to update, determines if it changed and if the embedding needs to be
+    regenerated, i.e., if the text it is generated from changed (see
+    embeddings.get_function_embedding_text_hash), which also covers changes of how the text is
+    built. Regenerates embeddings in batch for those that require it.
+    Returns the functions to update and their embeddings (None if the embedding is unchanged).
     """
     functions_with_new_embeddings: list[FunctionUpsert] = []
     functions_without_new_embeddings: list[FunctionUpsert] = []
 
     for function_upsert in functions_upsert:
-        existing_function = crud.functions.get_function(
-            db_session, function_upsert.name, public_only=False, active_only=False
-        )
-        if existing_function is None:
+        existing_function_upsert = existing_functions_by_name.get(function_upsert.name)
+        if existing_function_upsert is None:
             raise click.ClickException(f"Function '{function_upsert.name}' not found.")
-        existing_function_upsert = FunctionUpsert.model_validate(
-            existing_function, from_attributes=True
+        embedding_changed = existing_embedding_text_hashes.get(
+            function_upsert.name
+        ) != embeddings.get_function_embedding_text_hash(
+            FunctionEmbeddingFields.model_validate(function_upsert.model_dump())
         )
         if existing_function_upsert == function_upsert:
-            continue
+            if not embedding_changed:
+                continue
+            console.rule(
+                f"Will regenerate the embedding of function '{function_upsert.name}', "
+                f"the text it is generated from changed"
+            )
         else:
             diff = DeepDiff(
                 existing_function_upsert.model_dump(),
@@ -152,11 +169,11 @@ def update_functions_helper(
                 ignore_order=True,
             )
             console.rule(
-                f"Will update function '{existing_function.name}' with the following changes:"
+                f"Will update function '{function_upsert.name}' with the following changes:"
             )
             console.print(diff.pretty())
 
-        if _need_function_embedding_regeneration(existing_function_upsert, function_upsert):
+        if embedding_changed:
             functions_with_new_embeddings.append(function_upsert)
         else:
             functions_without_new_embeddings.append(function_upsert)
@@ -167,20 +184,15 @@ def update_functions_helper(
             FunctionEmbeddingFields.model_validate(func.model_dump())
             for func in functions_with_new_embeddings
         ],
-        openai_client,
-        embedding_model=config.OPENAI_EMBEDDING_MODEL,
-        embedding_dimension=config.OPENAI_EMBEDDING_DIMENSION,
+        get_embedding_provider(),
     )
 
     # Note: the order matters here because the embeddings need to match the functions
-    functions_updated = crud.functions.update_functions(
-        db_session,
+    return (
         functions_with_new_embeddings + functions_without_new_embeddings,
-        functions_embeddings + [None] * len(functions_without_new_embeddings),
+        list(functions_embeddings) + [None] * len(functions_without_new_embeddings),
     )
 
-    return [func.name for func in functions_updated]
-
 
 def _validate_app_exists(db_session: Session, app_name: str) -> None:
     app = crud.apps.get_app(db_session, app_name, False, False)
@@ -198,14 +210,3 @@ def _validate_all_functions_belong_to_the_app(
         )
 
     return app_names.pop()
-
-
-def _need_function_embedding_regeneration(
-    old_func: FunctionUpsert, new_func: FunctionUpsert
-) -> bool:
-    """
-    Determines if the function embedding should be regenerated based on changes in the
-    fields used for embedding (name, description, parameters).
-    """
-    fields = set(FunctionEmbeddingFields.model_fields.keys())
-    return bool(old_func.model_dump(include=fields) != new_func.model_dump(include=fields))
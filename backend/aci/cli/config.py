@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 
+from aci.common.enums import EmbeddingProviderType
 from aci.common.utils import check_and_get_env_variable, construct_db_url
 
 load_dotenv()
@@ -7,6 +8,13 @@ load_dotenv()
 OPENAI_API_KEY = check_and_get_env_variable("CLI_OPENAI_API_KEY")
 OPENAI_EMBEDDING_MODEL = check_and_get_env_variable("CLI_OPENAI_EMBEDDING_MODEL")
 OPENAI_EMBEDDING_DIMENSION = int(check_and_get_env_variable("CLI_OPENAI_EMBEDDING_DIMENSION"))
+EMBEDDING_PROVIDER = EmbeddingProviderType(check_and_get_env_variable("CLI_EMBEDDING_PROVIDER"))
+LOCAL_EMBEDDING_MODEL = check_and_get_env_variable("CLI_LOCAL_EMBEDDING_MODEL")
+EMBEDDING_MODEL = (
+    LOCAL_EMBEDDING_MODEL
+    if EMBEDDING_PROVIDER == EmbeddingProviderType.LOCAL
+    else OPENAI_EMBEDDING_MODEL
+)
 DB_SCHEME = check_and_get_env_variable("CLI_DB_SCHEME")
 DB_USER = check_and_get_env_variable("CLI_DB_USER")
 DB_PASSWORD = check_and_get_env_variable("CLI_DB_PASSWORD")
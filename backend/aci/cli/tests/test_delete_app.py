@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from click.testing import CliRunner
+from sqlalchemy.orm import Session
+
+from aci.cli.commands.delete_app import delete_app
+from aci.cli.tests.test_upsert_functions import test_create_functions
+from aci.common.db import catalog_version, crud
+from aci.common.enums import FunctionDefinitionFormat, Visibility
+from aci.server.function_search_cache import FunctionSearchCache, FunctionSearchCacheKey
+
+
+def test_delete_app_invalidates_cached_function_searches(
+    db_session: Session,
+    dummy_app_data: dict,
+    dummy_app_file: Path,
+    dummy_app_secrets_data: dict,
+    dummy_app_secrets_file: Path,
+    dummy_functions_data: list[dict],
+    dummy_functions_file: Path,
+) -> None:
+    test_create_functions(
+        db_session,
+        dummy_app_data,
+        dummy_app_file,
+        dummy_app_secrets_data,
+        dummy_app_secrets_file,
+        dummy_functions_data,
+        dummy_functions_file,
+        skip_dry_run=True,
+    )
+    # a search that found the functions of the app, cached under the catalog version read before
+    cache = FunctionSearchCache(max_size=10, ttl_seconds=60)
+    cache_key = FunctionSearchCacheKey.create(
+        Visibility.PUBLIC, None, None, None, FunctionDefinitionFormat.BASIC, 10, 0
+    )
+    version = catalog_version.get_catalog_version(db_session)
+    cache.set(cache_key, version, [function_data["name"] for function_data in dummy_functions_data])
+    db_session.commit()
+
+    result = CliRunner().invoke(
+        delete_app,
+        ["--app-name", dummy_app_data["name"], "--skip-dry-run"],
+        input="y\n",
+    )
+    assert result.exit_code == 0, result.output
+
+    db_session.expire_all()
+    assert crud.apps.get_app(db_session, dummy_app_data["name"], False, False) is None
+    assert cache.get(cache_key, catalog_version.get_catalog_version(db_session)) is None
@@ -0,0 +1,153 @@
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+from sqlalchemy.orm import Session
+
+from aci.cli.commands.sync_catalog import CatalogSyncPlan, sync_catalog
+from aci.cli.utils import get_embedding_provider
+from aci.common.db import crud
+from aci.common.db.sql_models import Function
+
+
+@pytest.fixture
+def dummy_apps_dir(
+    tmp_path: Path,
+    dummy_app_data: dict,
+    dummy_app_secrets_data: dict,
+    dummy_functions_data: list[dict],
+) -> Path:
+    apps_dir = tmp_path / "apps"
+    app_dir = apps_dir / "google_calendar"
+    app_dir.mkdir(parents=True)
+    (app_dir / "app.json").write_text(json.dumps(dummy_app_data))
+    (app_dir / ".app.secrets.json").write_text(json.dumps(dummy_app_secrets_data))
+    (app_dir / "functions.json").write_text(json.dumps(dummy_functions_data))
+    return apps_dir
+
+
+def _sync_catalog(apps_dir: Path, skip_dry_run: bool) -> CatalogSyncPlan:
+    runner = CliRunner()
+    command = ["--apps-dir", str(apps_dir), "--max-workers", "1"]
+    if skip_dry_run:
+        command.append("--skip-dry-run")
+
+    result = runner.invoke(sync_catalog, command, standalone_mode=False)
+    assert result.exit_code == 0, result.output
+    assert isinstance(result.return_value, CatalogSyncPlan)
+    return result.return_value
+
+
+@pytest.mark.parametrize("skip_dry_run", [True, False])
+def test_sync_catalog_create(
+    db_session: Session,
+    dummy_apps_dir: Path,
+    dummy_app_data: dict,
+    dummy_functions_data: list[dict],
+    skip_dry_run: bool,
+) -> None:
+    plan = _sync_catalog(dummy_apps_dir, skip_dry_run)
+    assert plan.changes == [
+        ("App", dummy_app_data["name"], "create"),
+        *[("Function", function_data["name"], "create") for function_data in dummy_functions_data],
+    ]
+
+    # new records are created by a different db session
+    db_session.expire_all()
+    app = crud.apps.get_app(
+        db_session, dummy_app_data["name"], public_only=False, active_only=False
+    )
+    functions = crud.functions.get_functions_by_names(
+        db_session, [function_data["name"] for function_data in dummy_functions_data]
+    )
+    if skip_dry_run:
+        assert app is not None
+        assert app.content_hash is not None
+        assert len(functions) == len(dummy_functions_data)
+        assert all(function.content_hash is not None for function in functions)
+    else:
+        assert app is None, "App should not be created for dry run"
+        assert functions == [], "Functions should not be created for dry run"
+
+
+def test_sync_catalog_no_changes(
+    dummy_apps_dir: Path,
+    dummy_functions_data: list[dict],
+) -> None:
+    _sync_catalog(dummy_apps_dir, skip_dry_run=True)
+
+    plan = _sync_catalog(dummy_apps_dir, skip_dry_run=True)
+    assert plan.changes == []
+    assert plan.apps_upsert == []
+    assert plan.functions_upsert == []
+    assert plan.num_apps_unchanged == 1
+    assert plan.num_functions_unchanged == len(dummy_functions_data)
+
+
+@pytest.mark.parametrize(
+    "field, value, embedding_changed",
+    [
+        ("description", "new description", True),
+        ("tags", ["new_tag"], False),
+    ],
+)
+def test_sync_catalog_update_function(
+    db_session: Session,
+    dummy_apps_dir: Path,
+    dummy_functions_data: list[dict],
+    field: str,
+    value: str | list[str],
+    embedding_changed: bool,
+) -> None:
+    _sync_catalog(dummy_apps_dir, skip_dry_run=True)
+    function_name = dummy_functions_data[0]["name"]
+    db_session.expire_all()
+    function_before = crud.functions.get_functions_by_names(db_session, [function_name])[0]
+    content_hash_before = function_before.content_hash
+    embedding_before = list(function_before.embedding)
+
+    dummy_functions_data[0][field] = value
+    (dummy_apps_dir / "google_calendar" / "functions.json").write_text(
+        json.dumps(dummy_functions_data)
+    )
+    plan = _sync_catalog(dummy_apps_dir, skip_dry_run=True)
+
+    assert plan.changes == [
+        ("Function", function_name, "update (embedding)" if embedding_changed else "update")
+    ]
+    assert plan.functions_embedding_changed == [embedding_changed]
+    assert plan.num_apps_unchanged == 1
+
+    db_session.expire_all()
+    function: Function = crud.functions.get_functions_by_names(db_session, [function_name])[0]
+    assert getattr(function, field) == value
+    assert function.content_hash != content_hash_before
+    if not embedding_changed:
+        assert list(function.embedding) == embedding_before
+
+
+def test_sync_catalog_reembeds_other_embedding_model(
+    db_session: Session,
+    dummy_apps_dir: Path,
+    dummy_app_data: dict,
+    dummy_functions_data: list[dict],
+) -> None:
+    _sync_catalog(dummy_apps_dir, skip_dry_run=True)
+    db_session.expire_all()
+    function_name = dummy_functions_data[0]["name"]
+    function = crud.functions.get_functions_by_names(db_session, [function_name])[0]
+    assert function.embedding_model == get_embedding_provider().model_id
+    assert function.embedding_dimension == len(function.embedding)
+
+    # e.g., embeddings generated before switching to another embedding provider
+    function.embedding_model = "openai/some-other-model"
+    db_session.commit()
+
+    plan = _sync_catalog(dummy_apps_dir, skip_dry_run=True)
+    assert plan.changes == [("Function", function_name, "re-embed")]
+    assert plan.functions_embedding_changed == [True]
+
+    db_session.expire_all()
+    function = crud.functions.get_functions_by_names(db_session, [function_name])[0]
+    assert function.embedding_model == get_embedding_provider().model_id
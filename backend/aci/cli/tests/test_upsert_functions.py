@@ -1,5 +1,6 @@
 import json
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from click.testing import CliRunner
@@ -7,9 +8,11 @@ from sqlalchemy.orm import Session
 
 from aci.cli.commands.upsert_functions import upsert_functions
 from aci.cli.tests.test_upsert_app import test_create_app
+from aci.common import config as common_config
+from aci.common import embeddings
 from aci.common.db import crud
 from aci.common.db.sql_models import Function
-from aci.common.schemas.function import FunctionUpsert
+from aci.common.schemas.function import FunctionEmbeddingFields, FunctionUpsert
 
 
 @pytest.mark.usefixtures(
@@ -160,6 +163,71 @@ def test_update_functions(
             assert function.parameters != new_parameters
 
 
+@pytest.mark.parametrize("change", ["parameter_type", "embedding_text_max_tokens"])
+def test_update_functions_regenerates_embedding_if_embedding_text_changed(
+    db_session: Session,
+    dummy_app_data: dict,
+    dummy_app_file: Path,
+    dummy_app_secrets_data: dict,
+    dummy_app_secrets_file: Path,
+    dummy_functions_data: list[dict],
+    dummy_functions_file: Path,
+    change: str,
+) -> None:
+    test_create_functions(
+        db_session,
+        dummy_app_data,
+        dummy_app_file,
+        dummy_app_secrets_data,
+        dummy_app_secrets_file,
+        dummy_functions_data,
+        dummy_functions_file,
+        skip_dry_run=True,
+    )
+
+    max_tokens = common_config.FUNCTION_EMBEDDING_TEXT_MAX_TOKENS
+    if change == "parameter_type":
+        # not part of the embedding text
+        max_results = dummy_functions_data[0]["parameters"]["properties"]["query"]["properties"][
+            "maxResults"
+        ]
+        max_results["type"] = "string"
+        max_results["enum"] = ["10", "100"]
+        max_results["default"] = "100"
+        dummy_functions_file.write_text(json.dumps(dummy_functions_data))
+    else:
+        # changes the embedding text of the (unchanged) functions
+        max_tokens = 8
+
+    with (
+        patch.object(common_config, "FUNCTION_EMBEDDING_TEXT_MAX_TOKENS", max_tokens),
+        patch.object(
+            embeddings,
+            "generate_function_embeddings",
+            wraps=embeddings.generate_function_embeddings,
+        ) as mock_generate_function_embeddings,
+    ):
+        result = CliRunner().invoke(
+            upsert_functions,
+            ["--functions-file", dummy_functions_file, "--skip-dry-run"],  # type: ignore
+        )
+        assert result.exit_code == 0, result.output
+
+        num_embeddings_generated = sum(
+            len(call.args[0]) for call in mock_generate_function_embeddings.call_args_list
+        )
+        assert num_embeddings_generated == (
+            len(dummy_functions_data) if change == "embedding_text_max_tokens" else 0
+        )
+
+        db_session.expire_all()
+        for function_data in dummy_functions_data:
+            function = crud.functions.get_functions_by_names(db_session, [function_data["name"]])[0]
+            assert function.embedding_text_hash == embeddings.get_function_embedding_text_hash(
+                FunctionEmbeddingFields.model_validate(function_data)
+            )
+
+
 # TODO:
 # - test throw error if app does not exist
 # - test throw error if functions file contains functions for different apps
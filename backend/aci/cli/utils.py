@@ -0,0 +1,19 @@
+from functools import cache
+
+from aci.cli import config
+from aci.common.embedding_providers import EmbeddingProvider, create_embedding_provider
+
+
+@cache
+def get_embedding_provider() -> EmbeddingProvider:
+    """
+    The embedding provider of the CLI commands, created on first use rather than on import, so
+    that importing a command (e.g., in the parser worker processes of sync-catalog) doesn't load
+    it (a local embedding model would be loaded once per process otherwise).
+    """
+    return create_embedding_provider(
+        config.EMBEDDING_PROVIDER,
+        config.EMBEDDING_MODEL,
+        config.OPENAI_EMBEDDING_DIMENSION,
+        openai_api_key=config.OPENAI_API_KEY,
+    )
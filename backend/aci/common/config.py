@@ -4,3 +4,7 @@ AWS_REGION = check_and_get_env_variable("COMMON_AWS_REGION")
 AWS_ENDPOINT_URL = check_and_get_env_variable("COMMON_AWS_ENDPOINT_URL")
 KEY_ENCRYPTION_KEY_ARN = check_and_get_env_variable("COMMON_KEY_ENCRYPTION_KEY_ARN")
 API_KEY_HASHING_SECRET = check_and_get_env_variable("COMMON_API_KEY_HASHING_SECRET")
+# max number of tokens of the text a function embedding is generated from, see embeddings.py
+FUNCTION_EMBEDDING_TEXT_MAX_TOKENS = int(
+    check_and_get_env_variable("COMMON_FUNCTION_EMBEDDING_TEXT_MAX_TOKENS")
+)
@@ -0,0 +1,64 @@
+"""
+A monotonically increasing version of the function catalog (apps, functions and app
+configurations), for caches of data derived from it (e.g., function search results) to be
+invalidated by.
+
+The version is stored in the database (a single row of catalog_versions), so that it is shared by
+every process, e.g., all server workers and the CLI. crud functions that mutate the catalog mark
+their session, and the version is bumped in the same transaction, right before it commits: the new
+version becomes visible together with the changes, and mutations that are rolled back don't bump
+it. A cache entry computed after reading a version can therefore never reflect a catalog older than
+that version.
+
+NOTE: the row is locked from the bump until the commit, which serializes the commits (only) of
+concurrent catalog mutations.
+"""
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from aci.common.db.sql_models import CatalogVersion
+
+_CATALOG_CHANGED_KEY = "catalog_changed"
+_CATALOG_VERSION_ID = 1
+
+
+def get_catalog_version(db_session: Session) -> int:
+    version = db_session.execute(
+        select(CatalogVersion.version).filter(CatalogVersion.id == _CATALOG_VERSION_ID)
+    ).scalar_one_or_none()
+    return version if version is not None else 0
+
+
+def bump_catalog_version(db_session: Session) -> None:
+    """
+    Bump the version in the current transaction of the session.
+    """
+    statement = insert(CatalogVersion).values(id=_CATALOG_VERSION_ID, version=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[CatalogVersion.id],
+        set_={"version": CatalogVersion.version + 1},
+    )
+    db_session.execute(statement)
+
+
+def mark_catalog_changed(db_session: Session) -> None:
+    """
+    Mark the catalog as changed by the session, the version is bumped when the session commits.
+    """
+    db_session.info[_CATALOG_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_catalog_version_before_commit(session: Session) -> None:
+    if session.info.pop(_CATALOG_CHANGED_KEY, False):
+        bump_catalog_version(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_catalog_changed_after_rollback(session: Session, previous_transaction: object) -> None:
+    if session.in_transaction():
+        # a nested transaction (savepoint) was rolled back, the outer one may still commit changes
+        return
+    session.info.pop(_CATALOG_CHANGED_KEY, None)
@@ -1,8 +1,10 @@
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, joinedload
 
+from aci.common.db import catalog_version
 from aci.common.db.sql_models import App, AppConfiguration
 from aci.common.logging_setup import get_logger
 from aci.common.schemas.app_configurations import (
@@ -21,6 +23,7 @@ def create_app_configuration(
     """
     Create a new app configuration record
     """
+    catalog_version.mark_catalog_changed(db_session)
     app_id = db_session.execute(
         select(App.id).filter_by(name=app_configuration_create.app_name)
     ).scalar_one()
@@ -51,6 +54,7 @@ def update_app_configuration(
     Update an app configuration by app id.
     If a field is None, it will not be changed.
     """
+    catalog_version.mark_catalog_changed(db_session)
     # TODO: a better way to do update?
     if update.enabled is not None:
         app_configuration.enabled = update.enabled
@@ -72,6 +76,7 @@ def delete_app_configuration(db_session: Session, project_id: UUID, app_name: st
         .filter(AppConfiguration.project_id == project_id, App.name == app_name)
     )
     app_to_delete = db_session.execute(statement).scalar_one()
+    catalog_version.mark_catalog_changed(db_session)
     db_session.delete(app_to_delete)
     db_session.flush()
 
@@ -82,13 +87,29 @@ def get_app_configurations(
     app_names: list[str] | None,
     limit: int | None = None,
     offset: int | None = None,
+    after: tuple[datetime, UUID] | None = None,
 ) -> list[AppConfiguration]:
-    """Get all app configurations for a project, optionally filtered by app names"""
-    statement = select(AppConfiguration).filter_by(project_id=project_id)
+    """
+    Get all app configurations for a project, optionally filtered by app names.
+    Sorted by creation time (and id for ties).
+    The app of each configuration is loaded in the same query (needed for app_name).
+    For keyset pagination, pass (created_at, id) of the last app configuration of the previous page
+    as after instead of an offset.
+    """
+    statement = (
+        select(AppConfiguration)
+        .filter_by(project_id=project_id)
+        .options(joinedload(AppConfiguration.app))
+    )
     if app_names:
         statement = statement.join(App, AppConfiguration.app_id == App.id).filter(
             App.name.in_(app_names)
         )
+    if after is not None:
+        statement = statement.filter(
+            tuple_(AppConfiguration.created_at, AppConfiguration.id) > after
+        )
+    statement = statement.order_by(AppConfiguration.created_at, AppConfiguration.id)
     if offset is not None:
         statement = statement.offset(offset)
     if limit is not None:
@@ -2,28 +2,43 @@
 CRUD operations for apps. (not including app_configurations)
 """
 
-from sqlalchemy import select, update
-from sqlalchemy.orm import Session
+from typing import Any
+from uuid import uuid4
 
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql.selectable import ScalarSelect
+
+from aci.common import utils
+from aci.common.db import catalog_version, embedding_search
 from aci.common.db.sql_models import App
-from aci.common.enums import SecurityScheme, Visibility
+from aci.common.enums import EmbeddingSearchMode, SecurityScheme, Visibility
 from aci.common.logging_setup import get_logger
 from aci.common.schemas.app import AppUpsert
 
 logger = get_logger(__name__)
 
+# number of apps per INSERT ... ON CONFLICT statement in upsert_apps
+UPSERT_APPS_CHUNK_SIZE = 100
+
 
 def create_app(
     db_session: Session,
     app_upsert: AppUpsert,
     app_embedding: list[float],
+    embedding_model: str | None = None,
 ) -> App:
     logger.debug(f"Creating app: {app_upsert}")
+    catalog_version.mark_catalog_changed(db_session)
 
     app_data = app_upsert.model_dump(mode="json", exclude_none=True)
     app = App(
         **app_data,
         embedding=app_embedding,
+        content_hash=utils.compute_content_hash(app_upsert),
+        embedding_model=embedding_model,
+        embedding_dimension=len(app_embedding),
     )
 
     db_session.add(app)
@@ -37,24 +52,95 @@ def update_app(
     app: App,
     app_upsert: AppUpsert,
     app_embedding: list[float] | None = None,
+    embedding_model: str | None = None,
 ) -> App:
     """
     Update an existing app.
     With the option to update the app embedding. (needed if AppEmbeddingFields are updated)
     """
+    catalog_version.mark_catalog_changed(db_session)
     new_app_data = app_upsert.model_dump(mode="json", exclude_unset=True)
 
     for field, value in new_app_data.items():
         setattr(app, field, value)
+    app.content_hash = utils.compute_content_hash(app_upsert)
 
     if app_embedding is not None:
         app.embedding = app_embedding
+        app.embedding_model = embedding_model
+        app.embedding_dimension = len(app_embedding)
 
     db_session.flush()
     db_session.refresh(app)
     return app
 
 
+def upsert_apps(
+    db_session: Session,
+    apps_upsert: list[AppUpsert],
+    apps_embeddings: list[list[float] | None],
+    embedding_model: str | None = None,
+) -> list[App]:
+    """
+    Create or update apps in bulk, with one INSERT ... ON CONFLICT (name) DO UPDATE statement per
+    chunk of apps.
+    A None embedding keeps the current embedding (and its metadata) of the app, so the app must
+    exist. embedding_model is the model the given embeddings are generated with.
+    """
+    if not apps_upsert:
+        # nothing changes, the catalog version (and the caches keyed by it) is kept
+        return []
+    logger.debug(f"Upserting apps, apps_upsert={apps_upsert}")
+    catalog_version.mark_catalog_changed(db_session)
+
+    rows = [
+        {
+            # NOTE: id is only generated by the model's default_factory, not by the db
+            "id": uuid4(),
+            **app_upsert.model_dump(mode="json", exclude_none=True),
+            "content_hash": utils.compute_content_hash(app_upsert),
+            # the current embedding (and its metadata) is used as the value to insert, so that the
+            # update below sets it to itself
+            "embedding": app_embedding
+            if app_embedding is not None
+            else _get_current_value(App.embedding, app_upsert.name),
+            "embedding_model": embedding_model
+            if app_embedding is not None
+            else _get_current_value(App.embedding_model, app_upsert.name),
+            "embedding_dimension": len(app_embedding)
+            if app_embedding is not None
+            else _get_current_value(App.embedding_dimension, app_upsert.name),
+        }
+        for app_upsert, app_embedding in zip(apps_upsert, apps_embeddings, strict=True)
+    ]
+
+    apps: list[App] = []
+    for i in range(0, len(rows), UPSERT_APPS_CHUNK_SIZE):
+        statement = insert(App).values(rows[i : i + UPSERT_APPS_CHUNK_SIZE])
+        statement = statement.on_conflict_do_update(
+            index_elements=[App.name],
+            set_={
+                **{
+                    column: statement.excluded[column]
+                    for column in rows[i]
+                    if column not in ("id", "name")
+                },
+                "updated_at": func.now(),
+            },
+        )
+        apps.extend(
+            db_session.scalars(
+                statement.returning(App), execution_options={"populate_existing": True}
+            )
+        )
+
+    return apps
+
+
+def _get_current_value(column: Any, app_name: str) -> ScalarSelect:
+    return select(column).filter(App.name == app_name).scalar_subquery()
+
+
 def update_app_default_security_credentials(
     db_session: Session,
     app: App,
@@ -77,6 +163,19 @@ def get_app(db_session: Session, app_name: str, public_only: bool, active_only:
     return app
 
 
+def get_app_hashes(db_session: Session) -> dict[str, tuple[str | None, str | None]]:
+    """
+    Get the (content hash, embedding model) of every app by app name, without loading (and
+    decrypting) the apps.
+    """
+    statement = select(App.name, App.content_hash, App.embedding_model)
+
+    return {
+        row.name: (row.content_hash, row.embedding_model)
+        for row in db_session.execute(statement).all()
+    }
+
+
 def get_apps(
     db_session: Session,
     public_only: bool,
@@ -84,14 +183,28 @@ def get_apps(
     app_names: list[str] | None,
     limit: int | None,
     offset: int | None,
+    include_functions: bool = False,
+    after_name: str | None = None,
 ) -> list[App]:
+    """
+    Get a list of apps. Sorted by app name.
+    If include_functions is True, the functions of all returned apps are loaded in one extra query
+    instead of one query per app when app.functions is accessed.
+    For keyset pagination, pass the name of the last app of the previous page as after_name
+    instead of an offset.
+    """
     statement = select(App)
+    if include_functions:
+        statement = statement.options(selectinload(App.functions))
     if public_only:
         statement = statement.filter(App.visibility == Visibility.PUBLIC)
     if active_only:
         statement = statement.filter(App.active)
     if app_names is not None:
         statement = statement.filter(App.name.in_(app_names))
+    if after_name is not None:
+        statement = statement.filter(App.name > after_name)
+    statement = statement.order_by(App.name)
     if offset is not None:
         statement = statement.offset(offset)
     if limit is not None:
@@ -108,6 +221,9 @@ def search_apps(
     intent_embedding: list[float] | None,
     limit: int,
     offset: int,
+    include_functions: bool = False,
+    embedding_model: str | None = None,
+    embedding_search_mode: EmbeddingSearchMode = EmbeddingSearchMode.EXACT,
 ) -> list[tuple[App, float | None]]:
     """Get a list of apps with optional filtering by categories and sorting by vector similarity to intent. and pagination."""
     statement = select(App)
@@ -131,10 +247,29 @@ def search_apps(
 
     # sort by similarity to intent
     if intent_embedding is not None:
+        # only compare against embeddings of the intent's embedding model (or without metadata)
+        if embedding_model is not None:
+            statement = statement.filter(
+                or_(App.embedding_model.is_(None), App.embedding_model == embedding_model)
+            )
+        # NOTE: the given apps are few, they are searched exactly rather than scanning the
+        # approximate index for the ones passing the filter
+        if embedding_search_mode != EmbeddingSearchMode.EXACT and app_names is None:
+            statement = embedding_search.filter_by_approximate_candidates(
+                db_session,
+                statement,
+                App.id,
+                App.embedding,
+                intent_embedding,
+                embedding_search_mode,
+                offset + limit,
+            )
         similarity_score = App.embedding.cosine_distance(intent_embedding)
         statement = statement.add_columns(similarity_score.label("similarity_score"))
         statement = statement.order_by("similarity_score")
 
+    if include_functions:
+        statement = statement.options(selectinload(App.functions))
     statement = statement.offset(offset).limit(limit)
 
     logger.debug(f"Executing statement, statement={statement}")
@@ -149,9 +284,11 @@ def search_apps(
 
 def set_app_active_status(db_session: Session, app_name: str, active: bool) -> None:
     statement = update(App).filter_by(name=app_name).values(active=active)
+    catalog_version.mark_catalog_changed(db_session)
     db_session.execute(statement)
 
 
 def set_app_visibility(db_session: Session, app_name: str, visibility: Visibility) -> None:
     statement = update(App).filter_by(name=app_name).values(visibility=visibility)
+    catalog_version.mark_catalog_changed(db_session)
     db_session.execute(statement)
@@ -1,41 +1,63 @@
-from uuid import UUID
-
-from sqlalchemy import select, update
-from sqlalchemy.orm import Session
-
-from aci.common import utils
-from aci.common.db import crud
-from aci.common.db.sql_models import App, Function
-from aci.common.enums import Visibility
+from typing import Any
+from uuid import UUID, uuid4
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    Integer,
+    Select,
+    and_,
+    any_,
+    cast,
+    column,
+    func,
+    or_,
+    select,
+    true,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy.sql.selectable import ScalarSelect
+
+from aci.common import embeddings, utils
+from aci.common.db import catalog_version, embedding_search
+from aci.common.db.sql_models import EMBEDDING_DIMENSION, App, AppConfiguration, Function
+from aci.common.enums import EmbeddingSearchMode, Visibility
 from aci.common.logging_setup import get_logger
-from aci.common.schemas.function import FunctionUpsert
+from aci.common.schemas.function import FunctionEmbeddingFields, FunctionUpsert
 
 logger = get_logger(__name__)
 
+# number of functions per INSERT ... ON CONFLICT statement in upsert_functions
+UPSERT_FUNCTIONS_CHUNK_SIZE = 100
+
 
 def create_functions(
     db_session: Session,
     functions_upsert: list[FunctionUpsert],
     functions_embeddings: list[list[float]],
+    embedding_model: str | None = None,
 ) -> list[Function]:
     """
     Create functions.
     Note: each function might be of different app.
     """
     logger.debug(f"Creating functions, functions_upsert={functions_upsert}")
+    catalog_version.mark_catalog_changed(db_session)
 
+    app_ids = _get_app_ids_of_functions(db_session, functions_upsert)
     functions = []
     for i, function_upsert in enumerate(functions_upsert):
-        app_name = utils.parse_app_name_from_function_name(function_upsert.name)
-        app = crud.apps.get_app(db_session, app_name, False, False)
-        if not app:
-            logger.error(f"App={app_name} does not exist for function={function_upsert.name}")
-            raise ValueError(f"App={app_name} does not exist for function={function_upsert.name}")
         function_data = function_upsert.model_dump(mode="json", exclude_none=True)
         function = Function(
-            app_id=app.id,
+            app_id=app_ids[function_upsert.name],
             **function_data,
             embedding=functions_embeddings[i],
+            content_hash=utils.compute_content_hash(function_upsert),
+            embedding_text_hash=_get_embedding_text_hash(function_upsert),
+            embedding_model=embedding_model,
+            embedding_dimension=len(functions_embeddings[i]),
         )
         db_session.add(function)
         functions.append(function)
@@ -49,6 +71,7 @@ def update_functions(
     db_session: Session,
     functions_upsert: list[FunctionUpsert],
     functions_embeddings: list[list[float] | None],
+    embedding_model: str | None = None,
 ) -> list[Function]:
     """
     Update functions.
@@ -56,9 +79,16 @@ def update_functions(
     With the option to update the function embedding. (needed if FunctionEmbeddingFields are updated)
     """
     logger.debug(f"Updating functions, functions_upsert={functions_upsert}")
+    catalog_version.mark_catalog_changed(db_session)
+    existing_functions = {
+        function.name: function
+        for function in get_functions_by_names(
+            db_session, [function_upsert.name for function_upsert in functions_upsert]
+        )
+    }
     functions = []
     for i, function_upsert in enumerate(functions_upsert):
-        function = crud.functions.get_function(db_session, function_upsert.name, False, False)
+        function = existing_functions.get(function_upsert.name)
         if not function:
             logger.error(f"Function={function_upsert.name} does not exist")
             raise ValueError(f"Function={function_upsert.name} does not exist")
@@ -66,8 +96,13 @@ def update_functions(
         function_data = function_upsert.model_dump(mode="json", exclude_unset=True)
         for field, value in function_data.items():
             setattr(function, field, value)
-        if functions_embeddings[i] is not None:
-            function.embedding = functions_embeddings[i]  # type: ignore
+        function.content_hash = utils.compute_content_hash(function_upsert)
+        function_embedding = functions_embeddings[i]
+        if function_embedding is not None:
+            function.embedding = function_embedding
+            function.embedding_text_hash = _get_embedding_text_hash(function_upsert)
+            function.embedding_model = embedding_model
+            function.embedding_dimension = len(function_embedding)
         functions.append(function)
 
     db_session.flush()
@@ -75,6 +110,77 @@ def update_functions(
     return functions
 
 
+def upsert_functions(
+    db_session: Session,
+    functions_upsert: list[FunctionUpsert],
+    functions_embeddings: list[list[float] | None],
+    embedding_model: str | None = None,
+) -> list[Function]:
+    """
+    Create or update functions in bulk, with one INSERT ... ON CONFLICT (name) DO UPDATE statement
+    per chunk of functions instead of a few round trips per function.
+    Note: each function might be of different app.
+    A None embedding keeps the current embedding (and its metadata) of the function, so the
+    function must exist. embedding_model is the model the given embeddings are generated with.
+    """
+    if not functions_upsert:
+        # nothing changes, the catalog version (and the caches keyed by it) is kept
+        return []
+    logger.debug(f"Upserting functions, functions_upsert={functions_upsert}")
+    catalog_version.mark_catalog_changed(db_session)
+
+    app_ids = _get_app_ids_of_functions(db_session, functions_upsert)
+    rows = []
+    for function_upsert, function_embedding in zip(
+        functions_upsert, functions_embeddings, strict=True
+    ):
+        rows.append(
+            {
+                # NOTE: id is only generated by the model's default_factory, not by the db
+                "id": uuid4(),
+                "app_id": app_ids[function_upsert.name],
+                **function_upsert.model_dump(mode="json", exclude_none=True),
+                "content_hash": utils.compute_content_hash(function_upsert),
+                # the current embedding (and its metadata) is used as the value to insert, so that
+                # the update below sets it to itself
+                "embedding": function_embedding
+                if function_embedding is not None
+                else _get_current_value(Function.embedding, function_upsert.name),
+                "embedding_text_hash": _get_embedding_text_hash(function_upsert)
+                if function_embedding is not None
+                else _get_current_value(Function.embedding_text_hash, function_upsert.name),
+                "embedding_model": embedding_model
+                if function_embedding is not None
+                else _get_current_value(Function.embedding_model, function_upsert.name),
+                "embedding_dimension": len(function_embedding)
+                if function_embedding is not None
+                else _get_current_value(Function.embedding_dimension, function_upsert.name),
+            }
+        )
+
+    functions: list[Function] = []
+    for i in range(0, len(rows), UPSERT_FUNCTIONS_CHUNK_SIZE):
+        statement = insert(Function).values(rows[i : i + UPSERT_FUNCTIONS_CHUNK_SIZE])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Function.name],
+            set_={
+                **{
+                    column: statement.excluded[column]
+                    for column in rows[i]
+                    if column not in ("id", "name")
+                },
+                "updated_at": func.now(),
+            },
+        )
+        functions.extend(
+            db_session.scalars(
+                statement.returning(Function), execution_options={"populate_existing": True}
+            )
+        )
+
+    return functions
+
+
 def search_functions(
     db_session: Session,
     public_only: bool,
@@ -84,9 +190,144 @@ def search_functions(
     intent_embedding: list[float] | None,
     limit: int,
     offset: int,
+    embedding_model: str | None = None,
+    embedding_search_mode: EmbeddingSearchMode = EmbeddingSearchMode.EXACT,
+    enabled_in_project_id: UUID | None = None,
 ) -> list[Function]:
-    """Get a list of functions with optional filtering by app names and sorting by vector similarity to intent."""
-    statement = select(Function).join(App, Function.app_id == App.id)
+    """
+    Get a list of functions with optional filtering by app names and sorting by vector similarity to intent.
+    If enabled_in_project_id is given, only functions enabled in the (enabled) app configurations
+    of that project are returned.
+    """
+    statement = _filter_searchable_functions(
+        select(Function).join(App, Function.app_id == App.id),
+        public_only,
+        active_only,
+        app_names,
+        function_names,
+        enabled_in_project_id,
+        embedding_model if intent_embedding is not None else None,
+    )
+
+    if intent_embedding is not None:
+        # NOTE: the functions of the given apps (or the given functions) are few, they are searched
+        # exactly rather than scanning the approximate index for the ones passing the filter
+        if (
+            embedding_search_mode != EmbeddingSearchMode.EXACT
+            and app_names is None
+            and function_names is None
+        ):
+            statement = embedding_search.filter_by_approximate_candidates(
+                db_session,
+                statement,
+                Function.id,
+                Function.embedding,
+                intent_embedding,
+                embedding_search_mode,
+                offset + limit,
+            )
+        similarity_score = Function.embedding.cosine_distance(intent_embedding)
+        statement = statement.order_by(similarity_score)
+
+    # NOTE: App is already joined for filtering, populate Function.app from the same row so that
+    # accessing function.app (e.g., app_name) doesn't issue one extra query per function.
+    statement = statement.options(contains_eager(Function.app))
+    statement = statement.offset(offset).limit(limit)
+    logger.debug(f"Executing statement, statement={statement}")
+
+    return list(db_session.execute(statement).scalars().all())
+
+
+def search_functions_batch(
+    db_session: Session,
+    public_only: bool,
+    active_only: bool,
+    app_names: list[str] | None,
+    intent_embeddings: list[list[float]],
+    limit: int,
+    offset: int,
+    embedding_model: str | None = None,
+    enabled_in_project_id: UUID | None = None,
+) -> list[list[Function]]:
+    """
+    Search functions for multiple intents in one query, with the same filters as search_functions.
+    Every intent embedding is joined laterally with its own (filtered, sorted by similarity and
+    paginated) functions. Returns the functions of each intent, in the order of the intents.
+    NOTE: the similarity is always exact, the approximate search modes are not supported here.
+    """
+    intents = values(
+        column("intent_index", Integer),
+        column("intent_embedding", Vector(EMBEDDING_DIMENSION)),
+        name="intents",
+    ).data(list(enumerate(intent_embeddings)))
+
+    # NOTE: the embeddings of a VALUES list are sent as text, so they have to be cast to vectors
+    similarity_score = Function.embedding.cosine_distance(
+        cast(intents.c.intent_embedding, Vector(EMBEDDING_DIMENSION))
+    )
+    matches = (
+        _filter_searchable_functions(
+            select(
+                Function.id.label("function_id"), similarity_score.label("similarity_score")
+            ).join(App, Function.app_id == App.id),
+            public_only,
+            active_only,
+            app_names,
+            None,
+            enabled_in_project_id,
+            embedding_model,
+        )
+        .order_by(similarity_score)
+        .offset(offset)
+        .limit(limit)
+        .lateral("matches")
+    )
+    statement = (
+        select(intents.c.intent_index, Function)
+        .select_from(intents)
+        .join(matches, true())
+        .join(Function, Function.id == matches.c.function_id)
+        .join(App, Function.app_id == App.id)
+        .options(contains_eager(Function.app))
+        .order_by(intents.c.intent_index, matches.c.similarity_score)
+    )
+    logger.debug(f"Executing statement, statement={statement}")
+
+    functions_per_intent: list[list[Function]] = [[] for _ in intent_embeddings]
+    for intent_index, function in db_session.execute(statement).tuples():
+        functions_per_intent[intent_index].append(function)
+    return functions_per_intent
+
+
+def _filter_searchable_functions(
+    statement: Select[Any],
+    public_only: bool,
+    active_only: bool,
+    app_names: list[str] | None,
+    function_names: list[str] | None,
+    enabled_in_project_id: UUID | None,
+    embedding_model: str | None,
+) -> Select[Any]:
+    """
+    Apply the filters of a function search to a statement that selects from functions joined with
+    apps.
+    """
+    # resolve the enabled functions in the same query, by joining the app configuration of each
+    # function's app (unique per project and app)
+    if enabled_in_project_id is not None:
+        statement = statement.join(
+            AppConfiguration,
+            and_(
+                AppConfiguration.app_id == App.id,
+                AppConfiguration.project_id == enabled_in_project_id,
+            ),
+        ).filter(
+            AppConfiguration.enabled,
+            or_(
+                AppConfiguration.all_functions_enabled,
+                Function.name == any_(AppConfiguration.enabled_functions),
+            ),
+        )
 
     # filter out all functions of inactive apps and all inactive functions
     # (where app is active buy specific functions can be inactive)
@@ -107,14 +348,13 @@ def search_functions(
     if app_names is not None:
         statement = statement.filter(App.name.in_(app_names))
 
-    if intent_embedding is not None:
-        similarity_score = Function.embedding.cosine_distance(intent_embedding)
-        statement = statement.order_by(similarity_score)
-
-    statement = statement.offset(offset).limit(limit)
-    logger.debug(f"Executing statement, statement={statement}")
+    # only compare against embeddings of the intent's embedding model (or without metadata)
+    if embedding_model is not None:
+        statement = statement.filter(
+            or_(Function.embedding_model.is_(None), Function.embedding_model == embedding_model)
+        )
 
-    return list(db_session.execute(statement).scalars().all())
+    return statement
 
 
 def get_functions(
@@ -124,9 +364,16 @@ def get_functions(
     app_names: list[str] | None,
     limit: int,
     offset: int,
+    after_name: str | None = None,
 ) -> list[Function]:
-    """Get a list of functions and their details. Sorted by function name."""
-    statement = select(Function).join(App, Function.app_id == App.id)
+    """
+    Get a list of functions and their details. Sorted by function name.
+    For keyset pagination, pass the name of the last function of the previous page as after_name
+    (and offset=0) instead of an offset.
+    """
+    statement = (
+        select(Function).join(App, Function.app_id == App.id).options(contains_eager(Function.app))
+    )
 
     if app_names is not None:
         statement = statement.filter(App.name.in_(app_names))
@@ -139,12 +386,40 @@ def get_functions(
     # exclude inactive functions (including all functions if apps are inactive)
     if active_only:
         statement = statement.filter(App.active).filter(Function.active)
+    if after_name is not None:
+        statement = statement.filter(Function.name > after_name)
 
     statement = statement.order_by(Function.name).offset(offset).limit(limit)
 
     return list(db_session.execute(statement).scalars().all())
 
 
+def get_functions_by_names(db_session: Session, function_names: list[str]) -> list[Function]:
+    statement = select(Function).filter(Function.name.in_(function_names))
+
+    return list(db_session.execute(statement).scalars().all())
+
+
+def get_function_hashes(
+    db_session: Session,
+) -> dict[str, tuple[str | None, str | None, str | None]]:
+    """
+    Get the (content hash, embedding text hash, embedding model) of every function by function
+    name, without loading the functions.
+    """
+    statement = select(
+        Function.name,
+        Function.content_hash,
+        Function.embedding_text_hash,
+        Function.embedding_model,
+    )
+
+    return {
+        row.name: (row.content_hash, row.embedding_text_hash, row.embedding_model)
+        for row in db_session.execute(statement).all()
+    }
+
+
 def get_functions_by_app_id(db_session: Session, app_id: UUID) -> list[Function]:
     statement = select(Function).filter(Function.app_id == app_id)
 
@@ -154,16 +429,17 @@ def get_functions_by_app_id(db_session: Session, app_id: UUID) -> list[Function]
 def get_function(
     db_session: Session, function_name: str, public_only: bool, active_only: bool
 ) -> Function | None:
-    statement = select(Function).filter(Function.name == function_name)
+    statement = (
+        select(Function)
+        .join(App, Function.app_id == App.id)
+        .options(contains_eager(Function.app))
+        .filter(Function.name == function_name)
+    )
 
     # filter out all functions of inactive apps and all inactive functions
     # (where app is active buy specific functions can be inactive)
     if active_only:
-        statement = (
-            statement.join(App, Function.app_id == App.id)
-            .filter(App.active)
-            .filter(Function.active)
-        )
+        statement = statement.filter(App.active).filter(Function.active)
     # if the corresponding project (api key belongs to) can only access public apps and functions,
     # filter out all functions of private apps and all private functions (where app is public but specific function is private)
     if public_only:
@@ -176,6 +452,7 @@ def get_function(
 
 def set_function_active_status(db_session: Session, function_name: str, active: bool) -> None:
     statement = update(Function).filter_by(name=function_name).values(active=active)
+    catalog_version.mark_catalog_changed(db_session)
     db_session.execute(statement)
 
 
@@ -183,4 +460,44 @@ def set_function_visibility(
     db_session: Session, function_name: str, visibility: Visibility
 ) -> None:
     statement = update(Function).filter_by(name=function_name).values(visibility=visibility)
+    catalog_version.mark_catalog_changed(db_session)
     db_session.execute(statement)
+
+
+def _get_app_ids_of_functions(
+    db_session: Session, functions_upsert: list[FunctionUpsert]
+) -> dict[str, UUID]:
+    """
+    Get the app id of each function (by function name), with one query for all apps.
+    """
+    app_names = {
+        utils.parse_app_name_from_function_name(function_upsert.name)
+        for function_upsert in functions_upsert
+    }
+    # NOTE: only selecting the columns needed, loading the apps would decrypt their security schemes
+    app_ids_by_app_name: dict[str, UUID] = {
+        row.name: row.id
+        for row in db_session.execute(
+            select(App.name, App.id).filter(App.name.in_(app_names))
+        ).all()
+    }
+
+    app_ids = {}
+    for function_upsert in functions_upsert:
+        app_name = utils.parse_app_name_from_function_name(function_upsert.name)
+        if app_name not in app_ids_by_app_name:
+            logger.error(f"App={app_name} does not exist for function={function_upsert.name}")
+            raise ValueError(f"App={app_name} does not exist for function={function_upsert.name}")
+        app_ids[function_upsert.name] = app_ids_by_app_name[app_name]
+
+    return app_ids
+
+
+def _get_current_value(column: Any, function_name: str) -> ScalarSelect:
+    return select(column).filter(Function.name == function_name).scalar_subquery()
+
+
+def _get_embedding_text_hash(function_upsert: FunctionUpsert) -> str:
+    return embeddings.get_function_embedding_text_hash(
+        FunctionEmbeddingFields.model_validate(function_upsert.model_dump())
+    )
@@ -1,11 +1,11 @@
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import distinct, exists, func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import distinct, exists, func, select, tuple_
+from sqlalchemy.orm import Session, joinedload
 
 from aci.common import validators
-from aci.common.db.sql_models import App, LinkedAccount, Project
+from aci.common.db.sql_models import App, AppConfiguration, LinkedAccount, Project
 from aci.common.enums import SecurityScheme
 from aci.common.logging_setup import get_logger
 from aci.common.schemas.linked_accounts import LinkedAccountUpdate
@@ -23,15 +23,32 @@ def get_linked_accounts(
     project_id: UUID,
     app_name: str | None,
     linked_account_owner_id: str | None,
+    limit: int | None = None,
+    after: tuple[datetime, UUID] | None = None,
 ) -> list[LinkedAccount]:
-    """Get all linked accounts under a project, with optional filters"""
-    statement = select(LinkedAccount).filter_by(project_id=project_id)
+    """
+    Get all linked accounts under a project, with optional filters.
+    Sorted by creation time (and id for ties).
+    For keyset pagination, pass (created_at, id) of the last linked account of the previous page
+    as after.
+    """
+    # NOTE: the app is needed for app_name of every linked account in the response
+    statement = (
+        select(LinkedAccount)
+        .filter_by(project_id=project_id)
+        .options(joinedload(LinkedAccount.app))
+    )
     if app_name:
         statement = statement.join(App, LinkedAccount.app_id == App.id).filter(App.name == app_name)
     if linked_account_owner_id:
         statement = statement.filter(
             LinkedAccount.linked_account_owner_id == linked_account_owner_id
         )
+    if after is not None:
+        statement = statement.filter(tuple_(LinkedAccount.created_at, LinkedAccount.id) > after)
+    statement = statement.order_by(LinkedAccount.created_at, LinkedAccount.id)
+    if limit is not None:
+        statement = statement.limit(limit)
 
     return list(db_session.execute(statement).scalars().all())
 
@@ -104,6 +121,7 @@ def create_linked_account(
         ),
         enabled=enabled,
     )
+    linked_account.access_token_expires_at = _get_access_token_expires_at(security_credentials)
     db_session.add(linked_account)
     db_session.flush()
     db_session.refresh(linked_account)
@@ -127,11 +145,54 @@ def update_linked_account_credentials(
     )
 
     linked_account.security_credentials = security_credentials.model_dump(mode="json")
+    linked_account.access_token_expires_at = _get_access_token_expires_at(security_credentials)
     db_session.flush()
     db_session.refresh(linked_account)
     return linked_account
 
 
+def try_lock_linked_account(db_session: Session, linked_account_id: UUID) -> bool:
+    """
+    Try to take a transaction level advisory lock on a linked account, e.g., so that only one
+    request (across all server processes) refreshes its OAuth2 access token at a time.
+    Returns False right away if another transaction holds the lock. The lock is released when the
+    transaction of db_session ends (commit or rollback).
+    """
+    # NOTE: advisory locks are keyed by a bigint, two linked accounts sharing the first 8 bytes of
+    # their id (practically never) would only serialize each other
+    lock_key = int.from_bytes(linked_account_id.bytes[:8], "big", signed=True)
+    locked: bool = db_session.execute(select(func.pg_try_advisory_xact_lock(lock_key))).scalar_one()
+    return locked
+
+
+def get_oauth2_linked_accounts_with_access_token_expiring(
+    db_session: Session, expires_after: int, expires_before: int, limit: int
+) -> list[LinkedAccount]:
+    """
+    Get enabled OAuth2 linked accounts, whose app configuration is enabled too, whose access token
+    expires in [expires_after, expires_before) (unix timestamps), the soonest expiring first.
+    """
+    statement = (
+        select(LinkedAccount)
+        .join(
+            AppConfiguration,
+            (AppConfiguration.project_id == LinkedAccount.project_id)
+            & (AppConfiguration.app_id == LinkedAccount.app_id),
+        )
+        .filter(
+            LinkedAccount.security_scheme == SecurityScheme.OAUTH2,
+            LinkedAccount.enabled,
+            AppConfiguration.enabled,
+            LinkedAccount.access_token_expires_at >= expires_after,
+            LinkedAccount.access_token_expires_at < expires_before,
+        )
+        .options(joinedload(LinkedAccount.app))
+        .order_by(LinkedAccount.access_token_expires_at)
+        .limit(limit)
+    )
+    return list(db_session.execute(statement).scalars().all())
+
+
 def update_linked_account(
     db_session: Session,
     linked_account: LinkedAccount,
@@ -197,3 +258,14 @@ def linked_account_owner_id_exists_in_org(
         )
     )
     return db_session.execute(statement).scalar() or False
+
+
+def _get_access_token_expires_at(
+    security_credentials: OAuth2SchemeCredentials
+    | APIKeySchemeCredentials
+    | NoAuthSchemeCredentials
+    | None,
+) -> int | None:
+    if isinstance(security_credentials, OAuth2SchemeCredentials):
+        return security_credentials.expires_at
+    return None
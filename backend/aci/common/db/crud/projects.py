@@ -125,7 +125,7 @@ def increase_project_quota_usage(db_session: Session, project: Project) -> None:
 
 
 def increment_api_monthly_quota_usage(
-    db_session: Session, project: Project, monthly_quota_limit: int
+    db_session: Session, project: Project, monthly_quota_limit: int, amount: int = 1
 ) -> bool:
     """
     Atomically increment API monthly quota usage for a project only if the total org usage
@@ -135,6 +135,7 @@ def increment_api_monthly_quota_usage(
         db_session: Database session
         project: Project to increment usage for
         monthly_quota_limit: Maximum allowed monthly quota for the org
+        amount: Number of quota units to use
 
     Returns:
         bool: True if increment was successful, False if quota would be exceeded
@@ -146,13 +147,15 @@ def increment_api_monthly_quota_usage(
         .scalar_subquery()
     )
 
-    # Atomically increment only if total usage + 1 <= limit
+    # Atomically increment only if total usage + amount <= limit
     statement = (
         update(Project)
-        .where((Project.id == project.id) & (current_total_subquery < monthly_quota_limit))
+        .where(
+            (Project.id == project.id) & (current_total_subquery + amount <= monthly_quota_limit)
+        )
         .values(
             {
-                Project.api_quota_monthly_used: Project.api_quota_monthly_used + 1,
+                Project.api_quota_monthly_used: Project.api_quota_monthly_used + amount,
             }
         )
     )
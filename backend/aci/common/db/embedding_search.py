@@ -0,0 +1,90 @@
+"""
+Helpers for the similarity search of apps and functions with approximate (quantized) indexes.
+
+The embeddings are stored in full precision, which is what search results are ranked by. The
+approximate modes only use the compact representations (half precision or binary quantized
+embeddings, see the HNSW expression indexes created in the migrations) to cheaply find a candidate
+set, which is then re-ranked exactly. The expressions here must match the index expressions for
+postgres to use the indexes.
+
+The candidates are taken with iterative index scans (pgvector >= 0.8.0), so that the filters of a
+search (e.g., only the functions enabled in a project) don't empty the candidate set: a plain
+HNSW index scan returns the hnsw.ef_search closest rows, and the filters are applied after.
+"""
+
+from typing import Any
+
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import ColumnElement, Select, cast, func, select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from aci.common.db.sql_models import EMBEDDING_DIMENSION
+from aci.common.enums import EmbeddingSearchMode
+
+# number of candidates taken from the approximate index per requested result, the candidates are
+# then re-ranked by their exact distance
+EMBEDDING_SEARCH_CANDIDATES_FACTOR = 4
+# default of hnsw.ef_search, which also caps the number of rows an HNSW index scan returns (without
+# iterative scans)
+HNSW_DEFAULT_EF_SEARCH = 40
+# the index scan goes on until enough rows pass the filters (or hnsw.max_scan_tuples rows were
+# scanned), the order doesn't need to be strict as the candidates are re-ranked exactly
+HNSW_ITERATIVE_SCAN = "relaxed_order"
+
+
+def approximate_distance(
+    embedding_column: InstrumentedAttribute[list[float]],
+    intent_embedding: list[float],
+    search_mode: EmbeddingSearchMode,
+) -> ColumnElement[Any]:
+    """
+    The distance between the stored embeddings and the intent embedding in the compact
+    representation of the search mode.
+    """
+    match search_mode:
+        case EmbeddingSearchMode.HALFVEC:
+            distance: ColumnElement[Any] = cast(
+                embedding_column, HALFVEC(EMBEDDING_DIMENSION)
+            ).cosine_distance(cast(intent_embedding, HALFVEC(EMBEDDING_DIMENSION)))
+            return distance
+        case EmbeddingSearchMode.BINARY:
+            return cast(func.binary_quantize(embedding_column), BIT(EMBEDDING_DIMENSION)).op("<~>")(
+                cast(
+                    func.binary_quantize(cast(intent_embedding, Vector(EMBEDDING_DIMENSION))),
+                    BIT(EMBEDDING_DIMENSION),
+                )
+            )
+        case _:
+            raise ValueError(f"Search mode={search_mode} is not approximate")
+
+
+def filter_by_approximate_candidates(
+    db_session: Session,
+    statement: Select,
+    id_column: InstrumentedAttribute[Any],
+    embedding_column: InstrumentedAttribute[list[float]],
+    intent_embedding: list[float],
+    search_mode: EmbeddingSearchMode,
+    num_results: int,
+) -> Select:
+    """
+    Restrict a (filtered) search statement to the rows closest to the intent embedding according to
+    the approximate index of the search mode. The statement still needs to be ordered by the exact
+    distance.
+    NOTE: the filters that select only a few rows (e.g., the functions of some apps) are better
+    served by an exact search, which can use the indexes of the filtered columns instead.
+    """
+    num_candidates = num_results * EMBEDDING_SEARCH_CANDIDATES_FACTOR
+    # NOTE: set for the current transaction only, like hnsw.ef_search
+    db_session.execute(select(func.set_config("hnsw.iterative_scan", HNSW_ITERATIVE_SCAN, True)))
+    # NOTE: an HNSW index scan returns at most hnsw.ef_search rows, raise it (for the current
+    # transaction only) if more candidates are needed
+    if num_candidates > HNSW_DEFAULT_EF_SEARCH:
+        db_session.execute(select(func.set_config("hnsw.ef_search", str(num_candidates), True)))
+
+    candidate_ids = (
+        statement.with_only_columns(id_column)
+        .order_by(approximate_distance(embedding_column, intent_embedding, search_mode))
+        .limit(num_candidates)
+    )
+    return statement.filter(id_column.in_(candidate_ids))
@@ -20,9 +20,11 @@ from uuid import UUID, uuid4
 
 from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -78,7 +80,8 @@ class Project(Base):
         PGUUID(as_uuid=True), primary_key=True, default_factory=uuid4, init=False
     )
 
-    org_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), nullable=False)
+    # Note: indexed for the per org lookups, e.g., projects of an org in quota checks
+    org_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), nullable=False, index=True)
 
     name: Mapped[str] = mapped_column(String(MAX_STRING_LENGTH), nullable=False)
     # if public, the project can only access public apps and functions
@@ -140,7 +143,7 @@ class Agent(Base):
         PGUUID(as_uuid=True), primary_key=True, default_factory=uuid4, init=False
     )
     project_id: Mapped[UUID] = mapped_column(
-        PGUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False
+        PGUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True
     )
     name: Mapped[str] = mapped_column(String(MAX_STRING_LENGTH), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
@@ -175,6 +178,11 @@ class Agent(Base):
         "APIKey", lazy="select", cascade="all, delete-orphan", init=False
     )
 
+    __table_args__ = (
+        # GIN index for the array containment (@>) lookup of agents that are allowed to use an app
+        Index("ix_agents_allowed_apps", "allowed_apps", postgresql_using="gin"),
+    )
+
 
 class APIKey(Base):
     """
@@ -224,7 +232,7 @@ class Function(Base):
         PGUUID(as_uuid=True), primary_key=True, default_factory=uuid4, init=False
     )
     app_id: Mapped[UUID] = mapped_column(
-        PGUUID(as_uuid=True), ForeignKey("apps.id"), nullable=False
+        PGUUID(as_uuid=True), ForeignKey("apps.id"), nullable=False, index=True
     )
     # Note: the function name is unique across the platform and should have app information, e.g., "GITHUB_CLONE_REPO"
     # ideally this should just be <app name>_<function name> (uppercase)
@@ -242,7 +250,21 @@ class Function(Base):
     # TODO: should response schema be generic (data + execution success of not + optional error) or specific to the function
     response: Mapped[dict] = mapped_column(MutableDict.as_mutable(JSONB), nullable=False)
     # TODO: should we provide EMBEDDING_DIMENSION here? which makes it less flexible if we want to change the embedding dimention in the future
-    embedding: Mapped[list[float]] = mapped_column(Vector(EMBEDDING_DIMENSION), nullable=False)
+    # NOTE: deferred (not loaded unless accessed) because none of the read paths need the vector itself,
+    # similarity search only references the column in SQL. Loading it costs ~4-8KB per row.
+    embedding: Mapped[list[float]] = mapped_column(
+        Vector(EMBEDDING_DIMENSION), nullable=False, deferred=True, repr=False
+    )
+    # hash of the FunctionUpsert the function was last upserted from, to cheaply detect changes
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, default=None)
+    # hash of the text the embedding was generated from, to skip regenerating unchanged embeddings
+    embedding_text_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, default=None)
+    # "<provider>/<model>" and dimension of the embedding, vectors of different models are not
+    # comparable so search only matches them against intent embeddings of the same model
+    embedding_model: Mapped[str | None] = mapped_column(
+        String(MAX_STRING_LENGTH), nullable=True, default=None
+    )
+    embedding_dimension: Mapped[int | None] = mapped_column(Integer, nullable=True, default=None)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=False), server_default=func.now(), nullable=False, init=False
@@ -293,7 +315,18 @@ class App(Base):
         nullable=False,
     )
     # embedding vector for similarity search
-    embedding: Mapped[list[float]] = mapped_column(Vector(EMBEDDING_DIMENSION), nullable=False)
+    # NOTE: deferred for the same reason as Function.embedding
+    embedding: Mapped[list[float]] = mapped_column(
+        Vector(EMBEDDING_DIMENSION), nullable=False, deferred=True, repr=False
+    )
+    # hash of the AppUpsert the app was last upserted from, to detect changes without loading
+    # (and decrypting) the app
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, default=None)
+    # NOTE: same as Function.embedding_model and Function.embedding_dimension
+    embedding_model: Mapped[str | None] = mapped_column(
+        String(MAX_STRING_LENGTH), nullable=True, default=None
+    )
+    embedding_dimension: Mapped[int | None] = mapped_column(Integer, nullable=True, default=None)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=False), server_default=func.now(), nullable=False, init=False
@@ -423,6 +456,12 @@ class LinkedAccount(Base):
         nullable=False,
     )
     enabled: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    # unencrypted copy of the OAuth2 access token's expires_at (unix timestamp) of the security
+    # credentials, so that tokens about to expire can be looked up (and renewed) without
+    # decrypting the credentials of every linked account. Kept in sync by crud.linked_accounts.
+    access_token_expires_at: Mapped[int | None] = mapped_column(
+        BigInteger, nullable=True, default=None, init=False
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=False), server_default=func.now(), nullable=False, init=False
@@ -452,6 +491,15 @@ class LinkedAccount(Base):
             "linked_account_owner_id",
             name="uc_project_app_linked_account_owner",
         ),
+        # covers counting / looking up linked account owners across the projects of an org with an
+        # index only scan, which the unique constraint above can't do as it has app_id in between
+        Index(
+            "ix_linked_accounts_project_id_linked_account_owner_id",
+            "project_id",
+            "linked_account_owner_id",
+        ),
+        # looking up the access tokens about to expire, see aci.server.oauth2_token_renewer
+        Index("ix_linked_accounts_access_token_expires_at", "access_token_expires_at"),
     )
 
     # deleting linked account will delete all associated secrets
@@ -606,6 +654,18 @@ class ProcessedStripeEvent(Base):
     )
 
 
+class CatalogVersion(Base):
+    """
+    The version of the function catalog, a single row (id 1) bumped by every transaction that
+    changes apps, functions or app configurations, see aci.common.db.catalog_version.
+    """
+
+    __tablename__ = "catalog_versions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
 __all__ = [
     "APIKey",
     "Agent",
@@ -0,0 +1,29 @@
+from openai import OpenAI
+
+from aci.common.embedding_providers.base import EmbeddingProvider
+from aci.common.embedding_providers.local_embedding_provider import LocalEmbeddingProvider
+from aci.common.embedding_providers.openai_embedding_provider import OpenAIEmbeddingProvider
+from aci.common.enums import EmbeddingProviderType
+
+
+def create_embedding_provider(
+    provider_type: EmbeddingProviderType,
+    model: str,
+    dimension: int,
+    openai_api_key: str | None = None,
+) -> EmbeddingProvider:
+    match provider_type:
+        case EmbeddingProviderType.OPENAI:
+            return OpenAIEmbeddingProvider(OpenAI(api_key=openai_api_key), model, dimension)
+        case EmbeddingProviderType.LOCAL:
+            return LocalEmbeddingProvider(model, dimension)
+        case _:
+            raise ValueError(f"Unsupported embedding provider: {provider_type}")
+
+
+__all__ = [
+    "EmbeddingProvider",
+    "LocalEmbeddingProvider",
+    "OpenAIEmbeddingProvider",
+    "create_embedding_provider",
+]
@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+
+from aci.common.enums import EmbeddingProviderType
+
+
+class EmbeddingProvider(ABC):
+    """
+    Base class for embedding providers.
+    """
+
+    def __init__(self, model: str, dimension: int):
+        self.model = model
+        self.dimension = dimension
+
+    @property
+    @abstractmethod
+    def provider_type(self) -> EmbeddingProviderType:
+        pass
+
+    @property
+    def model_id(self) -> str:
+        """
+        Identifies the model (and provider) the embeddings are generated with, stored alongside
+        the embeddings because embeddings of different models are not comparable.
+        """
+        return f"{self.provider_type}/{self.model}"
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate one embedding (of size dimension) per text, in the same order.
+        """
+        pass
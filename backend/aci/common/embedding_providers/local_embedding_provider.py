@@ -0,0 +1,60 @@
+import threading
+from typing import TYPE_CHECKING
+
+from aci.common.embedding_providers.base import EmbeddingProvider
+from aci.common.enums import EmbeddingProviderType
+from aci.common.logging_setup import get_logger
+
+if TYPE_CHECKING:
+    from fastembed import TextEmbedding
+
+logger = get_logger(__name__)
+
+# number of texts per inference batch
+LOCAL_EMBEDDING_BATCH_SIZE = 64
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    Runs an (ONNX) embedding model on CPU in the process itself via fastembed, e.g.,
+    BAAI/bge-large-en-v1.5 or mixedbread-ai/mxbai-embed-large-v1 (both 1024 dimensions).
+    The model weights are downloaded to (and then loaded from) the fastembed cache directory
+    (FASTEMBED_CACHE_PATH), so no network access is needed once the cache is populated.
+    NOTE: fastembed is an optional dependency of the project, installed with the local-embeddings
+    extra (uv sync --extra local-embeddings).
+    """
+
+    def __init__(self, model: str, dimension: int):
+        super().__init__(model, dimension)
+        self._text_embedding: TextEmbedding | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def provider_type(self) -> EmbeddingProviderType:
+        return EmbeddingProviderType.LOCAL
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        text_embedding = self._get_text_embedding()
+        # NOTE: onnxruntime sessions are thread safe and release the GIL during inference
+        embeddings = [
+            embedding.tolist()
+            for embedding in text_embedding.embed(texts, batch_size=LOCAL_EMBEDDING_BATCH_SIZE)
+        ]
+        for embedding in embeddings:
+            if len(embedding) != self.dimension:
+                raise ValueError(
+                    f"Embedding dimension mismatch, model={self.model}, "
+                    f"expected={self.dimension}, actual={len(embedding)}"
+                )
+        return embeddings
+
+    def _get_text_embedding(self) -> "TextEmbedding":
+        # the model is loaded once per process, on first use rather than at import time
+        if self._text_embedding is None:
+            with self._lock:
+                if self._text_embedding is None:
+                    from fastembed import TextEmbedding
+
+                    logger.info(f"Loading local embedding model, model={self.model}")
+                    self._text_embedding = TextEmbedding(model_name=self.model)
+        return self._text_embedding
@@ -0,0 +1,40 @@
+from openai import OpenAI
+
+from aci.common.embedding_providers.base import EmbeddingProvider
+from aci.common.enums import EmbeddingProviderType
+from aci.common.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# max number of inputs per embeddings request (the API allows up to 2048)
+OPENAI_EMBEDDING_BATCH_SIZE = 512
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, openai_client: OpenAI, model: str, dimension: int):
+        super().__init__(model, dimension)
+        self.openai_client = openai_client
+
+    @property
+    def provider_type(self) -> EmbeddingProviderType:
+        return EmbeddingProviderType.OPENAI
+
+    # TODO: exponential backoff?
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        embeddings: list[list[float]] = []
+        for i in range(0, len(texts), OPENAI_EMBEDDING_BATCH_SIZE):
+            try:
+                response = self.openai_client.embeddings.create(
+                    input=texts[i : i + OPENAI_EMBEDDING_BATCH_SIZE],
+                    model=self.model,
+                    dimensions=self.dimension,
+                )
+            except Exception:
+                logger.error("Error generating embeddings", exc_info=True)
+                raise
+            # NOTE: the order of the returned embeddings is not guaranteed to match the input
+            embeddings.extend(
+                embedding.embedding for embedding in sorted(response.data, key=lambda e: e.index)
+            )
+
+        return embeddings
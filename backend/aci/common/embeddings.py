@@ -1,17 +1,41 @@
-from openai import OpenAI
+import hashlib
+from functools import cache
+from pathlib import Path
 
+import tiktoken
+from tiktoken.load import load_tiktoken_bpe
+
+from aci.common import config
+from aci.common.embedding_providers import EmbeddingProvider
 from aci.common.logging_setup import get_logger
 from aci.common.schemas.app import AppEmbeddingFields
 from aci.common.schemas.function import FunctionEmbeddingFields
 
 logger = get_logger(__name__)
 
+# The encoding of OpenAI's embedding models (text-embedding-3-*, text-embedding-ada-002), the text
+# a function embedding is generated from is trimmed to a number of tokens of this encoding.
+# NOTE: vendored (same file and hash as tiktoken_ext.openai_public.cl100k_base) rather than
+# downloaded by tiktoken on first use, so that the text (and its hash) is the same in every
+# environment, including offline ones.
+EMBEDDING_TEXT_TOKENIZER_ENCODING = "cl100k_base"
+EMBEDDING_TEXT_TOKENIZER_BPE_FILE = Path(__file__).parent / "data" / "cl100k_base.tiktoken"
+EMBEDDING_TEXT_TOKENIZER_BPE_FILE_HASH = (
+    "223921b76ee99bde995b7ff738513eef100fb51d18c93597a113bcffe865b2a7"
+)
+EMBEDDING_TEXT_TOKENIZER_PAT_STR = r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+EMBEDDING_TEXT_TOKENIZER_SPECIAL_TOKENS = {
+    "<|endoftext|>": 100257,
+    "<|fim_prefix|>": 100258,
+    "<|fim_middle|>": 100259,
+    "<|fim_suffix|>": 100260,
+    "<|endofprompt|>": 100276,
+}
+
 
 def generate_app_embedding(
     app: AppEmbeddingFields,
-    openai_client: OpenAI,
-    embedding_model: str,
-    embedding_dimension: int,
+    embedding_provider: EmbeddingProvider,
 ) -> list[float]:
     """
     Generate embedding for app.
@@ -21,62 +45,111 @@ def generate_app_embedding(
     # generate app embeddings based on app config's name, display_name, provider, description, categories
     text_for_embedding = app.model_dump_json()
     logger.debug(f"Text for app embedding: {text_for_embedding}")
-    return generate_embedding(
-        openai_client, embedding_model, embedding_dimension, text_for_embedding
-    )
+    return generate_embedding(embedding_provider, text_for_embedding)
 
 
-# TODO: batch generate function embeddings
 # TODO: update app embedding to include function embeddings whenever functions are added/updated?
 def generate_function_embeddings(
     functions: list[FunctionEmbeddingFields],
-    openai_client: OpenAI,
-    embedding_model: str,
-    embedding_dimension: int,
+    embedding_provider: EmbeddingProvider,
 ) -> list[list[float]]:
+    """
+    Generate embeddings for functions, in batches.
+    """
     logger.debug(f"Generating embeddings for {len(functions)} functions...")
-    function_embeddings: list[list[float]] = []
-    for function in functions:
-        function_embeddings.append(
-            generate_function_embedding(
-                function, openai_client, embedding_model, embedding_dimension
-            )
-        )
-
-    return function_embeddings
+    if not functions:
+        return []
+    return embedding_provider.embed(
+        [build_function_embedding_text(function) for function in functions]
+    )
 
 
 def generate_function_embedding(
     function: FunctionEmbeddingFields,
-    openai_client: OpenAI,
-    embedding_model: str,
-    embedding_dimension: int,
+    embedding_provider: EmbeddingProvider,
 ) -> list[float]:
     logger.debug(f"Generating embedding for function: {function.name}...")
-    text_for_embedding = function.model_dump_json()
+    text_for_embedding = build_function_embedding_text(function)
     logger.debug(f"Text for function embedding: {text_for_embedding}")
-    return generate_embedding(
-        openai_client, embedding_model, embedding_dimension, text_for_embedding
+    return generate_embedding(embedding_provider, text_for_embedding)
+
+
+def build_function_embedding_text(
+    function: FunctionEmbeddingFields, max_tokens: int | None = None
+) -> str:
+    """
+    Build the text a function embedding is generated from: the name, the description and one
+    "<parameter path>: <parameter description>" line per parameter, trimmed to max_tokens
+    (config.FUNCTION_EMBEDDING_TEXT_MAX_TOKENS by default).
+    The most relevant parts come first so that trimming drops the least relevant ones: the top
+    level parameters come before the nested ones, level by level.
+    Only the parts of the parameters json schema that describe what the function does are kept,
+    and the parameters are sorted by name so that the text doesn't depend on the key order of the
+    schema (which is not preserved by JSONB).
+    """
+    if max_tokens is None:
+        max_tokens = config.FUNCTION_EMBEDDING_TEXT_MAX_TOKENS
+    lines = [function.name, function.description]
+    lines.extend(_get_parameter_lines(function.parameters))
+    return _trim_to_token_budget("\n".join(lines), max_tokens)
+
+
+def get_function_embedding_text_hash(function: FunctionEmbeddingFields) -> str:
+    """
+    Hash of the text the function embedding is generated from, stored alongside the embedding to
+    detect if the embedding needs to be regenerated.
+    """
+    return hashlib.sha256(build_function_embedding_text(function).encode("utf-8")).hexdigest()
+
+
+def _get_parameter_lines(parameters: dict) -> list[str]:
+    lines = []
+    # (schema, path prefix) of the objects of the current level, breadth first
+    schemas: list[tuple[dict, str]] = [(parameters, "")]
+    while schemas:
+        nested_schemas = []
+        for schema, path_prefix in schemas:
+            for name, property_schema in sorted(schema.get("properties", {}).items()):
+                if not isinstance(property_schema, dict):
+                    continue
+                path = f"{path_prefix}{name}"
+                description = property_schema.get("description")
+                lines.append(f"{path}: {description}" if description else path)
+                nested_schemas.append((property_schema, f"{path}."))
+                items_schema = property_schema.get("items")
+                if isinstance(items_schema, dict):
+                    nested_schemas.append((items_schema, f"{path}[]."))
+        schemas = nested_schemas
+    return lines
+
+
+@cache
+def _get_tokenizer() -> tiktoken.Encoding:
+    # NOTE: raises if the vendored encoding is missing or corrupted (hash mismatch), rather than
+    # trimming the text some other way, which would make the text depend on the environment
+    mergeable_ranks = load_tiktoken_bpe(
+        str(EMBEDDING_TEXT_TOKENIZER_BPE_FILE),
+        expected_hash=EMBEDDING_TEXT_TOKENIZER_BPE_FILE_HASH,
+    )
+    return tiktoken.Encoding(
+        name=EMBEDDING_TEXT_TOKENIZER_ENCODING,
+        pat_str=EMBEDDING_TEXT_TOKENIZER_PAT_STR,
+        mergeable_ranks=mergeable_ranks,
+        special_tokens=EMBEDDING_TEXT_TOKENIZER_SPECIAL_TOKENS,
     )
 
 
-# TODO: allow different inference providers
-# TODO: exponential backoff?
-def generate_embedding(
-    openai_client: OpenAI, embedding_model: str, embedding_dimension: int, text: str
-) -> list[float]:
+def _trim_to_token_budget(text: str, max_tokens: int) -> str:
+    tokenizer = _get_tokenizer()
+    tokens = tokenizer.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return tokenizer.decode(tokens[:max_tokens])
+
+
+def generate_embedding(embedding_provider: EmbeddingProvider, text: str) -> list[float]:
     """
-    Generate an embedding for the given text using OpenAI's model.
+    Generate an embedding for the given text with the embedding provider.
     """
     logger.debug(f"Generating embedding for text: {text}")
-    try:
-        response = openai_client.embeddings.create(
-            input=[text],
-            model=embedding_model,
-            dimensions=embedding_dimension,
-        )
-        embedding: list[float] = response.data[0].embedding
-        return embedding
-    except Exception:
-        logger.error("Error generating embedding", exc_info=True)
-        raise
+    return embedding_provider.embed([text])[0]
@@ -1,51 +1,74 @@
 import hashlib
 import hmac
-from typing import cast
-
-import aws_encryption_sdk  # type: ignore
-import boto3  # type: ignore
-from aws_cryptographic_material_providers.mpl import (  # type: ignore
-    AwsCryptographicMaterialProviders,
-)
-from aws_cryptographic_material_providers.mpl.config import MaterialProvidersConfig  # type: ignore
-from aws_cryptographic_material_providers.mpl.models import CreateAwsKmsKeyringInput  # type: ignore
-from aws_cryptographic_material_providers.mpl.references import IKeyring  # type: ignore
-from aws_encryption_sdk import CommitmentPolicy
+from functools import cache
+from typing import TYPE_CHECKING, cast
 
 from aci.common import config
 
-client = aws_encryption_sdk.EncryptionSDKClient(
-    commitment_policy=CommitmentPolicy.REQUIRE_ENCRYPT_REQUIRE_DECRYPT
-)
+if TYPE_CHECKING:
+    import aws_encryption_sdk  # type: ignore
+    from aws_cryptographic_material_providers.mpl.references import IKeyring  # type: ignore
 
-kms_client = boto3.client(
-    "kms",
-    region_name=config.AWS_REGION,
-    endpoint_url=config.AWS_ENDPOINT_URL,
-)
 
+# NOTE: the encryption sdk, boto3 and the material providers are expensive to import and build
+# (~1s), and creating the keyring talks to KMS. They are created lazily on first use and cached
+# for the lifetime of the process, so that importing this module (e.g., as part of the sql models)
+# stays cheap and a KMS hiccup doesn't block the process from starting.
+@cache
+def _get_encryption_client() -> "aws_encryption_sdk.EncryptionSDKClient":
+    import aws_encryption_sdk
+    from aws_encryption_sdk import CommitmentPolicy
 
-mat_prov: AwsCryptographicMaterialProviders = AwsCryptographicMaterialProviders(
-    config=MaterialProvidersConfig()
-)
+    return aws_encryption_sdk.EncryptionSDKClient(
+        commitment_policy=CommitmentPolicy.REQUIRE_ENCRYPT_REQUIRE_DECRYPT
+    )
 
-keyring_input: CreateAwsKmsKeyringInput = CreateAwsKmsKeyringInput(
-    kms_key_id=config.KEY_ENCRYPTION_KEY_ARN,
-    kms_client=kms_client,
-)
 
-kms_keyring: IKeyring = mat_prov.create_aws_kms_keyring(input=keyring_input)
+@cache
+def _get_kms_keyring() -> "IKeyring":
+    import boto3  # type: ignore
+    from aws_cryptographic_material_providers.mpl import (  # type: ignore
+        AwsCryptographicMaterialProviders,
+    )
+    from aws_cryptographic_material_providers.mpl.config import (  # type: ignore
+        MaterialProvidersConfig,
+    )
+    from aws_cryptographic_material_providers.mpl.models import (  # type: ignore
+        CreateAwsKmsKeyringInput,
+    )
+
+    kms_client = boto3.client(
+        "kms",
+        region_name=config.AWS_REGION,
+        endpoint_url=config.AWS_ENDPOINT_URL,
+    )
+
+    mat_prov: AwsCryptographicMaterialProviders = AwsCryptographicMaterialProviders(
+        config=MaterialProvidersConfig()
+    )
+
+    keyring_input: CreateAwsKmsKeyringInput = CreateAwsKmsKeyringInput(
+        kms_key_id=config.KEY_ENCRYPTION_KEY_ARN,
+        kms_client=kms_client,
+    )
+
+    kms_keyring: IKeyring = mat_prov.create_aws_kms_keyring(input=keyring_input)
+    return kms_keyring
 
 
 def encrypt(plain_data: bytes) -> bytes:
     # TODO: ignore encryptor_header for now
-    my_ciphertext, _ = client.encrypt(source=plain_data, keyring=kms_keyring)
+    my_ciphertext, _ = _get_encryption_client().encrypt(
+        source=plain_data, keyring=_get_kms_keyring()
+    )
     return cast(bytes, my_ciphertext)
 
 
 def decrypt(cipher_data: bytes) -> bytes:
     # TODO: ignore decryptor_header for now
-    my_plaintext, _ = client.decrypt(source=cipher_data, keyring=kms_keyring)
+    my_plaintext, _ = _get_encryption_client().decrypt(
+        source=cipher_data, keyring=_get_kms_keyring()
+    )
     return cast(bytes, my_plaintext)
 
 
@@ -34,6 +34,76 @@ class Protocol(StrEnum):
     # GRPC = "grpc"
 
 
+class EmbeddingSearchMode(StrEnum):
+    """
+    how the similarity search of apps and functions finds the closest embeddings
+    """
+
+    # full precision distance to every candidate row
+    EXACT = "exact"
+    # candidates from an HNSW index on the half precision (float16) embeddings, re-ranked exactly
+    HALFVEC = "halfvec"
+    # candidates from an HNSW index on the binary quantized embeddings (hamming distance),
+    # re-ranked exactly
+    BINARY = "binary"
+
+
+class EmbeddingProviderType(StrEnum):
+    """
+    provider of the embeddings used for similarity search of apps and functions
+    """
+
+    OPENAI = "openai"
+    # runs the embedding model on CPU in the process itself, no external round trip
+    LOCAL = "local"
+
+
+class RateLimitBackendType(StrEnum):
+    """
+    storage of the rate limit state
+    """
+
+    # in-process, the limits are per worker process
+    MEMORY = "memory"
+    # shared by all worker processes (and server instances)
+    REDIS = "redis"
+
+
+class LogQueueDropPolicy(StrEnum):
+    """
+    what to do with a log record when the log queue is full
+    """
+
+    # discard the record being logged
+    DROP_NEWEST = "drop_newest"
+    # discard the oldest queued record to make room for the record being logged
+    DROP_OLDEST = "drop_oldest"
+    # wait for the queue to have room, which blocks the logging thread (e.g., the event loop)
+    BLOCK = "block"
+
+
+class RequestStage(StrEnum):
+    """
+    stage of a request that is timed, see aci.server.timing
+    """
+
+    API_KEY_LOOKUP = "api_key_lookup"
+    PROJECT_RATE_LIMIT = "project_rate_limit"
+    API_KEY_VALIDATION = "api_key_validation"
+    AGENT_LOOKUP = "agent_lookup"
+    PROJECT_QUOTA = "project_quota"
+    MONTHLY_QUOTA = "monthly_quota"
+    FUNCTION_LOOKUP = "function_lookup"
+    APP_CONFIGURATION_LOOKUP = "app_configuration_lookup"
+    LINKED_ACCOUNT_LOOKUP = "linked_account_lookup"
+    # includes the OAuth2 token refresh, if the access token expired
+    SECURITY_CREDENTIALS = "security_credentials"
+    CUSTOM_INSTRUCTIONS = "custom_instructions"
+    # the call of the function, e.g., the HTTP request to the app's API
+    UPSTREAM = "upstream"
+    LINKED_ACCOUNT_UPDATE = "linked_account_update"
+
+
 class HttpLocation(StrEnum):
     PATH = "path"
     QUERY = "query"
@@ -1,7 +1,109 @@
+import atexit
+import contextlib
+import copy
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-import logfire
+from aci.common.enums import LogQueueDropPolicy
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Puts log records on a bounded queue, for them to be filtered, formatted and written by the
+    handlers of a QueueListener on a background thread instead of the thread that logs (e.g., the
+    event loop).
+
+    Everything that depends on the logging thread is captured at enqueue time: the message is
+    rendered (its arguments might be mutated after the logging call returns) and the context
+    filters are applied, which copy context variables (e.g., the request ID) onto the record.
+
+    When the queue is full, the record is handled according to the drop policy. The number of
+    dropped records is reported by a warning record once the queue has room again.
+    """
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[logging.LogRecord]",
+        drop_policy: LogQueueDropPolicy,
+        context_filters: list[logging.Filter] | None = None,
+    ):
+        super().__init__(log_queue)
+        self.queue: queue.Queue[logging.LogRecord] = log_queue
+        self.drop_policy = drop_policy
+        self.context_filters = context_filters or []
+        # total number of dropped records, and the number of them that are not yet reported
+        self.dropped_count = 0
+        self._unreported_dropped_count = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # NOTE: unlike QueueHandler.prepare, the record is not formatted here, and the exception
+        # info is kept for the formatter of the listener's handlers. The record is copied, so the
+        # other handlers of the logger (e.g., logfire) see it unchanged.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        for context_filter in self.context_filters:
+            context_filter.filter(record)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # NOTE: called with the handler lock held, so the counters need no lock of their own
+        if not self._put(record):
+            self.dropped_count += 1
+            self._unreported_dropped_count += 1
+            return
+
+        if self._unreported_dropped_count:
+            warning = logging.LogRecord(
+                name=__name__,
+                level=logging.WARNING,
+                pathname=__file__,
+                lineno=0,
+                msg=f"dropped {self._unreported_dropped_count} log records, the log queue was full",
+                args=None,
+                exc_info=None,
+            )
+            with contextlib.suppress(queue.Full):
+                self.queue.put_nowait(warning)
+                self._unreported_dropped_count = 0
+
+    def _put(self, record: logging.LogRecord) -> bool:
+        """
+        Put the record on the queue according to the drop policy, return False if it was dropped.
+        """
+        if self.drop_policy == LogQueueDropPolicy.BLOCK:
+            self.queue.put(record)
+            return True
+
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            if self.drop_policy == LogQueueDropPolicy.DROP_NEWEST:
+                return False
+
+        # DROP_OLDEST, make room by dropping the oldest record (unless the listener made room in
+        # the meantime)
+        with contextlib.suppress(queue.Empty):
+            self.queue.get_nowait()
+            self.dropped_count += 1
+            self._unreported_dropped_count += 1
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
+
+
+class BoundedQueueListener(QueueListener):
+    """
+    QueueListener of a bounded queue, whose stop waits for room for the sentinel instead of raising
+    queue.Full.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)  # type: ignore[attr-defined]
 
 
 # the setup is called once at the start of the app
@@ -12,9 +114,20 @@ def setup_logging(
     include_file_handler: bool = False,
     file_path: str | None = None,
     environment: str = "local",
+    context_filters: list[logging.Filter] | None = None,
+    queue_max_size: int | None = None,
+    queue_drop_policy: LogQueueDropPolicy = LogQueueDropPolicy.DROP_NEWEST,
 ) -> None:
+    """
+    context_filters are filters that copy context variables onto the records, which must be
+    applied in the thread that logs. If queue_max_size is set, the records are handled by the
+    console and file handlers on a background thread, through a queue of at most queue_max_size
+    records (see BoundedQueueHandler), otherwise the handlers are called by the logging thread.
+    """
     if filters is None:
         filters = []
+    if context_filters is None:
+        context_filters = []
 
     if formatter is None:
         formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -22,13 +135,17 @@ def setup_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(level)  # Set the root logger level
 
+    # without a queue, the context filters are applied by the handlers like the other filters
+    handler_filters = filters if queue_max_size is not None else context_filters + filters
+    handlers: list[logging.Handler] = []
+
     # Create a console handler (for output to console)
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
     console_handler.setLevel(level)
-    for filter in filters:
+    for filter in handler_filters:
         console_handler.addFilter(filter)
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     if include_file_handler:
         if file_path is None:
@@ -36,11 +153,27 @@ def setup_logging(
         file_handler = RotatingFileHandler(file_path, maxBytes=10485760, backupCount=10)
         file_handler.setFormatter(formatter)
         file_handler.setLevel(level)
-        for filter in filters:
+        for filter in handler_filters:
             file_handler.addFilter(filter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    if queue_max_size is not None:
+        log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=queue_max_size)
+        root_logger.addHandler(BoundedQueueHandler(log_queue, queue_drop_policy, context_filters))
+        queue_listener = BoundedQueueListener(log_queue, *handlers, respect_handler_level=True)
+        queue_listener.start()
+        # flush the queued records at exit
+        atexit.register(queue_listener.stop)
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
 
     if environment != "local":
+        # imported lazily, logfire is expensive to import and only used outside of local environment
+        # NOTE: not behind the queue, logfire exports in the background itself and needs the
+        # (context variable based) tracing context of the logging thread
+        import logfire
+
         root_logger.addHandler(logfire.LogfireLoggingHandler())
 
     # Set up module-specific loggers if necessary (e.g., with different levels)
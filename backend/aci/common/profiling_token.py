@@ -0,0 +1,45 @@
+"""
+Signed tokens that enable the profiling of a request (see aci.server.middleware.profiling), sent in
+the X-ACI-Profile header.
+
+A token is "<expires_at>.<signature>", where expires_at is a unix timestamp in seconds and the
+signature is the hex HMAC-SHA256 of it with the profiling signing key, so a leaked token can only
+be used until it expires. Tokens that expire more than MAX_TTL_SECONDS from now are rejected, so a
+token can't be made (nearly) permanent.
+"""
+
+import hashlib
+import hmac
+import time
+
+_MESSAGE_PREFIX = "aci-profile:"
+
+MAX_TTL_SECONDS = 24 * 60 * 60
+
+
+def _sign(expires_at: int, signing_key: str) -> str:
+    return hmac.new(
+        signing_key.encode("utf-8"),
+        f"{_MESSAGE_PREFIX}{expires_at}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+
+def create_profiling_token(signing_key: str, ttl_seconds: int, now: float | None = None) -> str:
+    if not 0 < ttl_seconds <= MAX_TTL_SECONDS:
+        raise ValueError(f"ttl_seconds must be between 1 and {MAX_TTL_SECONDS}")
+    expires_at = int((time.time() if now is None else now) + ttl_seconds)
+    return f"{expires_at}.{_sign(expires_at, signing_key)}"
+
+
+def verify_profiling_token(token: str, signing_key: str, now: float | None = None) -> bool:
+    expires_at_str, _, signature = token.partition(".")
+    # NOTE: isdigit() alone also accepts non-ASCII digits such as "²", which int() rejects
+    if not (expires_at_str.isascii() and expires_at_str.isdigit()):
+        return False
+    expires_at = int(expires_at_str)
+    now = time.time() if now is None else now
+    if not now <= expires_at <= now + MAX_TTL_SECONDS:
+        return False
+    # compared as bytes since compare_digest raises TypeError on non-ASCII strings
+    return hmac.compare_digest(signature.encode(), _sign(expires_at, signing_key).encode())
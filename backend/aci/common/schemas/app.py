@@ -6,6 +6,7 @@ from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from aci.common.enums import SecurityScheme, Visibility
 from aci.common.schemas.function import BasicFunctionDefinition, FunctionDetails
+from aci.common.schemas.pagination import CursorOrOffsetPagination
 from aci.common.schemas.security_scheme import (
     APIKeyScheme,
     APIKeySchemeCredentials,
@@ -119,7 +120,7 @@ class AppsSearch(BaseModel):
         return v
 
 
-class AppsList(BaseModel):
+class AppsList(CursorOrOffsetPagination):
     """
     Parameters for listing Apps.
     """
@@ -128,7 +129,6 @@ class AppsList(BaseModel):
     limit: int = Field(
         default=100, ge=1, le=1000, description="Maximum number of Apps per response."
     )
-    offset: int = Field(default=0, ge=0, description="Pagination offset.")
 
 
 class AppBasic(BaseModel):
@@ -4,6 +4,10 @@ from uuid import UUID
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from aci.common.enums import SecurityScheme
+from aci.common.schemas.pagination import (
+    CREATED_AT_AND_ID_CURSOR_KEY_PARSERS,
+    CursorOrOffsetPagination,
+)
 from aci.common.schemas.security_scheme import SecuritySchemeOverrides
 
 
@@ -81,7 +85,9 @@ class AppConfigurationUpdate(BaseModel):
         return self
 
 
-class AppConfigurationsList(BaseModel):
+class AppConfigurationsList(CursorOrOffsetPagination):
+    CURSOR_KEY_PARSERS = CREATED_AT_AND_ID_CURSOR_KEY_PARSERS
+
     app_names: list[str] | None = Field(default=None, description="Filter by app names.")
     limit: int = Field(
         default=100,
@@ -89,4 +95,3 @@ class AppConfigurationsList(BaseModel):
         le=1000,
         description="Maximum number of results per response.",
     )
-    offset: int = Field(default=0, ge=0, description="Pagination offset.")
@@ -13,11 +13,21 @@ from aci.common.enums import (
     Protocol,
     Visibility,
 )
+from aci.common.schemas.pagination import CursorOrOffsetPagination
 from aci.common.validator import (
     validate_function_parameters_schema_common,
     validate_function_parameters_schema_rest_protocol,
 )
 
+# NOTE: jsonschema.validate() checks the schema it validates against before every validation, which
+# for the (static) meta schema is most of the cost of validating a function definition.
+_PARAMETERS_META_SCHEMA_VALIDATOR = jsonschema.Draft7Validator(
+    jsonschema.Draft7Validator.META_SCHEMA
+)
+
+# max number of intents of a batch search request
+MAX_BATCH_SEARCH_INTENTS = 32
+
 
 class RestMetadata(BaseModel):
     method: HttpMethod
@@ -49,7 +59,7 @@ class FunctionUpsert(BaseModel):
     @model_validator(mode="after")
     def validate_parameters(self) -> "FunctionUpsert":
         # Validate that parameters schema itself is a valid JSON Schema
-        jsonschema.validate(instance=self.parameters, schema=jsonschema.Draft7Validator.META_SCHEMA)
+        _PARAMETERS_META_SCHEMA_VALIDATOR.validate(self.parameters)
 
         # common validation
         validate_function_parameters_schema_common(self.parameters, f"{self.name}.parameters")
@@ -94,7 +104,7 @@ class FunctionEmbeddingFields(BaseModel):
     parameters: dict
 
 
-class FunctionsList(BaseModel):
+class FunctionsList(CursorOrOffsetPagination):
     app_names: list[str] | None = Field(
         default=None, description="List of app names for filtering functions."
     )
@@ -104,7 +114,6 @@ class FunctionsList(BaseModel):
         le=1000,
         description="Maximum number of Functions per response.",
     )
-    offset: int = Field(default=0, ge=0, description="Pagination offset.")
 
 
 class FunctionsSearch(BaseModel):
@@ -149,6 +158,44 @@ class FunctionsSearch(BaseModel):
         return v
 
 
+class FunctionsBatchSearch(BaseModel):
+    intents: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SEARCH_INTENTS,
+        description="Natural language intents, the functions of each intent are sorted by relevance to it.",
+    )
+    app_names: list[str] | None = Field(
+        default=None,
+        description="List of app names for filtering functions.",
+    )
+    allowed_only: bool = Field(
+        default=False,
+        description="If true, only returns functions that are enabled and only from the allowed apps of the agent/accessor, identified by the api key.",
+    )
+    format: FunctionDefinitionFormat = Field(
+        default=FunctionDefinitionFormat.BASIC,
+        description="The format of the function definition to return. e.g., 'openai', 'anthropic' or 'basic' which only returns name and description.",
+    )
+    limit: int = Field(
+        default=10, ge=1, le=100, description="Maximum number of Functions per intent."
+    )
+    offset: int = Field(default=0, ge=0, description="Pagination offset, per intent.")
+
+    @field_validator("intents")
+    def validate_intents(cls, v: list[str]) -> list[str]:
+        if any(intent.strip() == "" for intent in v):
+            raise ValueError("intents must not be empty")
+        return v
+
+    @field_validator("app_names")
+    def validate_app_names(cls, v: list[str] | None) -> list[str] | None:
+        # remove empty strings
+        if v is not None:
+            v = [app_name for app_name in v if app_name.strip()]
+        return v
+
+
 class FunctionExecute(BaseModel):
     function_input: dict = Field(
         default_factory=dict, description="The input parameters for the function."
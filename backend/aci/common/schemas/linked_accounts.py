@@ -4,6 +4,10 @@ from uuid import UUID
 from pydantic import BaseModel, ConfigDict, Field
 
 from aci.common.db.sql_models import MAX_STRING_LENGTH, SecurityScheme
+from aci.common.schemas.pagination import (
+    CREATED_AT_AND_ID_CURSOR_KEY_PARSERS,
+    CursorPagination,
+)
 from aci.common.schemas.security_scheme import (
     APIKeySchemeCredentialsLimited,
     NoAuthSchemeCredentialsLimited,
@@ -71,6 +75,15 @@ class LinkedAccountWithCredentials(LinkedAccountPublic):
     )
 
 
-class LinkedAccountsList(BaseModel):
+class LinkedAccountsList(CursorPagination):
+    CURSOR_KEY_PARSERS = CREATED_AT_AND_ID_CURSOR_KEY_PARSERS
+
     app_name: str | None = None
     linked_account_owner_id: str | None = None
+    # NOTE: no limit by default (returns all linked accounts) for backward compatibility
+    limit: int | None = Field(
+        default=None,
+        ge=1,
+        le=1000,
+        description="Maximum number of linked accounts per response. All if not set.",
+    )
@@ -0,0 +1,57 @@
+from collections.abc import Callable
+from datetime import datetime
+from typing import ClassVar
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from aci.common import utils
+
+# cursor of the (created_at, id) of the last item of the previous page
+CREATED_AT_AND_ID_CURSOR_KEY_PARSERS: tuple[Callable[[str], object], ...] = (
+    datetime.fromisoformat,
+    UUID,
+)
+
+
+class CursorPagination(BaseModel):
+    """
+    Cursor (keyset) pagination of list parameters, see utils.encode_cursor.
+    Subclasses set CURSOR_KEY_PARSERS to the parsers of the keys their cursor is made of, e.g.,
+    (str,) for a cursor of names, the default, or CREATED_AT_AND_ID_CURSOR_KEY_PARSERS.
+    """
+
+    CURSOR_KEY_PARSERS: ClassVar[tuple[Callable[[str], object], ...]] = (str,)
+
+    cursor: str | None = Field(
+        default=None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous response, to get the next page.",
+    )
+
+    @field_validator("cursor")
+    def validate_cursor(cls, v: str | None) -> str | None:
+        # NOTE: an empty cursor (e.g., "?cursor=" sent by clients serializing None) means no cursor
+        if not v:
+            return None
+        keys = utils.decode_cursor(v, len(cls.CURSOR_KEY_PARSERS))
+        for parse_key, key in zip(cls.CURSOR_KEY_PARSERS, keys, strict=True):
+            parse_key(key)
+        return v
+
+
+class CursorOrOffsetPagination(CursorPagination):
+    """
+    Cursor pagination that also supports the (legacy) offset pagination, one at a time.
+    """
+
+    offset: int = Field(default=0, ge=0, description="Pagination offset.")
+    cursor: str | None = Field(
+        default=None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous response, to get the next page. Cannot be combined with offset.",
+    )
+
+    @model_validator(mode="after")
+    def check_cursor_and_offset(self) -> "CursorOrOffsetPagination":
+        if self.cursor is not None and self.offset != 0:
+            raise ValueError("cursor and offset cannot be used together")
+        return self
@@ -1,9 +1,14 @@
 import logging
-from collections.abc import Generator
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import Any
 
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 
 from aci.common import utils
+from aci.common.db import catalog_version
 from aci.common.db.sql_models import Base
 from aci.server import config
 
@@ -12,12 +17,17 @@ logger = logging.getLogger(__name__)
 
 def clear_database(db_session: Session) -> None:
     """
-    Clear all tables in the database except alembic_version.
+    Clear all tables in the database except alembic_version and catalog_versions (the catalog
+    version must only ever increase, see catalog_version).
     """
     for table in reversed(Base.metadata.sorted_tables):
-        if table.name != "alembic_version" and db_session.query(table).count() > 0:
+        if (
+            table.name not in ("alembic_version", "catalog_versions")
+            and db_session.query(table).count() > 0
+        ):
             logger.debug(f"Deleting all records from table {table.name}")
             db_session.execute(table.delete())
+    catalog_version.mark_catalog_changed(db_session)
     db_session.commit()
 
 
@@ -32,3 +42,53 @@ def create_test_db_session() -> Generator[Session, None, None]:
 
     with utils.create_db_session(config.DB_FULL_URL) as session:
         yield session
+
+
+@contextmanager
+def capture_sql_statements(db_session: Session) -> Generator[list[str], None, None]:
+    """
+    Capture the SQL statements executed on the engine of the db session within the context.
+    The engine is shared (cached) across sessions, so statements executed by the server while
+    handling requests are captured as well.
+    """
+    statements: list[str] = []
+    with _on_sql_statement(db_session, lambda statement, _: statements.append(statement)):
+        yield statements
+
+
+@contextmanager
+def capture_sql_statements_with_parameters(
+    db_session: Session,
+) -> Generator[list[tuple[str, Any]], None, None]:
+    """
+    Like capture_sql_statements, with the (DBAPI) parameters of every statement, e.g., to EXPLAIN
+    the captured statements.
+    """
+    statements: list[tuple[str, Any]] = []
+    with _on_sql_statement(
+        db_session, lambda statement, parameters: statements.append((statement, parameters))
+    ):
+        yield statements
+
+
+@contextmanager
+def _on_sql_statement(
+    db_session: Session, callback: Callable[[str, Any], None]
+) -> Generator[None, None, None]:
+    engine = db_session.get_bind()
+
+    def _before_cursor_execute(
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        callback(statement, parameters)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
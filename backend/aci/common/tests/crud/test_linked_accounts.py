@@ -62,3 +62,36 @@ def test_update_linked_account_credentials(
         mock_linked_account.security_credentials = credentials.model_dump(mode="json")
         mock_db_session.flush.assert_called_once()
         mock_db_session.refresh.assert_called_once_with(mock_linked_account)
+
+
+@pytest.mark.parametrize(
+    "security_scheme, credentials, expected_access_token_expires_at",
+    [
+        (
+            SecurityScheme.OAUTH2,
+            OAuth2SchemeCredentials(
+                client_id="test",
+                client_secret="test",
+                scope="test_scope_1 test_scope_2",
+                access_token="test",
+                expires_at=1_700_000_000,
+                refresh_token="test",
+            ),
+            1_700_000_000,
+        ),
+        (SecurityScheme.API_KEY, APIKeySchemeCredentials(secret_key="test"), None),
+    ],
+)
+def test_update_linked_account_credentials_syncs_access_token_expires_at(
+    security_scheme: SecurityScheme,
+    credentials: OAuth2SchemeCredentials | APIKeySchemeCredentials,
+    expected_access_token_expires_at: int | None,
+) -> None:
+    mock_linked_account = MagicMock()
+    mock_linked_account.security_scheme = security_scheme
+
+    crud.linked_accounts.update_linked_account_credentials(
+        MagicMock(), mock_linked_account, credentials
+    )
+
+    assert mock_linked_account.access_token_expires_at == expected_access_token_expires_at
@@ -0,0 +1,104 @@
+import sys
+from collections.abc import Iterator
+from types import ModuleType, SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from aci.common.embedding_providers import (
+    LocalEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    create_embedding_provider,
+    local_embedding_provider,
+    openai_embedding_provider,
+)
+from aci.common.enums import EmbeddingProviderType
+
+
+class _FakeTextEmbedding:
+    """
+    Stand-in for fastembed.TextEmbedding (which downloads and runs the actual model), the
+    embedding of a text is its length, repeated.
+    """
+
+    instances: list["_FakeTextEmbedding"] = []
+
+    def __init__(self, model_name: str, dimension: int):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.batch_sizes: list[int] = []
+        _FakeTextEmbedding.instances.append(self)
+
+    def embed(self, documents: list[str], batch_size: int) -> Iterator[SimpleNamespace]:
+        self.batch_sizes.append(batch_size)
+        for document in documents:
+            embedding = [float(len(document))] * self.dimension
+            # like the numpy arrays fastembed yields
+            yield SimpleNamespace(tolist=lambda embedding=embedding: embedding)
+
+
+@pytest.fixture
+def fake_fastembed(monkeypatch: pytest.MonkeyPatch) -> type[_FakeTextEmbedding]:
+    """
+    Installs a fake fastembed module whose model has embeddings of 3 dimensions, fastembed is an
+    optional dependency.
+    """
+    _FakeTextEmbedding.instances = []
+    fastembed = ModuleType("fastembed")
+    fastembed.TextEmbedding = lambda model_name: _FakeTextEmbedding(model_name, 3)  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "fastembed", fastembed)
+    return _FakeTextEmbedding
+
+
+def test_openai_embedding_provider_batches_and_keeps_input_order(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(openai_embedding_provider, "OPENAI_EMBEDDING_BATCH_SIZE", 2)
+
+    def create(input: list[str], model: str, dimensions: int) -> SimpleNamespace:
+        # return the embeddings out of order, each one encodes its input text
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=i, embedding=[float(text)] * dimensions)
+                for i, text in reversed(list(enumerate(input)))
+            ]
+        )
+
+    openai_client = MagicMock()
+    openai_client.embeddings.create.side_effect = create
+    provider = OpenAIEmbeddingProvider(openai_client, "text-embedding-3-small", 3)
+
+    embeddings = provider.embed(["0", "1", "2", "3", "4"])
+
+    assert embeddings == [[float(i)] * 3 for i in range(5)]
+    assert openai_client.embeddings.create.call_count == 3
+    assert provider.model_id == "openai/text-embedding-3-small"
+
+
+def test_local_embedding_provider_loads_model_once_on_first_use(
+    fake_fastembed: type[_FakeTextEmbedding],
+) -> None:
+    provider = create_embedding_provider(EmbeddingProviderType.LOCAL, "BAAI/bge-large-en-v1.5", 3)
+
+    assert isinstance(provider, LocalEmbeddingProvider)
+    assert provider.model_id == "local/BAAI/bge-large-en-v1.5"
+    assert fake_fastembed.instances == []
+
+    assert provider.embed(["a", "bb"]) == [[1.0] * 3, [2.0] * 3]
+    assert provider.embed(["ccc"]) == [[3.0] * 3]
+
+    assert len(fake_fastembed.instances) == 1
+    assert fake_fastembed.instances[0].model_name == "BAAI/bge-large-en-v1.5"
+    assert (
+        fake_fastembed.instances[0].batch_sizes
+        == [local_embedding_provider.LOCAL_EMBEDDING_BATCH_SIZE] * 2
+    )
+
+
+def test_local_embedding_provider_rejects_dimension_mismatch(
+    fake_fastembed: type[_FakeTextEmbedding],
+) -> None:
+    provider = LocalEmbeddingProvider("BAAI/bge-large-en-v1.5", 1024)
+
+    with pytest.raises(ValueError, match="dimension mismatch"):
+        provider.embed(["a"])
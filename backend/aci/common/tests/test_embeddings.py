@@ -0,0 +1,119 @@
+from aci.common import embeddings
+from aci.common.schemas.function import FunctionEmbeddingFields
+
+
+def _function_embedding_fields(parameters: dict) -> FunctionEmbeddingFields:
+    return FunctionEmbeddingFields(
+        name="GITHUB__CREATE_REPOSITORY",
+        description="Create a new repository for the authenticated user.",
+        parameters=parameters,
+    )
+
+
+def test_build_function_embedding_text() -> None:
+    parameters = {
+        "type": "object",
+        "properties": {
+            "body": {
+                "type": "object",
+                "description": "body parameters",
+                "properties": {
+                    "name": {"type": "string", "description": "The name of the repository."},
+                    "topics": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {"topic": {"type": "string", "description": "A topic."}},
+                        },
+                    },
+                },
+                "required": ["name"],
+                "visible": ["name", "topics"],
+                "additionalProperties": False,
+            },
+        },
+        "required": ["body"],
+        "visible": ["body"],
+        "additionalProperties": False,
+    }
+
+    text = embeddings.build_function_embedding_text(_function_embedding_fields(parameters))
+
+    assert text == "\n".join(
+        [
+            "GITHUB__CREATE_REPOSITORY",
+            "Create a new repository for the authenticated user.",
+            "body: body parameters",
+            "body.name: The name of the repository.",
+            "body.topics",
+            "body.topics[].topic: A topic.",
+        ]
+    )
+
+
+def test_build_function_embedding_text_has_top_level_parameters_first() -> None:
+    parameters = {
+        "type": "object",
+        "properties": {
+            "body": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "The name of the repository."},
+                },
+            },
+            "query": {
+                "type": "object",
+                "properties": {
+                    "visibility": {"type": "string", "description": "The visibility."},
+                },
+            },
+            "owner": {"type": "string", "description": "The account owner."},
+        },
+    }
+
+    text = embeddings.build_function_embedding_text(_function_embedding_fields(parameters))
+
+    assert text.splitlines()[2:] == [
+        "body",
+        "owner: The account owner.",
+        "query",
+        "body.name: The name of the repository.",
+        "query.visibility: The visibility.",
+    ]
+
+
+def test_build_function_embedding_text_is_independent_of_key_order() -> None:
+    properties = {
+        "owner": {"type": "string", "description": "The account owner."},
+        "repo": {"type": "string", "description": "The name of the repository."},
+    }
+    parameters = {"type": "object", "properties": properties}
+    reordered_parameters = {"properties": dict(reversed(properties.items())), "type": "object"}
+
+    assert embeddings.build_function_embedding_text(
+        _function_embedding_fields(parameters)
+    ) == embeddings.build_function_embedding_text(_function_embedding_fields(reordered_parameters))
+    assert embeddings.get_function_embedding_text_hash(
+        _function_embedding_fields(parameters)
+    ) == embeddings.get_function_embedding_text_hash(
+        _function_embedding_fields(reordered_parameters)
+    )
+
+
+def test_build_function_embedding_text_is_trimmed_to_token_budget() -> None:
+    parameters = {
+        "type": "object",
+        "properties": {
+            f"parameter_{i}": {"type": "string", "description": f"description of parameter {i}"}
+            for i in range(1000)
+        },
+    }
+    function = _function_embedding_fields(parameters)
+
+    text = embeddings.build_function_embedding_text(function, max_tokens=50)
+    full_text = embeddings.build_function_embedding_text(function, max_tokens=100_000)
+
+    assert full_text.startswith(text)
+    assert len(text) < len(full_text)
+    # the most relevant parts come first and are kept
+    assert text.startswith(f"{function.name}\n{function.description}\n")
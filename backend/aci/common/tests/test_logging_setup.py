@@ -0,0 +1,105 @@
+import logging
+import queue
+from contextvars import ContextVar
+
+from aci.common.enums import LogQueueDropPolicy
+from aci.common.logging_setup import BoundedQueueHandler, BoundedQueueListener
+
+_request_id_ctx_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+class _RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.__dict__["request_id"] = _request_id_ctx_var.get()
+        return True
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _create_logger(handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"{__name__}.{id(handler)}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return logger
+
+
+def test_records_are_handled_by_the_listener_with_context_captured_at_enqueue() -> None:
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=10)
+    queue_handler = BoundedQueueHandler(
+        log_queue, LogQueueDropPolicy.DROP_NEWEST, context_filters=[_RequestIdFilter()]
+    )
+    recording_handler = _RecordingHandler()
+    listener = BoundedQueueListener(log_queue, recording_handler)
+    logger = _create_logger(queue_handler)
+
+    arguments = {"status": "pending"}
+    token = _request_id_ctx_var.set("request-1")
+    logger.info("processing %s", arguments)
+    _request_id_ctx_var.reset(token)
+    # the message is rendered at enqueue time
+    arguments["status"] = "done"
+
+    listener.start()
+    listener.stop()
+
+    assert len(recording_handler.records) == 1
+    record = recording_handler.records[0]
+    assert record.getMessage() == "processing {'status': 'pending'}"
+    assert record.__dict__["request_id"] == "request-1"
+
+
+def test_drop_newest_drops_records_logged_while_the_queue_is_full() -> None:
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=2)
+    queue_handler = BoundedQueueHandler(log_queue, LogQueueDropPolicy.DROP_NEWEST)
+    logger = _create_logger(queue_handler)
+
+    for i in range(5):
+        logger.info("record %d", i)
+
+    assert queue_handler.dropped_count == 3
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["record 0", "record 1"]
+
+    # the drops are reported once the queue has room again
+    logger.info("record 5")
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == [
+        "record 5",
+        "dropped 3 log records, the log queue was full",
+    ]
+
+
+def test_drop_oldest_keeps_the_newest_records() -> None:
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=2)
+    queue_handler = BoundedQueueHandler(log_queue, LogQueueDropPolicy.DROP_OLDEST)
+    logger = _create_logger(queue_handler)
+
+    for i in range(5):
+        logger.info("record %d", i)
+
+    assert queue_handler.dropped_count == 3
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["record 3", "record 4"]
+
+
+def test_stop_handles_the_queued_records() -> None:
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=2)
+    queue_handler = BoundedQueueHandler(log_queue, LogQueueDropPolicy.BLOCK)
+    recording_handler = _RecordingHandler()
+    listener = BoundedQueueListener(log_queue, recording_handler)
+    logger = _create_logger(queue_handler)
+
+    logger.info("record 0")
+    logger.info("record 1")
+    listener.start()
+    listener.stop()
+
+    assert [record.getMessage() for record in recording_handler.records] == [
+        "record 0",
+        "record 1",
+    ]
@@ -0,0 +1,33 @@
+import pytest
+
+from aci.common.profiling_token import (
+    MAX_TTL_SECONDS,
+    create_profiling_token,
+    verify_profiling_token,
+)
+
+SIGNING_KEY = "signing_key"
+NOW = 1_800_000_000
+
+
+def test_verify_profiling_token() -> None:
+    token = create_profiling_token(SIGNING_KEY, ttl_seconds=60, now=NOW)
+
+    assert verify_profiling_token(token, SIGNING_KEY, now=NOW)
+    assert not verify_profiling_token(token, "wrong_signing_key", now=NOW)
+    assert not verify_profiling_token(token, SIGNING_KEY, now=NOW + 61)
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "not a token",
+        f"{NOW + 2 * MAX_TTL_SECONDS}.x",
+        # non-ASCII digits pass str.isdigit() but not int()
+        "².x",
+        f"{NOW + 60}.é",
+    ],
+)
+def test_verify_malformed_profiling_token(token: str) -> None:
+    assert not verify_profiling_token(token, SIGNING_KEY, now=NOW)
@@ -1,8 +1,14 @@
+import base64
+import binascii
+import hashlib
+import json
 import os
 import re
+import statistics
 from functools import cache
 from uuid import UUID
 
+from pydantic import BaseModel
 from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -97,3 +103,51 @@ def is_uuid(value: str | UUID) -> bool:
         return True
     except ValueError:
         return False
+
+
+def encode_cursor(keys: list[str]) -> str:
+    """
+    Encode the keyset pagination keys (e.g., [name] or [created_at, id]) of the last item of a page
+    into an opaque cursor that can be passed back to get the next page.
+    """
+    return base64.urlsafe_b64encode(json.dumps(keys).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, num_keys: int) -> list[str]:
+    """
+    Decode a cursor created by encode_cursor back into the keyset pagination keys.
+    Raises ValueError if the cursor is malformed or doesn't have num_keys keys.
+    """
+    try:
+        keys = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+
+    if (
+        not isinstance(keys, list)
+        or len(keys) != num_keys
+        or not all(isinstance(key, str) for key in keys)
+    ):
+        raise ValueError("invalid cursor")
+    return keys
+
+
+def compute_content_hash(model: BaseModel) -> str:
+    """
+    Compute a stable sha256 hex digest of a pydantic model's content (key order independent),
+    used to detect if an app or function definition changed since it was last upserted.
+    """
+    content = json.dumps(model.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def percentile(values: list[float], percentile: int) -> float:
+    """
+    The percentile (1-99) of the values, interpolated between them, e.g., of request latencies.
+    Returns 0 for no values.
+    """
+    if not values:
+        return 0.0
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percentile - 1]
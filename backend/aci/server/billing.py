@@ -22,10 +22,12 @@ def get_active_plan_by_org_id(db_session: Session, org_id: UUID) -> Plan:
     return active_plan
 
 
-def increment_quota(db_session: Session, project: Project, monthly_quota_limit: int) -> None:
-    """Increment quota usage or raise error if limit exceeded."""
+def increment_quota(
+    db_session: Session, project: Project, monthly_quota_limit: int, amount: int = 1
+) -> None:
+    """Increment quota usage by amount or raise error if limit exceeded."""
     success = crud.projects.increment_api_monthly_quota_usage(
-        db_session, project, monthly_quota_limit
+        db_session, project, monthly_quota_limit, amount
     )
 
     if not success:
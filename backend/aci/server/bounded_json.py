@@ -0,0 +1,114 @@
+"""
+JSON encoding of log fields, bounded in size.
+
+The encoder writes the JSON text of a value incrementally and stops as soon as it exceeds the
+size limit, so that a large value (e.g., a multi-megabyte function execution result) costs about
+as much to log as a value of the size limit, instead of being encoded completely only for most
+of the text to be cut off.
+
+Up to the size limit, the output is the same as json.dumps(value, default=str), and pydantic
+models are encoded as their JSON mode dump.
+"""
+
+import json
+import math
+from typing import Any
+
+from pydantic import BaseModel
+
+# the truncated text keeps max_size - TRUNCATION_MARGIN bytes, to leave room for the suffix
+TRUNCATION_MARGIN = 100
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+
+class _SizeLimitReachedError(Exception):
+    pass
+
+
+class _BoundedWriter:
+    def __init__(self, max_size: int):
+        self.parts: list[str] = []
+        # NOTE: the output is ASCII only (non-ASCII characters are escaped), so the number of
+        # characters is the number of bytes
+        self.remaining = max_size
+
+    def write(self, text: str) -> None:
+        self.parts.append(text)
+        self.remaining -= len(text)
+        if self.remaining < 0:
+            raise _SizeLimitReachedError()
+
+    def write_value(self, value: Any) -> None:
+        if isinstance(value, str):
+            # only the part of the string that can fit is encoded (escaping only makes it longer)
+            self.write(_encode_string(value[: self.remaining + 1]))
+        elif value is None:
+            self.write("null")
+        elif value is True:
+            self.write("true")
+        elif value is False:
+            self.write("false")
+        elif isinstance(value, int):
+            self.write(int.__repr__(value))
+        elif isinstance(value, float):
+            self.write(_float_to_str(value))
+        elif isinstance(value, dict):
+            self._write_dict(value)
+        elif isinstance(value, list | tuple):
+            self._write_list(value)
+        elif isinstance(value, BaseModel):
+            self.write_value(value.model_dump(mode="json"))
+        else:
+            self.write_value(str(value))
+
+    def _write_dict(self, value: dict) -> None:
+        self.write("{")
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                self.write(", ")
+            self.write(_encode_string(_key_to_str(key)[: self.remaining + 1]))
+            self.write(": ")
+            self.write_value(item)
+        self.write("}")
+
+    def _write_list(self, value: list | tuple) -> None:
+        self.write("[")
+        for i, item in enumerate(value):
+            if i:
+                self.write(", ")
+            self.write_value(item)
+        self.write("]")
+
+
+def _float_to_str(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "Infinity" if value > 0 else "-Infinity"
+    return float.__repr__(value)
+
+
+def _key_to_str(key: Any) -> str:
+    # same conversion of keys as json.dumps, other types of keys are converted with str
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, bool | int | float):
+        return json.dumps(key)
+    return str(key)
+
+
+def dumps_bounded(value: Any, max_size: int) -> str:
+    """
+    Encode the value as JSON text of at most max_size bytes. If the JSON text is larger, it is
+    truncated and marked as such.
+    """
+    writer = _BoundedWriter(max_size)
+    try:
+        writer.write_value(value)
+    except _SizeLimitReachedError:
+        return (
+            "".join(writer.parts)[: max_size - TRUNCATION_MARGIN]
+            + f"... [truncated, size>{max_size}]"
+        )
+    return "".join(writer.parts)
@@ -1,3 +1,9 @@
+from aci.common.enums import (
+    EmbeddingProviderType,
+    EmbeddingSearchMode,
+    LogQueueDropPolicy,
+    RateLimitBackendType,
+)
 from aci.common.utils import check_and_get_env_variable, construct_db_url
 
 ENVIRONMENT = check_and_get_env_variable("SERVER_ENVIRONMENT")
@@ -6,6 +12,36 @@ ENVIRONMENT = check_and_get_env_variable("SERVER_ENVIRONMENT")
 OPENAI_API_KEY = check_and_get_env_variable("SERVER_OPENAI_API_KEY")
 OPENAI_EMBEDDING_MODEL = check_and_get_env_variable("SERVER_OPENAI_EMBEDDING_MODEL")
 OPENAI_EMBEDDING_DIMENSION = int(check_and_get_env_variable("SERVER_OPENAI_EMBEDDING_DIMENSION"))
+# "openai" or "local" (LOCAL_EMBEDDING_MODEL runs on CPU in the server process, the dimension of
+# its embeddings must match OPENAI_EMBEDDING_DIMENSION)
+EMBEDDING_PROVIDER = EmbeddingProviderType(check_and_get_env_variable("SERVER_EMBEDDING_PROVIDER"))
+LOCAL_EMBEDDING_MODEL = check_and_get_env_variable("SERVER_LOCAL_EMBEDDING_MODEL")
+EMBEDDING_MODEL = (
+    LOCAL_EMBEDDING_MODEL
+    if EMBEDDING_PROVIDER == EmbeddingProviderType.LOCAL
+    else OPENAI_EMBEDDING_MODEL
+)
+# "exact", or "halfvec" / "binary" to take the search candidates from the half precision / binary
+# quantized HNSW index and re-rank them exactly (requires pgvector >= 0.8.0, for iterative index
+# scans)
+EMBEDDING_SEARCH_MODE = EmbeddingSearchMode(
+    check_and_get_env_variable("SERVER_EMBEDDING_SEARCH_MODE")
+)
+# concurrent intent embeddings are collected for up to EMBEDDING_BATCH_MAX_WAIT_SECONDS (or until
+# EMBEDDING_BATCH_MAX_SIZE intents) and embedded in one batch
+EMBEDDING_BATCH_MAX_SIZE = int(check_and_get_env_variable("SERVER_EMBEDDING_BATCH_MAX_SIZE"))
+EMBEDDING_BATCH_MAX_WAIT_SECONDS = (
+    int(check_and_get_env_variable("SERVER_EMBEDDING_BATCH_MAX_WAIT_MS")) / 1000
+)
+# results of repeated function searches are cached (per worker process) until the catalog changes
+# (see aci.common.db.catalog_version) or for at most FUNCTION_SEARCH_CACHE_TTL_SECONDS, 0 max size
+# disables the cache
+FUNCTION_SEARCH_CACHE_MAX_SIZE = int(
+    check_and_get_env_variable("SERVER_FUNCTION_SEARCH_CACHE_MAX_SIZE")
+)
+FUNCTION_SEARCH_CACHE_TTL_SECONDS = int(
+    check_and_get_env_variable("SERVER_FUNCTION_SEARCH_CACHE_TTL_SECONDS")
+)
 
 # JWT
 SIGNING_KEY = check_and_get_env_variable("SERVER_SIGNING_KEY")
@@ -19,6 +55,31 @@ COOKIE_KEY_FOR_AUTH_TOKEN = "accessToken"
 # Google Auth
 GOOGLE_AUTH_CLIENT_SCOPE = "openid email profile"
 
+# OAUTH2 ACCESS TOKENS (see aci.server.security_credentials_manager)
+# access tokens expiring within OAUTH2_ACCESS_TOKEN_EXPIRY_LEEWAY_SECONDS are refreshed before use,
+# concurrent requests wait up to OAUTH2_REFRESH_LOCK_TIMEOUT_SECONDS for the one refreshing it
+OAUTH2_ACCESS_TOKEN_EXPIRY_LEEWAY_SECONDS = int(
+    check_and_get_env_variable("SERVER_OAUTH2_ACCESS_TOKEN_EXPIRY_LEEWAY_SECONDS")
+)
+OAUTH2_REFRESH_LOCK_TIMEOUT_SECONDS = float(
+    check_and_get_env_variable("SERVER_OAUTH2_REFRESH_LOCK_TIMEOUT_SECONDS")
+)
+# every OAUTH2_TOKEN_RENEWAL_INTERVAL_SECONDS, every server process renews (up to
+# OAUTH2_TOKEN_RENEWAL_BATCH_SIZE) access tokens expiring within OAUTH2_TOKEN_RENEWAL_WINDOW_SECONDS
+# in the background (see aci.server.oauth2_token_renewer), so that requests don't wait on a refresh
+OAUTH2_TOKEN_RENEWAL_ENABLED = (
+    check_and_get_env_variable("SERVER_OAUTH2_TOKEN_RENEWAL_ENABLED").lower() == "true"
+)
+OAUTH2_TOKEN_RENEWAL_INTERVAL_SECONDS = float(
+    check_and_get_env_variable("SERVER_OAUTH2_TOKEN_RENEWAL_INTERVAL_SECONDS")
+)
+OAUTH2_TOKEN_RENEWAL_WINDOW_SECONDS = int(
+    check_and_get_env_variable("SERVER_OAUTH2_TOKEN_RENEWAL_WINDOW_SECONDS")
+)
+OAUTH2_TOKEN_RENEWAL_BATCH_SIZE = int(
+    check_and_get_env_variable("SERVER_OAUTH2_TOKEN_RENEWAL_BATCH_SIZE")
+)
+
 DB_SCHEME = check_and_get_env_variable("SERVER_DB_SCHEME")
 DB_USER = check_and_get_env_variable("SERVER_DB_USER")
 DB_PASSWORD = check_and_get_env_variable("SERVER_DB_PASSWORD")
@@ -38,6 +99,22 @@ SVIX_SIGNING_SECRET = check_and_get_env_variable("SERVER_SVIX_SIGNING_SECRET")
 # RATE LIMITS
 RATE_LIMIT_IP_PER_SECOND = int(check_and_get_env_variable("SERVER_RATE_LIMIT_IP_PER_SECOND"))
 RATE_LIMIT_IP_PER_DAY = int(check_and_get_env_variable("SERVER_RATE_LIMIT_IP_PER_DAY"))
+RATE_LIMIT_API_KEY_PER_SECOND = int(
+    check_and_get_env_variable("SERVER_RATE_LIMIT_API_KEY_PER_SECOND")
+)
+RATE_LIMIT_API_KEY_PER_DAY = int(check_and_get_env_variable("SERVER_RATE_LIMIT_API_KEY_PER_DAY"))
+RATE_LIMIT_PROJECT_PER_SECOND = int(
+    check_and_get_env_variable("SERVER_RATE_LIMIT_PROJECT_PER_SECOND")
+)
+RATE_LIMIT_PROJECT_PER_DAY = int(check_and_get_env_variable("SERVER_RATE_LIMIT_PROJECT_PER_DAY"))
+# "memory" keeps the rate limit state per worker process, "redis" shares it between workers
+# (at RATE_LIMIT_REDIS_URL, requires the "redis" extra)
+RATE_LIMIT_BACKEND = RateLimitBackendType(check_and_get_env_variable("SERVER_RATE_LIMIT_BACKEND"))
+RATE_LIMIT_REDIS_URL = check_and_get_env_variable("SERVER_RATE_LIMIT_REDIS_URL")
+# how long API keys that were not found are rejected without looking them up again
+INVALID_API_KEY_CACHE_TTL_SECONDS = int(
+    check_and_get_env_variable("SERVER_INVALID_API_KEY_CACHE_TTL_SECONDS")
+)
 
 # QUOTA
 PROJECT_DAILY_QUOTA = int(check_and_get_env_variable("SERVER_PROJECT_DAILY_QUOTA"))
@@ -65,6 +142,8 @@ ROUTER_PREFIX_WEBHOOKS = "/v1/webhooks"
 ROUTER_PREFIX_BILLING = "/v1/billing"
 ROUTER_PREFIX_ORGANIZATIONS = "/v1/organizations"
 ROUTER_PREFIX_DOCS = "/v1/docs"
+# unversioned, the conventional path of Prometheus metrics
+ROUTER_PREFIX_METRICS = "/metrics"
 
 # DEV PORTAL
 DEV_PORTAL_URL = check_and_get_env_variable("SERVER_DEV_PORTAL_URL")
@@ -80,9 +159,35 @@ STRIPE_WEBHOOK_SIGNING_SECRET = check_and_get_env_variable("SERVER_STRIPE_WEBHOO
 # HEADERS
 ACI_ORG_ID_HEADER = "X-ACI-ORG-ID"
 ACI_API_KEY_HEADER = "X-API-KEY"
+# set on paginated list responses if there might be more results, pass it back as "cursor"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 # 8KB
 MAX_LOG_FIELD_SIZE = 8 * 1024
+# log records are formatted and written by a background thread, records logged while
+# LOG_QUEUE_MAX_SIZE records are waiting are handled according to LOG_QUEUE_DROP_POLICY
+LOG_QUEUE_MAX_SIZE = int(check_and_get_env_variable("SERVER_LOG_QUEUE_MAX_SIZE"))
+LOG_QUEUE_DROP_POLICY = LogQueueDropPolicy(
+    check_and_get_env_variable("SERVER_LOG_QUEUE_DROP_POLICY")
+)
+
+# METRICS
+# the scraper of /metrics authenticates with this bearer token, its scrapes are exempt from the
+# rate limits of the admission stage
+METRICS_TOKEN = check_and_get_env_variable("SERVER_METRICS_TOKEN")
+
+# PROFILING (see aci.server.middleware.profiling)
+# requests with a valid token (see aci.common.profiling_token) in PROFILING_HEADER are profiled,
+# and every request if PROFILING_ENABLED, e.g., to profile a staging environment
+PROFILING_HEADER = "X-ACI-Profile"
+# set to "true" to also take a tracemalloc snapshot of a request profiled by PROFILING_HEADER
+PROFILING_MEMORY_HEADER = "X-ACI-Profile-Memory"
+PROFILING_SIGNING_KEY = check_and_get_env_variable("SERVER_PROFILING_SIGNING_KEY")
+PROFILING_ENABLED = check_and_get_env_variable("SERVER_PROFILING_ENABLED").lower() == "true"
+# the fraction of /v1/functions/* requests that are profiled, for continuous profiling
+PROFILING_SAMPLE_RATE = float(check_and_get_env_variable("SERVER_PROFILING_SAMPLE_RATE"))
+# the profiles are stored as <request_id>.prof (and <request_id>.tracemalloc.txt) in PROFILING_DIR
+PROFILING_DIR = check_and_get_env_variable("SERVER_PROFILING_DIR")
 
 # Agentic Apps
 ANTHROPIC_API_KEY = check_and_get_env_variable("SERVER_ANTHROPIC_API_KEY")
@@ -1,7 +1,25 @@
 import contextvars
+import uuid
+
+from starlette.types import Scope
 
 request_id_ctx_var = contextvars.ContextVar[str | None]("request_id", default="unknown")
 agent_id_ctx_var = contextvars.ContextVar[str | None]("agent_id", default="unknown")
 api_key_id_ctx_var = contextvars.ContextVar[str | None]("api_key_id", default="unknown")
 project_id_ctx_var = contextvars.ContextVar[str | None]("project_id", default="unknown")
 org_id_ctx_var = contextvars.ContextVar[str | None]("org_id", default="unknown")
+
+_REQUEST_ID_SCOPE_KEY = "aci.request_id"
+
+
+def get_or_create_request_id(scope: Scope) -> str:
+    """
+    Get the unique ID of the request, generated by the first middleware that asks for it (the
+    admission stage, or the interceptor if the request got past it), and set it in the context.
+    """
+    request_id: str | None = scope.get(_REQUEST_ID_SCOPE_KEY)
+    if request_id is None:
+        request_id = str(uuid.uuid4())
+        scope[_REQUEST_ID_SCOPE_KEY] = request_id
+    request_id_ctx_var.set(request_id)
+    return request_id
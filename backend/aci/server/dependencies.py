@@ -4,24 +4,26 @@ from typing import Annotated
 from uuid import UUID
 
 from fastapi import Depends, Request, Security
-from fastapi.security import APIKeyHeader, HTTPBearer
+from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from aci.common import utils
 from aci.common.db import crud
 from aci.common.db.sql_models import Agent, Project
-from aci.common.enums import APIKeyStatus
+from aci.common.enums import APIKeyStatus, RequestStage
 from aci.common.exceptions import (
     AgentNotFound,
     DailyQuotaExceeded,
     InvalidAPIKey,
+    InvalidBearerToken,
     ProjectNotFound,
 )
 from aci.common.logging_setup import get_logger
-from aci.server import billing, config
+from aci.server import billing, config, metrics, timing
 
 logger = get_logger(__name__)
 http_bearer = HTTPBearer(auto_error=True, description="login to receive a JWT token")
+metrics_bearer = HTTPBearer(auto_error=False, description="token of the metrics scraper")
 api_key_header = APIKeyHeader(
     name=config.ACI_API_KEY_HEADER,
     description="API key for authentication",
@@ -45,12 +47,20 @@ def yield_db_session() -> Generator[Session, None, None]:
         db_session.close()
 
 
+def validate_metrics_token(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Security(metrics_bearer)],
+) -> None:
+    if credentials is None or not metrics.is_valid_metrics_token(credentials.credentials):
+        raise InvalidBearerToken("invalid metrics token")
+
+
 def validate_api_key(
     db_session: Annotated[Session, Depends(yield_db_session)],
     api_key_key: Annotated[str, Security(api_key_header)],
 ) -> UUID:
     """Validate API key and return the API key ID. (not the actual API key string)"""
-    api_key = crud.projects.get_api_key(db_session, api_key_key)
+    with timing.span(RequestStage.API_KEY_VALIDATION):
+        api_key = crud.projects.get_api_key(db_session, api_key_key)
     if api_key is None:
         logger.error(f"API key not found, partial_api_key={api_key_key[:4]}****{api_key_key[-4:]}")
         raise InvalidAPIKey("api key not found")
@@ -73,7 +83,8 @@ def validate_agent(
     db_session: Annotated[Session, Depends(yield_db_session)],
     api_key_id: Annotated[UUID, Depends(validate_api_key)],
 ) -> Agent:
-    agent = crud.projects.get_agent_by_api_key_id(db_session, api_key_id)
+    with timing.span(RequestStage.AGENT_LOOKUP):
+        agent = crud.projects.get_agent_by_api_key_id(db_session, api_key_id)
     if not agent:
         raise AgentNotFound(f"Agent not found, api_key_id={api_key_id}")
 
@@ -89,30 +100,31 @@ def validate_project_quota(
 ) -> Project:
     logger.debug(f"Validating project quota, api_key_id={api_key_id}")
 
-    project = crud.projects.get_project_by_api_key_id(db_session, api_key_id)
-    if not project:
-        logger.error(f"Project not found, api_key_id={api_key_id}")
-        raise ProjectNotFound(f"Project not found, api_key_id={api_key_id}")
-
-    now: datetime = datetime.now(UTC)
-    need_reset = now >= project.daily_quota_reset_at.replace(tzinfo=UTC) + timedelta(days=1)
-
-    if not need_reset and project.daily_quota_used >= config.PROJECT_DAILY_QUOTA:
-        logger.warning(
-            f"Daily quota exceeded, "
-            f"project_id={project.id} "
-            f"daily_quota_used={project.daily_quota_used} "
-            f"daily_quota={config.PROJECT_DAILY_QUOTA}"
-        )
-        raise DailyQuotaExceeded(
-            f"Daily quota exceeded for project={project.id}, "
-            f"daily_quota_used={project.daily_quota_used} "
-            f"daily quota={config.PROJECT_DAILY_QUOTA}"
-        )
-
-    crud.projects.increase_project_quota_usage(db_session, project)
-    # TODO: commit here with the same db_session or should create a separate db_session?
-    db_session.commit()
+    with timing.span(RequestStage.PROJECT_QUOTA):
+        project = crud.projects.get_project_by_api_key_id(db_session, api_key_id)
+        if not project:
+            logger.error(f"Project not found, api_key_id={api_key_id}")
+            raise ProjectNotFound(f"Project not found, api_key_id={api_key_id}")
+
+        now: datetime = datetime.now(UTC)
+        need_reset = now >= project.daily_quota_reset_at.replace(tzinfo=UTC) + timedelta(days=1)
+
+        if not need_reset and project.daily_quota_used >= config.PROJECT_DAILY_QUOTA:
+            logger.warning(
+                f"Daily quota exceeded, "
+                f"project_id={project.id} "
+                f"daily_quota_used={project.daily_quota_used} "
+                f"daily_quota={config.PROJECT_DAILY_QUOTA}"
+            )
+            raise DailyQuotaExceeded(
+                f"Daily quota exceeded for project={project.id}, "
+                f"daily_quota_used={project.daily_quota_used} "
+                f"daily quota={config.PROJECT_DAILY_QUOTA}"
+            )
+
+        crud.projects.increase_project_quota_usage(db_session, project)
+        # TODO: commit here with the same db_session or should create a separate db_session?
+        db_session.commit()
 
     logger.info(f"Project quota validation successful, project_id={project.id}")
     return project
@@ -131,6 +143,8 @@ def validate_monthly_api_quota(
     3. Increment usage or raise error if exceeded
     """
     # Only check quota for app search and function search/execute endpoints
+    # NOTE: the batch function search uses one unit per intent, so it is charged by its route
+    # (see use_monthly_api_quota) once the intents are known.
     path = request.url.path
     is_quota_limited_endpoint = path.startswith(f"{config.ROUTER_PREFIX_APPS}/search") or (
         path.startswith(f"{config.ROUTER_PREFIX_FUNCTIONS}/")
@@ -139,21 +153,30 @@ def validate_monthly_api_quota(
     if not is_quota_limited_endpoint:
         return
 
-    last_reset = project.api_quota_last_reset.replace(tzinfo=UTC)
-    cur_first_day_of_month = datetime.now(UTC).replace(
-        day=1, hour=0, minute=0, second=0, microsecond=0
-    )
-    if cur_first_day_of_month > last_reset:
-        logger.info(
-            f"resetting monthly quota, last_reset={last_reset}, cur_first_day_of_month={cur_first_day_of_month}",
-        )
-        crud.projects.reset_api_monthly_quota_for_org(
-            db_session, project.org_id, cur_first_day_of_month
-        )
+    use_monthly_api_quota(db_session, project)
+
 
-    plan = billing.get_active_plan_by_org_id(db_session, project.org_id)
-    billing.increment_quota(db_session, project, plan.features["api_calls_monthly"])
-    db_session.commit()
+def use_monthly_api_quota(db_session: Session, project: Project, amount: int = 1) -> None:
+    """
+    Use amount units of the monthly api quota of the project's org, resetting the quota first
+    if it's a new month. Raises MonthlyQuotaExceeded if the quota would be exceeded.
+    """
+    with timing.span(RequestStage.MONTHLY_QUOTA):
+        last_reset = project.api_quota_last_reset.replace(tzinfo=UTC)
+        cur_first_day_of_month = datetime.now(UTC).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        if cur_first_day_of_month > last_reset:
+            logger.info(
+                f"resetting monthly quota, last_reset={last_reset}, cur_first_day_of_month={cur_first_day_of_month}",
+            )
+            crud.projects.reset_api_monthly_quota_for_org(
+                db_session, project.org_id, cur_first_day_of_month
+            )
+
+        plan = billing.get_active_plan_by_org_id(db_session, project.org_id)
+        billing.increment_quota(db_session, project, plan.features["api_calls_monthly"], amount)
+        db_session.commit()
 
     logger.info("monthly api quota validation successful", extra={"project_id": project.id})
 
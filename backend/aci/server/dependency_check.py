@@ -1,5 +1,15 @@
+import asyncio
+
 from aci.common.encryption import decrypt, encrypt
 from aci.common.exceptions import DependencyCheckError
+from aci.common.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Set once all dependency checks have passed. The checks are not repeated afterwards, readiness
+# only needs to be established once per process.
+_dependencies_ready = asyncio.Event()
+_dependencies_check_lock = asyncio.Lock()
 
 
 def check_aws_kms_dependency() -> None:
@@ -17,3 +27,27 @@ def check_aws_kms_dependency() -> None:
 
 def check_dependencies() -> None:
     check_aws_kms_dependency()
+
+
+async def check_dependencies_ready() -> bool:
+    """
+    Run the (blocking) dependency checks off the event loop and report whether the process is
+    ready to serve traffic. Used by the readiness probe instead of checking at import time, so
+    that a slow or failing dependency (e.g., KMS) doesn't block the process from starting.
+    Concurrent probes share a single in-flight check.
+    """
+    if _dependencies_ready.is_set():
+        return True
+
+    async with _dependencies_check_lock:
+        if _dependencies_ready.is_set():
+            return True
+        try:
+            await asyncio.to_thread(check_dependencies)
+        except Exception:
+            logger.exception("Dependency check failed")
+            return False
+
+        _dependencies_ready.set()
+        logger.info("Dependency check passed")
+        return True
@@ -0,0 +1,82 @@
+import asyncio
+
+from aci.common.embedding_providers import EmbeddingProvider
+from aci.common.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batches concurrent embedding requests into one embedding provider call.
+
+    Texts are collected until max_wait_seconds passed since the first text of the batch arrived
+    or max_batch_size distinct texts are collected, whichever comes first. Then they are embedded
+    in one provider call (in a worker thread, to not block the event loop) and the embeddings are
+    fanned out to the waiting requests. Concurrent requests for the same text, whether the text is
+    still waiting for its batch or already being embedded, share the same computation.
+
+    NOTE: an instance is meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        embedding_provider: EmbeddingProvider,
+        max_batch_size: int,
+        max_wait_seconds: float,
+    ):
+        self.embedding_provider = embedding_provider
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        # futures of all texts that are waiting for their batch or being embedded, by text
+        self._futures: dict[str, asyncio.Future[list[float]]] = {}
+        # texts of the batch that is currently being collected
+        self._batch: list[str] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        # strong references to the running batches, so that they are not garbage collected
+        self._batch_tasks: set[asyncio.Task[None]] = set()
+
+    async def embed(self, text: str) -> list[float]:
+        future = self._futures.get(text)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[text] = future
+            self._batch.append(text)
+            if len(self._batch) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.max_wait_seconds, self._flush)
+
+        # NOTE: shielded so that a cancelled request (e.g., client disconnected) doesn't cancel the
+        # computation other requests for the same text are waiting for
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._batch:
+            return
+
+        texts, self._batch = self._batch, []
+        task = asyncio.get_running_loop().create_task(self._embed_batch(texts))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _embed_batch(self, texts: list[str]) -> None:
+        logger.debug(f"Embedding batch, batch_size={len(texts)}")
+        try:
+            embeddings = await asyncio.to_thread(self.embedding_provider.embed, texts)
+            if len(embeddings) != len(texts):
+                raise ValueError(
+                    f"Number of embeddings={len(embeddings)} doesn't match batch_size={len(texts)}"
+                )
+        except Exception as e:
+            logger.error(f"Error embedding batch, batch_size={len(texts)}, error={e}")
+            for text in texts:
+                self._futures.pop(text).set_exception(e)
+            return
+
+        for text, embedding in zip(texts, embeddings, strict=True):
+            self._futures.pop(text).set_result(embedding)
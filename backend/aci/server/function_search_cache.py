@@ -0,0 +1,93 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple
+from uuid import UUID
+
+from aci.common.enums import FunctionDefinitionFormat, Visibility
+
+
+class FunctionSearchCacheKey(NamedTuple):
+    visibility_access: Visibility
+    # the apps the search is filtered by, i.e., the agent's allowed apps and/or the app names filter
+    app_names: tuple[str, ...] | None
+    # the project whose enabled functions the search is filtered by (the "allowed_only" searches)
+    enabled_in_project_id: UUID | None
+    intent_hash: str | None
+    format: FunctionDefinitionFormat
+    limit: int
+    offset: int
+
+    @classmethod
+    def create(
+        cls,
+        visibility_access: Visibility,
+        app_names: list[str] | None,
+        enabled_in_project_id: UUID | None,
+        intent: str | None,
+        format: FunctionDefinitionFormat,
+        limit: int,
+        offset: int,
+    ) -> "FunctionSearchCacheKey":
+        return cls(
+            visibility_access,
+            tuple(sorted(set(app_names))) if app_names is not None else None,
+            enabled_in_project_id,
+            hashlib.sha256(intent.encode("utf-8")).hexdigest() if intent is not None else None,
+            format,
+            limit,
+            offset,
+        )
+
+
+class FunctionSearchCache:
+    """
+    LRU cache of function search results (the formatted function definitions), so that a repeated
+    search skips both the intent embedding and the DB.
+
+    Entries are stored under the catalog version read before the search (see
+    aci.common.db.catalog_version, shared by all processes) and are only returned while the catalog
+    version is unchanged, i.e., any committed change to apps, functions or app configurations, by
+    any process, invalidates all entries. Entries also expire after ttl_seconds, which bounds how
+    long changes made to the catalog without the crud functions (e.g., by hand) can go unnoticed.
+
+    NOTE: not thread safe, an instance is meant to be used from a single event loop.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # (catalog version, expiry time, result) by key, from least to most recently used
+        self._entries: OrderedDict[FunctionSearchCacheKey, tuple[int, float, list[Any]]] = (
+            OrderedDict()
+        )
+
+    def get(self, key: FunctionSearchCacheKey, catalog_version: int) -> list[Any] | None:
+        """
+        Get the result of a search if it was stored under the current catalog version.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        version, expires_at, result = entry
+        if version != catalog_version or expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def set(self, key: FunctionSearchCacheKey, catalog_version: int, result: list[Any]) -> None:
+        """
+        Store the result of a search under the catalog version read before the search.
+        NOTE: if the catalog changed during the search, the entry is never returned, as the current
+        catalog version is then newer.
+        """
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (catalog_version, time.monotonic() + self.ttl_seconds, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
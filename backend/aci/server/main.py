@@ -1,7 +1,7 @@
-from typing import Any
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any
 
-import logfire
-import stripe
 from fastapi import Depends, FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
@@ -15,10 +15,11 @@ from aci.common.logging_setup import setup_logging
 from aci.server import config
 from aci.server import dependencies as deps
 from aci.server.acl import get_propelauth
-from aci.server.dependency_check import check_dependencies
 from aci.server.log_schema_filter import LogSchemaFilter
+from aci.server.middleware.admission import AdmissionMiddleware
 from aci.server.middleware.interceptor import InterceptorMiddleware, RequestContextFilter
-from aci.server.middleware.ratelimit import RateLimitMiddleware
+from aci.server.middleware.profiling import ProfilingMiddleware
+from aci.server.oauth2_token_renewer import OAuth2TokenRenewer
 from aci.server.routes import (
     agent,
     analytics,
@@ -29,13 +30,19 @@ from aci.server.routes import (
     functions,
     health,
     linked_accounts,
+    metrics,
     organizations,
     projects,
     webhooks,
 )
 from aci.server.sentry import setup_sentry
 
-check_dependencies()
+if TYPE_CHECKING:
+    import logfire
+
+# NOTE: external dependencies (e.g., AWS KMS) are no longer checked at import time, which would
+# block the process from starting on a dependency hiccup. They are checked (off the event loop)
+# by the readiness probe, see routes/health.py.
 
 setup_sentry()
 
@@ -45,17 +52,34 @@ setup_logging(
         style="{",
         rename_fields={"asctime": "timestamp", "name": "file", "levelname": "level"},
     ),
-    filters=[RequestContextFilter(), LogSchemaFilter()],
+    filters=[LogSchemaFilter()],
     environment=config.ENVIRONMENT,
+    context_filters=[RequestContextFilter()],
+    queue_max_size=config.LOG_QUEUE_MAX_SIZE,
+    queue_drop_policy=config.LOG_QUEUE_DROP_POLICY,
 )
 
-stripe.api_key = config.STRIPE_SECRET_KEY
-
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    oauth2_token_renewer = None
+    if config.OAUTH2_TOKEN_RENEWAL_ENABLED:
+        oauth2_token_renewer = OAuth2TokenRenewer(
+            config.DB_FULL_URL,
+            interval_seconds=config.OAUTH2_TOKEN_RENEWAL_INTERVAL_SECONDS,
+            window_seconds=config.OAUTH2_TOKEN_RENEWAL_WINDOW_SECONDS,
+            batch_size=config.OAUTH2_TOKEN_RENEWAL_BATCH_SIZE,
+        )
+        oauth2_token_renewer.start()
+    yield
+    if oauth2_token_renewer is not None:
+        await oauth2_token_renewer.stop()
+
+
 # TODO: move to config
 app = FastAPI(
     title=config.APP_TITLE,
@@ -64,17 +88,21 @@ app = FastAPI(
     redoc_url=config.APP_REDOC_URL,
     openapi_url=config.APP_OPENAPI_URL,
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
 auth = get_propelauth()
 
 
-def scrubbing_callback(m: logfire.ScrubMatch) -> Any:
+def scrubbing_callback(m: "logfire.ScrubMatch") -> Any:
     if m.path == ("attributes", "api_key_id"):
         return m.value
 
 
 if config.ENVIRONMENT != "local":
+    # imported lazily, logfire (and its instrumentation) is only used outside of local environment
+    import logfire
+
     logfire.configure(
         console=False,
         token=config.LOGFIRE_WRITE_TOKEN,
@@ -85,7 +113,6 @@ if config.ENVIRONMENT != "local":
     logfire.instrument_sqlalchemy()
 
 """middlewares are executed in the reverse order"""
-app.add_middleware(RateLimitMiddleware)
 app.add_middleware(SessionMiddleware, secret_key=config.SIGNING_KEY)
 # TODO: for now, we don't use TrustedHostMiddleware because it blocks health check from AWS ALB:
 # When ALB send health check request, it uses the task IP as the host, instead of the DNS name.
@@ -100,14 +127,22 @@ app.add_middleware(SessionMiddleware, secret_key=config.SIGNING_KEY)
 #         config.ACI_DNS,
 #     ],
 # )
+# NOTE: inside the interceptor, which sets the request ID the profiles are stored by
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(InterceptorMiddleware)
+# NOTE: the admission stage rejects over the limit requests and invalid API keys with in-memory
+# state only, before the interceptor resolves the request context from the DB
+app.add_middleware(AdmissionMiddleware)
+# NOTE: outside the admission stage, so that its rejections carry CORS headers and CORS preflight
+# requests are answered without counting against the rate limits
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[config.DEV_PORTAL_URL],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[config.NEXT_CURSOR_HEADER],
 )
-app.add_middleware(InterceptorMiddleware)
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=[config.APPLICATION_LOAD_BALANCER_DNS])
 
 
@@ -129,6 +164,13 @@ app.include_router(
     tags=[config.ROUTER_PREFIX_HEALTH.split("/")[-1]],
 )
 
+app.include_router(
+    metrics.router,
+    prefix=config.ROUTER_PREFIX_METRICS,
+    tags=[config.ROUTER_PREFIX_METRICS.split("/")[-1]],
+    dependencies=[Depends(deps.validate_metrics_token)],
+)
+
 app.include_router(
     projects.router,
     prefix=config.ROUTER_PREFIX_PROJECTS,
@@ -0,0 +1,135 @@
+"""
+Prometheus metrics of the server, exposed in the text exposition format on /metrics, to the
+scraper authenticated with the metrics token (see is_valid_metrics_token).
+
+NOTE: the metrics are per worker process, like the process-local caches.
+"""
+
+import hmac
+import math
+import threading
+from collections.abc import Sequence
+
+from aci.server import config
+
+# the label value that replaces the values of a label beyond its max number of distinct values
+OVERFLOW_LABEL_VALUE = "other"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    A Prometheus histogram with labels.
+
+    The cardinality is bounded: a label takes at most max_label_values distinct values, further
+    values are recorded as OVERFLOW_LABEL_VALUE.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_label_values: int = 1000,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.max_label_values = max_label_values
+        self._lock = threading.Lock()
+        # the distinct values of every label
+        self._label_values: list[set[str]] = [set() for _ in self.label_names]
+        # (bucket counts, sum) by label values, the last bucket is +Inf, i.e., the count
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, label_values: Sequence[str], value: float) -> None:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"expected values of labels {self.label_names}, got {label_values}")
+
+        with self._lock:
+            bounded_label_values = tuple(
+                self._bound_label_value(i, label_value)
+                for i, label_value in enumerate(label_values)
+            )
+            series = self._series.get(bounded_label_values)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[bounded_label_values] = series
+            bucket_counts, total = series
+            for i, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    bucket_counts[i] += 1
+            bucket_counts[-1] += 1
+            total[0] += value
+
+    def _bound_label_value(self, label_index: int, label_value: str) -> str:
+        values = self._label_values[label_index]
+        if label_value in values:
+            return label_value
+        if len(values) >= self.max_label_values:
+            return OVERFLOW_LABEL_VALUE
+        values.add(label_value)
+        return label_value
+
+    def collect(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = [
+                (label_values, list(bucket_counts), total[0])
+                for label_values, (bucket_counts, total) in sorted(self._series.items())
+            ]
+        for label_values, bucket_counts, total in series:
+            labels = ",".join(
+                f'{label_name}="{_escape_label_value(label_value)}"'
+                for label_name, label_value in zip(self.label_names, label_values, strict=True)
+            )
+            for upper_bound, bucket_count in zip(
+                [*self.buckets, math.inf], bucket_counts, strict=True
+            ):
+                lines.append(
+                    f'{self.name}_bucket{{{labels},le="{_format_float(upper_bound)}"}} '
+                    f"{bucket_count}"
+                )
+            lines.append(f"{self.name}_sum{{{labels}}} {_format_float(total)}")
+            lines.append(f"{self.name}_count{{{labels}}} {bucket_counts[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._label_values = [set() for _ in self.label_names]
+            self._series.clear()
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_float(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+# the app label is the app of the executed function, if any, there are a few hundred apps at most
+REQUEST_STAGE_DURATION_SECONDS = Histogram(
+    "aci_request_stage_duration_seconds",
+    "Duration of the stages of requests (see aci.common.enums.RequestStage).",
+    ["app", "stage"],
+)
+
+
+def generate_latest() -> str:
+    """
+    All metrics in the Prometheus text exposition format.
+    """
+    return REQUEST_STAGE_DURATION_SECONDS.collect()
+
+
+def is_valid_metrics_token(token: str) -> bool:
+    return hmac.compare_digest(token.encode("utf-8"), config.METRICS_TOKEN.encode("utf-8"))
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from functools import cache
+
+from fastapi import status
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from aci.common.logging_setup import get_logger
+from aci.server import config, metrics
+from aci.server.context import get_or_create_request_id
+from aci.server.rate_limiting import RateLimit, RateLimitBackend, create_rate_limit_backend
+
+logger = get_logger(__name__)
+
+SECOND = 1
+DAY = 24 * 60 * 60
+
+# upper bound of the number of invalid API keys remembered, the oldest ones are forgotten first
+INVALID_API_KEY_CACHE_MAX_SIZE = 100_000
+
+
+class InvalidAPIKeyCache:
+    """
+    In-memory negative cache of API keys that were recently found not to exist, so that repeated
+    requests with them are rejected without a DB query (and the HMAC of the key).
+    Only digests of the keys are kept. Entries expire after ttl_seconds, so a key created after it
+    was cached is accepted again after at most that long.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # expiry time by key digest, from oldest to newest
+        self._expires_at: OrderedDict[str, float] = OrderedDict()
+
+    def add(self, api_key: str) -> None:
+        digest = _get_api_key_digest(api_key)
+        self._expires_at[digest] = time.monotonic() + self.ttl_seconds
+        self._expires_at.move_to_end(digest)
+        while len(self._expires_at) > self.max_size:
+            self._expires_at.popitem(last=False)
+
+    def __contains__(self, api_key: str) -> bool:
+        digest = _get_api_key_digest(api_key)
+        expires_at = self._expires_at.get(digest)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._expires_at[digest]
+            return False
+        return True
+
+
+@cache
+def get_invalid_api_key_cache() -> InvalidAPIKeyCache:
+    """
+    The invalid API key cache shared by the admission stage (which rejects the keys) and the
+    request context resolution (which finds them), per worker process.
+    """
+    return InvalidAPIKeyCache(
+        INVALID_API_KEY_CACHE_MAX_SIZE, config.INVALID_API_KEY_CACHE_TTL_SECONDS
+    )
+
+
+def _get_api_key_digest(api_key: str) -> str:
+    # NOTE: a plain (fast) hash is enough, the digests only identify keys within this process
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+@cache
+def get_rate_limit_backend() -> RateLimitBackend:
+    """
+    The rate limit backend shared by the admission stage and the project rate limits of the
+    interceptor, per worker process.
+    """
+    return create_rate_limit_backend(config.RATE_LIMIT_BACKEND, config.RATE_LIMIT_REDIS_URL)
+
+
+async def hit_rate_limits(
+    rate_limits: list[RateLimit], rate_limit_key: str, headers: dict[str, str]
+) -> RateLimit | None:
+    """
+    Hit the rate limits for the key, and add their rate limit headers to headers.
+    Returns the first exceeded rate limit (the remaining ones are not hit), if any.
+    NOTE: fails open, a rate limit that can't be hit because the backend (e.g., redis) is
+    unavailable is skipped with a warning, rather than rejecting (or failing) every request.
+    """
+    for rate_limit in rate_limits:
+        try:
+            result = await get_rate_limit_backend().hit(rate_limit_key, rate_limit)
+        except Exception as e:
+            logger.warning(
+                f"Failed to hit rate limit, skipping it, "
+                f"rate_limit_name={rate_limit.name}, "
+                f"rate_limit_key={rate_limit_key}, "
+                f"error={e}"
+            )
+            continue
+        headers[f"X-RateLimit-Limit-{rate_limit.name}"] = str(rate_limit.amount)
+        headers[f"X-RateLimit-Remaining-{rate_limit.name}"] = str(result.remaining)
+        headers[f"X-RateLimit-Reset-{rate_limit.name}"] = str(math.ceil(result.reset_at))
+        if not result.allowed:
+            # NOTE: raising a custom ACIException here doesn't work as expected
+            logger.warning(
+                f"Rate limit exceeded, "
+                f"rate_limit_name={rate_limit.name}, "
+                f"rate_limit_key={rate_limit_key}"
+            )
+            return rate_limit
+    return None
+
+
+def create_rate_limit_exceeded_response(rate_limit: RateLimit, headers: dict[str, str]) -> Response:
+    return Response(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content=json.dumps({"error": f"Rate limit exceeded: {rate_limit.name}"}),
+        headers=headers,
+    )
+
+
+class AdmissionMiddleware:
+    """
+    Admission stage that runs before any other request processing (in particular, before the DB
+    backed request context resolution of the interceptor), without any DB access:
+    1. IP rate limits
+    2. rejection of recently seen invalid API keys (see InvalidAPIKeyCache)
+    3. API key rate limits
+    Rate limit headers of the applied limits are added to every response.
+    Scrapes of /metrics by the authenticated metrics scraper are exempt from the rate limits.
+    Rejected requests are logged and get an X-Request-ID header, like the ones that get past it.
+    NOTE: it runs inside the CORS middleware, so that rejections carry CORS headers (and can be
+    read by the dev portal) and CORS preflight requests don't count against the rate limits.
+    NOTE: the project rate limits are applied by the interceptor, once the project of the API key
+    is known.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.rate_limits = [
+            RateLimit("ip-per-second", config.RATE_LIMIT_IP_PER_SECOND, SECOND),
+            RateLimit("ip-per-day", config.RATE_LIMIT_IP_PER_DAY, DAY),
+        ]
+        self.api_key_rate_limits = [
+            RateLimit("api-key-per-second", config.RATE_LIMIT_API_KEY_PER_SECOND, SECOND),
+            RateLimit("api-key-per-day", config.RATE_LIMIT_API_KEY_PER_DAY, DAY),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self._is_metrics_scrape(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # NOTE: set first, so that the logs of the admission stage carry the request ID too
+        get_or_create_request_id(scope)
+        rate_limit_headers: dict[str, str] = {}
+        exceeded_rate_limit = await hit_rate_limits(
+            self.rate_limits, self._get_rate_limit_key(scope), rate_limit_headers
+        )
+        if exceeded_rate_limit is not None:
+            response = create_rate_limit_exceeded_response(exceeded_rate_limit, rate_limit_headers)
+            await self._reject(response, scope, receive, send)
+            return
+
+        api_key = Headers(scope=scope).get(config.ACI_API_KEY_HEADER)
+        if api_key:
+            if api_key in get_invalid_api_key_cache():
+                logger.warning(
+                    f"Rejected recently seen invalid API key, "
+                    f"api_key={api_key[:4] + '...' + api_key[-4:]}"
+                )
+                response = JSONResponse(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    content={"error": "Unauthorized"},
+                )
+                await self._reject(response, scope, receive, send)
+                return
+
+            exceeded_rate_limit = await hit_rate_limits(
+                self.api_key_rate_limits,
+                f"api_key:{_get_api_key_digest(api_key)}",
+                rate_limit_headers,
+            )
+            if exceeded_rate_limit is not None:
+                response = create_rate_limit_exceeded_response(
+                    exceeded_rate_limit, rate_limit_headers
+                )
+                await self._reject(response, scope, receive, send)
+                return
+
+        async def send_with_rate_limit_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add rate limit headers for all limits
+                MutableHeaders(scope=message).update(rate_limit_headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_rate_limit_headers)
+
+    async def _reject(self, response: Response, scope: Scope, receive: Receive, send: Send) -> None:
+        # NOTE: the interceptor, which otherwise logs the request and sets its ID, is not reached
+        response.headers["X-Request-ID"] = get_or_create_request_id(scope)
+        logger.info(
+            "Request rejected",
+            extra={
+                "http_method": scope["method"],
+                "http_path": scope["path"],
+                "status_code": response.status_code,
+            },
+        )
+        await response(scope, receive, send)
+
+    def _is_metrics_scrape(self, scope: Scope) -> bool:
+        if scope["path"] != config.ROUTER_PREFIX_METRICS:
+            return False
+        scheme, token = get_authorization_scheme_param(Headers(scope=scope).get("Authorization"))
+        return scheme.lower() == "bearer" and metrics.is_valid_metrics_token(token)
+
+    def _get_rate_limit_key(self, scope: Scope) -> str:
+        # Note: client will be set correctly (if running behind proxy like ALB) because of ProxyHeadersMiddleware.
+        client = scope.get("client")
+        if client and client[0]:
+            return f"ip:{client[0]}"
+        else:
+            logger.error("Failed to generate rate limit key, request.client.host not set")
+            return "ip:127.0.0.1"
@@ -1,37 +1,89 @@
 import logging
-import uuid
 from datetime import UTC, datetime
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from aci.common import utils
 from aci.common.db import crud
+from aci.common.enums import RequestStage
 from aci.common.logging_setup import get_logger
-from aci.server import config
+from aci.server import config, timing
 from aci.server.context import (
     agent_id_ctx_var,
     api_key_id_ctx_var,
+    get_or_create_request_id,
     org_id_ctx_var,
     project_id_ctx_var,
     request_id_ctx_var,
 )
+from aci.server.middleware.admission import (
+    DAY,
+    SECOND,
+    create_rate_limit_exceeded_response,
+    get_invalid_api_key_cache,
+    hit_rate_limits,
+)
+from aci.server.rate_limiting import RateLimit
 
 logger = get_logger(__name__)
 
 
-class InterceptorMiddleware(BaseHTTPMiddleware):
+class InterceptorMiddleware:
     """
     Middleware for logging structured analytics data for every request/response.
-    It generates a unique request ID and logs some baseline details.
-    It also extracts and sets request context from the API key.
+    It sets the unique request ID (see get_or_create_request_id) and logs some baseline details.
+    It also extracts and sets request context from the API key, and applies the rate limits of
+    the API key's project.
+    The timing spans of the request's stages (see aci.server.timing) are returned in the
+    Server-Timing header and observed by the request stage duration histogram.
+
+    NOTE: implemented as a pure ASGI middleware (instead of a BaseHTTPMiddleware), so that the
+    request and response bodies stream through it without being buffered or wrapped in tasks.
+    Only the first MAX_LOG_FIELD_SIZE bytes of a POST request body are kept for logging, as the
+    app receives it.
     """
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.project_rate_limits = [
+            RateLimit("project-per-second", config.RATE_LIMIT_PROJECT_PER_SECOND, SECOND),
+            RateLimit("project-per-day", config.RATE_LIMIT_PROJECT_PER_DAY, DAY),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_timing = timing.start_request_timing()
+        try:
+            await self._intercept(scope, receive, send, request_timing)
+        finally:
+            # NOTE: after the response is sent, so the response isn't delayed by the metrics
+            request_timing.observe()
+
+    async def _intercept(
+        self, scope: Scope, receive: Receive, send: Send, request_timing: timing.RequestTiming
+    ) -> None:
         start_time = datetime.now(UTC)
-        request_id = str(uuid.uuid4())
-        request_id_ctx_var.set(request_id)
+        request_id = get_or_create_request_id(scope)
+        request = Request(scope)
+
+        # rate limit headers of the project rate limits, if the request has a project
+        rate_limit_headers: dict[str, str] = {}
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers.update(rate_limit_headers)
+                if request_timing.spans:
+                    headers["Server-Timing"] = request_timing.get_server_timing_header()
+            await send(message)
+
         # TODO: Get request context from bearer token(propelauth)
 
         # Get request context from x-api-key header
@@ -41,17 +93,22 @@ class InterceptorMiddleware(BaseHTTPMiddleware):
             logger.info(f"API key found in header, api_key={api_key[:4] + '...' + api_key[-4:]}")
             try:
                 with utils.create_db_session(config.DB_FULL_URL) as db_session:
-                    api_key_id, agent_id, project_id, org_id = (
-                        crud.projects.get_request_context_by_api_key(db_session, api_key)
-                    )
+                    with timing.span(RequestStage.API_KEY_LOOKUP):
+                        api_key_id, agent_id, project_id, org_id = (
+                            crud.projects.get_request_context_by_api_key(db_session, api_key)
+                        )
                     if not api_key_id and not agent_id and not project_id and not org_id:
                         logger.warning(
                             f"API key not found in db, api_key={api_key[:4] + '...' + api_key[-4:]}"
                         )
-                        return JSONResponse(
+                        # reject the key in the admission stage from now on
+                        get_invalid_api_key_cache().add(api_key)
+                        response = JSONResponse(
                             status_code=401,
                             content={"error": "Unauthorized"},
                         )
+                        await response(scope, receive, send_with_headers)
+                        return
                     context_vars = {
                         api_key_id_ctx_var: api_key_id,
                         agent_id_ctx_var: agent_id,
@@ -66,55 +123,73 @@ class InterceptorMiddleware(BaseHTTPMiddleware):
                     f"Can't access database to query request context for API key, error={e}"
                 )
 
+        if project_id:
+            with timing.span(RequestStage.PROJECT_RATE_LIMIT):
+                exceeded_rate_limit = await hit_rate_limits(
+                    self.project_rate_limits, f"project:{project_id}", rate_limit_headers
+                )
+            if exceeded_rate_limit is not None:
+                await create_rate_limit_exceeded_response(exceeded_rate_limit, rate_limit_headers)(
+                    scope, receive, send_with_headers
+                )
+                return
+
         # Skip logging for health check endpoints
-        is_health_check = request.url.path == config.ROUTER_PREFIX_HEALTH
+        should_log = (
+            not request.url.path.startswith(config.ROUTER_PREFIX_HEALTH)
+            or config.ENVIRONMENT != "local"
+        )
+        request_logger = _RequestLogger(request, self._get_client_ip(request), should_log)
+        response_status_code: int | None = None
+        response_content_length: str | None = None
 
-        if not is_health_check or config.ENVIRONMENT != "local":
-            request_log_data = {
-                "http_version": request.scope.get("http_version", "unknown"),
-                "http_method": request.method,
-                "http_path": request.url.path,
-                "url": str(request.url),
-                "url_scheme": request.url.scheme,
-                "query_params": dict(request.query_params),
-                "client_ip": self._get_client_ip(
-                    request
-                ),  # TODO: get from request.client.host if request.client else "unknown"
-                "user_agent": request.headers.get("User-Agent", "unknown"),
-                "x_forwarded_proto": request.headers.get("X-Forwarded-Proto", "unknown"),
-            }
-            request_body = await self._get_request_body(request)
-            if request_body:
-                request_log_data["request_body"] = request_body
-            logger.info("Received request", extra=request_log_data)
+        async def receive_and_capture_body() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                request_logger.capture_body_chunk(
+                    message.get("body", b""), message.get("more_body", False)
+                )
+            return message
+
+        async def send_and_capture_response(message: Message) -> None:
+            nonlocal response_status_code, response_content_length
+            if message["type"] == "http.response.start":
+                # the app may respond without (fully) reading the request body
+                request_logger.log()
+                response_status_code = message["status"]
+                response_content_length = Headers(raw=message["headers"]).get("content-length")
+            await send_with_headers(message)
 
+        if request.method != "POST":
+            request_logger.log()
         try:
-            response = await call_next(request)
+            await self.app(scope, receive_and_capture_body, send_and_capture_response)
         except Exception as e:
             logger.exception(
                 f"Error processing request, error={e}",
                 extra={"duration": (datetime.now(UTC) - start_time).total_seconds()},
             )
-            return JSONResponse(
+            if response_status_code is not None:
+                # the response has already started, it can't be replaced with an error response
+                raise
+            response = JSONResponse(
                 status_code=500,
                 content={"error": "Internal server error"},
             )
+            await response(scope, receive, send_with_headers)
+            return
 
-        if not is_health_check or config.ENVIRONMENT != "local":
+        if should_log:
             response_log_data = {
                 "http_method": request.method,
                 "http_path": request.url.path,
                 "url": str(request.url),
-                "status_code": response.status_code,
+                "status_code": response_status_code,
                 "duration": (datetime.now(UTC) - start_time).total_seconds(),
-                "content_length": response.headers.get("content-length"),  # type is str
+                "content_length": response_content_length,  # type is str
             }
             logger.info("Response sent", extra=response_log_data)
 
-        response.headers["X-Request-ID"] = request_id
-
-        return response
-
     def _get_client_ip(self, request: Request) -> str:
         """
         Get the actual client IP if the server is running behind a proxy.
@@ -128,24 +203,66 @@ class InterceptorMiddleware(BaseHTTPMiddleware):
         else:
             return request.client.host if request.client else "unknown"
 
-    # TODO: move to a separate file and refactor in more elegant/reliable way
-    async def _get_request_body(self, request: Request) -> str | None:
-        if request.method != "POST":
+
+class _RequestLogger:
+    """
+    Logs the "Received request" line of a request once, with the first MAX_LOG_FIELD_SIZE bytes
+    of its body (POST requests only) captured as the body streams past.
+    The line is logged once the body has been fully received, or when the response starts.
+    """
+
+    def __init__(self, request: Request, client_ip: str, should_log: bool):
+        self.request = request
+        self.client_ip = client_ip
+        self.logged = not should_log
+        self.body_prefix = bytearray()
+        self.body_size = 0
+
+    def capture_body_chunk(self, chunk: bytes, more_body: bool) -> None:
+        if self.logged:
+            return
+        # NOTE: one byte more than the limit is kept, to tell whether the body has to be truncated
+        remaining = config.MAX_LOG_FIELD_SIZE + 1 - len(self.body_prefix)
+        if remaining > 0:
+            self.body_prefix += chunk[:remaining]
+        self.body_size += len(chunk)
+        if not more_body:
+            self.log()
+
+    def log(self) -> None:
+        if self.logged:
+            return
+        self.logged = True
+
+        request_log_data = {
+            "http_version": self.request.scope.get("http_version", "unknown"),
+            "http_method": self.request.method,
+            "http_path": self.request.url.path,
+            "url": str(self.request.url),
+            "url_scheme": self.request.url.scheme,
+            "query_params": dict(self.request.query_params),
+            # TODO: get from request.client.host if request.client else "unknown"
+            "client_ip": self.client_ip,
+            "user_agent": self.request.headers.get("User-Agent", "unknown"),
+            "x_forwarded_proto": self.request.headers.get("X-Forwarded-Proto", "unknown"),
+        }
+        request_body = self._get_request_body()
+        if request_body:
+            request_log_data["request_body"] = request_body
+        logger.info("Received request", extra=request_log_data)
+
+    def _get_request_body(self) -> str | None:
+        if self.request.method != "POST":
             return None
-        try:
-            request_body_bytes = await request.body()
-            # TODO: reconsider size limit
-            if len(request_body_bytes) > config.MAX_LOG_FIELD_SIZE:
-                return (
-                    request_body_bytes[: config.MAX_LOG_FIELD_SIZE - 100].decode(
-                        "utf-8", errors="replace"
-                    )
-                    + f"... [truncated, size={len(request_body_bytes)}]"
+        # TODO: reconsider size limit
+        if len(self.body_prefix) > config.MAX_LOG_FIELD_SIZE:
+            return (
+                self.body_prefix[: config.MAX_LOG_FIELD_SIZE - 100].decode(
+                    "utf-8", errors="replace"
                 )
-            return request_body_bytes.decode("utf-8", errors="replace")
-        except Exception:
-            logger.exception("Error decoding request body")
-            return "error decoding request body"
+                + f"... [truncated, size={self.body_size}]"
+            )
+        return self.body_prefix.decode("utf-8", errors="replace")
 
 
 class RequestContextFilter(logging.Filter):
@@ -0,0 +1,145 @@
+import asyncio
+import cProfile
+import random
+import tracemalloc
+from enum import StrEnum
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from aci.common.logging_setup import get_logger
+from aci.common.profiling_token import verify_profiling_token
+from aci.server import config
+from aci.server.context import request_id_ctx_var
+
+logger = get_logger(__name__)
+
+# the oldest profiles are deleted beyond this number, so continuous profiling can't fill the disk
+MAX_STORED_PROFILES = 1000
+# the number of allocation sites (by line) in a tracemalloc report
+TRACEMALLOC_TOP_STATS = 50
+
+
+class ProfilingReason(StrEnum):
+    # a valid token in the profiling header
+    HEADER = "header"
+    # PROFILING_ENABLED
+    ENABLED = "enabled"
+    # sampled at PROFILING_SAMPLE_RATE
+    SAMPLED = "sampled"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests with cProfile (and optionally tracemalloc), and stores the profiles keyed by
+    request ID in PROFILING_DIR, to be inspected with pstats or e.g. snakeviz.
+
+    A request is profiled if it has a valid token in the profiling header, if profiling is enabled
+    in the config, or if it is a /v1/functions/* request sampled at the profiling sample rate.
+
+    NOTE: cProfile profiles the thread, the event loop's: the profile also contains the coroutines
+    of other requests that ran on the event loop at the same time, and it doesn't contain the work
+    done in other threads, i.e., sync route handlers and dependencies (run in the threadpool) and
+    asyncio.to_thread calls show up only as the time awaiting them. Only one request is profiled
+    at a time per worker process (requests that arrive meanwhile are not profiled).
+    Must be added inside the interceptor middleware, which sets the request ID.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.profiling = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        reason = self._get_profiling_reason(scope, headers)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+        if self.profiling:
+            logger.info("Not profiling request, another request is being profiled")
+            await self.app(scope, receive, send)
+            return
+
+        trace_memory = (
+            reason == ProfilingReason.HEADER
+            and headers.get(config.PROFILING_MEMORY_HEADER, "").lower() == "true"
+        )
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler (e.g., a debugger) is active
+            logger.warning("Not profiling request, another profiler is active", exc_info=True)
+            await self.app(scope, receive, send)
+            return
+
+        self.profiling = True
+        if trace_memory:
+            tracemalloc.start()
+        snapshot: tracemalloc.Snapshot | None = None
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            if trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            self.profiling = False
+
+        request_id = request_id_ctx_var.get() or "unknown"
+        try:
+            # off the event loop, dumping the stats of a large profile takes a while
+            await asyncio.to_thread(
+                store_profile, Path(config.PROFILING_DIR), request_id, profiler, snapshot
+            )
+        except Exception:
+            logger.exception(f"Failed to store request profile, request_id={request_id}")
+            return
+        logger.info(
+            f"Stored request profile, request_id={request_id}, reason={reason}",
+            extra={"profile_dir": config.PROFILING_DIR},
+        )
+
+    def _get_profiling_reason(self, scope: Scope, headers: Headers) -> ProfilingReason | None:
+        token = headers.get(config.PROFILING_HEADER)
+        if token is not None:
+            if verify_profiling_token(token, config.PROFILING_SIGNING_KEY):
+                return ProfilingReason.HEADER
+            logger.warning("Invalid or expired profiling token")
+        if config.PROFILING_ENABLED:
+            return ProfilingReason.ENABLED
+        if (
+            scope["path"].startswith(f"{config.ROUTER_PREFIX_FUNCTIONS}/")
+            and random.random() < config.PROFILING_SAMPLE_RATE
+        ):
+            return ProfilingReason.SAMPLED
+        return None
+
+
+def store_profile(
+    profile_dir: Path,
+    request_id: str,
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot | None,
+) -> None:
+    """
+    Store the profile (and the tracemalloc report) of a request, and delete the oldest profiles
+    beyond MAX_STORED_PROFILES.
+    """
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(profile_dir / f"{request_id}.prof")
+    if snapshot is not None:
+        top_stats = snapshot.statistics("lineno")[:TRACEMALLOC_TOP_STATS]
+        (profile_dir / f"{request_id}.tracemalloc.txt").write_text(
+            "\n".join(str(stat) for stat in top_stats)
+        )
+
+    profile_paths = sorted(profile_dir.glob("*.prof"), key=lambda path: path.stat().st_mtime)
+    for profile_path in profile_paths[:-MAX_STORED_PROFILES]:
+        profile_path.unlink(missing_ok=True)
+        profile_path.with_suffix(".tracemalloc.txt").unlink(missing_ok=True)
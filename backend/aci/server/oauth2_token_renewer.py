@@ -0,0 +1,170 @@
+import asyncio
+import time
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from aci.common import utils
+from aci.common.db import crud
+from aci.common.db.sql_models import App, AppConfiguration, LinkedAccount
+from aci.common.logging_setup import get_logger
+from aci.server import security_credentials_manager as scm
+
+logger = get_logger(__name__)
+
+
+class OAuth2TokenRenewer:
+    """
+    Renews OAuth2 access tokens in the background before they expire, so that function executions
+    don't wait on a refresh (which only happens inline for tokens within the expiry leeway, e.g.,
+    if the renewer is disabled or the refresh keeps failing).
+
+    Every interval_seconds, the (up to batch_size) access tokens expiring within window_seconds
+    are refreshed, one at a time, each in a DB session of its own. The DB work runs in worker
+    threads, so that the renewer doesn't block the requests on the event loop. The access tokens
+    of disabled linked accounts and of disabled app configurations are not renewed. Every server
+    process runs a renewer, they don't coordinate beyond the lock of each linked account (see
+    security_credentials_manager), an access token one of them is refreshing (or just refreshed)
+    is skipped by the others.
+
+    Access tokens that already expired are left to be refreshed on use, so that a linked account
+    whose refresh keeps failing (e.g., a revoked refresh token) is not retried forever.
+
+    NOTE: an instance is meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        interval_seconds: float,
+        window_seconds: int,
+        batch_size: int,
+    ):
+        self.db_url = db_url
+        self.interval_seconds = interval_seconds
+        self.window_seconds = window_seconds
+        self.batch_size = batch_size
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.renew_expiring_access_tokens()
+            except Exception:
+                logger.exception("Failed to renew expiring OAuth2 access tokens")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def renew_expiring_access_tokens(self) -> int:
+        """
+        Refresh the access tokens expiring within window_seconds.
+        Returns the number of access tokens refreshed.
+        """
+        now = int(time.time())
+        linked_account_keys = await asyncio.to_thread(
+            self._get_expiring_linked_account_keys, now, now + self.window_seconds
+        )
+        num_renewed = 0
+        for linked_account_id, project_id in linked_account_keys:
+            if await self._renew_access_token(linked_account_id, project_id):
+                num_renewed += 1
+
+        if num_renewed:
+            logger.info(f"Renewed OAuth2 access tokens, num_renewed={num_renewed}")
+        return num_renewed
+
+    def _get_expiring_linked_account_keys(
+        self, expires_after: int, expires_before: int
+    ) -> list[tuple[UUID, UUID]]:
+        with utils.create_db_session(self.db_url) as db_session:
+            linked_accounts = (
+                crud.linked_accounts.get_oauth2_linked_accounts_with_access_token_expiring(
+                    db_session, expires_after, expires_before, self.batch_size
+                )
+            )
+            return [
+                (linked_account.id, linked_account.project_id) for linked_account in linked_accounts
+            ]
+
+    async def _renew_access_token(self, linked_account_id: UUID, project_id: UUID) -> bool:
+        """
+        Refresh the access token of a linked account, in a session (and transaction) of its own.
+        Returns whether the access token was refreshed.
+        NOTE: the DB work runs in worker threads, so that the event loop isn't blocked on it.
+        """
+        db_session = utils.create_db_session(self.db_url)
+        try:
+            renewal_targets = await asyncio.to_thread(
+                _get_renewal_targets, db_session, linked_account_id, project_id
+            )
+            if renewal_targets is None:
+                return False
+            linked_account, app_configuration, app = renewal_targets
+
+            security_credentials_response = await scm.renew_oauth2_credentials(
+                db_session, app_configuration, linked_account, self.window_seconds
+            )
+            if security_credentials_response is None:
+                return False
+            await asyncio.to_thread(
+                _update_security_credentials,
+                db_session,
+                app,
+                linked_account,
+                security_credentials_response,
+            )
+            return security_credentials_response.is_updated
+        except Exception:
+            logger.exception(
+                f"Failed to renew OAuth2 access token, linked_account_id={linked_account_id}"
+            )
+            return False
+        finally:
+            # ends the transaction (if still open), which releases the lock of the linked account
+            await asyncio.to_thread(db_session.close)
+
+
+def _get_renewal_targets(
+    db_session: Session, linked_account_id: UUID, project_id: UUID
+) -> tuple[LinkedAccount, AppConfiguration, App] | None:
+    """
+    Get the linked account, its app configuration and its app, or None if the linked account or
+    the app configuration is no longer enabled (since it was selected for renewal), their access
+    tokens are not renewed.
+    NOTE: the app is loaded here, so that it isn't lazy loaded on the event loop.
+    """
+    linked_account = crud.linked_accounts.get_linked_account_by_id_under_project(
+        db_session, linked_account_id, project_id
+    )
+    if linked_account is None or not linked_account.enabled:
+        return None
+    app_configuration = crud.app_configurations.get_app_configuration(
+        db_session, project_id, linked_account.app_name
+    )
+    if app_configuration is None or not app_configuration.enabled:
+        return None
+    return linked_account, app_configuration, app_configuration.app
+
+
+def _update_security_credentials(
+    db_session: Session,
+    app: App,
+    linked_account: LinkedAccount,
+    security_credentials_response: scm.SecurityCredentialsResponse,
+) -> None:
+    scm.update_security_credentials(db_session, app, linked_account, security_credentials_response)
+    # ends the transaction, which releases the lock of the linked account
+    db_session.commit()
@@ -0,0 +1,28 @@
+from aci.common.enums import RateLimitBackendType
+from aci.server.rate_limiting.base import RateLimit, RateLimitBackend, RateLimitResult
+from aci.server.rate_limiting.memory_rate_limit_backend import MemoryRateLimitBackend
+from aci.server.rate_limiting.redis_rate_limit_backend import RedisRateLimitBackend
+
+
+def create_rate_limit_backend(
+    backend_type: RateLimitBackendType, redis_url: str | None = None
+) -> RateLimitBackend:
+    match backend_type:
+        case RateLimitBackendType.MEMORY:
+            return MemoryRateLimitBackend()
+        case RateLimitBackendType.REDIS:
+            if redis_url is None:
+                raise ValueError("redis_url is required for the redis rate limit backend")
+            return RedisRateLimitBackend(redis_url)
+        case _:
+            raise ValueError(f"Unsupported rate limit backend: {backend_type}")
+
+
+__all__ = [
+    "MemoryRateLimitBackend",
+    "RateLimit",
+    "RateLimitBackend",
+    "RateLimitResult",
+    "RedisRateLimitBackend",
+    "create_rate_limit_backend",
+]
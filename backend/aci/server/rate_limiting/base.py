@@ -0,0 +1,88 @@
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from aci.common.enums import RateLimitBackendType
+
+# makes up for the floating point error of summed up emission intervals, e.g., 10 hits of a
+# 10 per second limit at the same time must be allowed
+GCRA_TOLERANCE_SECONDS = 1e-6
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    At most amount hits per period_seconds, e.g., RateLimit("ip-per-second", 10, 1).
+    """
+
+    name: str
+    amount: int
+    period_seconds: float
+
+    @property
+    def emission_interval(self) -> float:
+        """The time it takes for one hit of the limit to be replenished."""
+        return self.period_seconds / self.amount
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    # number of hits left right now
+    remaining: int
+    # epoch time (in seconds) at which the full amount is available again
+    reset_at: float
+
+
+class RateLimitBackend(ABC):
+    """
+    Base class for the storage of the rate limit state.
+
+    Rate limits are enforced with GCRA (generic cell rate algorithm), which stores a single
+    timestamp per key and limit, the theoretical arrival time (TAT): the time at which the limit
+    would be fully replenished. A hit advances the TAT by the emission interval of the limit, and
+    is only allowed if the advanced TAT is at most one period ahead of now. Unlike a moving window,
+    which keeps one timestamp per hit, the memory per key is constant regardless of the amount.
+    """
+
+    @property
+    @abstractmethod
+    def backend_type(self) -> RateLimitBackendType:
+        pass
+
+    @abstractmethod
+    async def hit(self, key: str, rate_limit: RateLimit) -> RateLimitResult:
+        """
+        Record a hit of the rate limit for the key, unless the limit is exceeded.
+        NOTE: the state is kept per rate limit (name, amount and period), a changed limit starts
+        from a fresh state.
+        """
+        pass
+
+
+def gcra_hit(tat: float | None, now: float, rate_limit: RateLimit) -> tuple[float, bool]:
+    """
+    Apply a hit at now to the stored TAT (None if there is none).
+    Returns the TAT to store (unchanged if the hit is not allowed) and whether it is allowed.
+    """
+    tat = max(tat, now) if tat is not None else now
+    new_tat = tat + rate_limit.emission_interval
+    if new_tat - rate_limit.period_seconds > now + GCRA_TOLERANCE_SECONDS:
+        return tat, False
+    return new_tat, True
+
+
+def gcra_result(
+    tat: float, now: float, allowed: bool, rate_limit: RateLimit, epoch_now: float
+) -> RateLimitResult:
+    """
+    The result of a hit, given the TAT after it. epoch_now is now as epoch time, for clocks (of
+    tat and now) that are not epoch based.
+    """
+    remaining = math.floor(
+        (rate_limit.period_seconds - (tat - now) + GCRA_TOLERANCE_SECONDS)
+        / rate_limit.emission_interval
+    )
+    return RateLimitResult(
+        allowed=allowed, remaining=max(remaining, 0), reset_at=epoch_now + (tat - now)
+    )
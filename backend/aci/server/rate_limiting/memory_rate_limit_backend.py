@@ -0,0 +1,48 @@
+import time
+
+from aci.common.enums import RateLimitBackendType
+from aci.server.rate_limiting.base import (
+    RateLimit,
+    RateLimitBackend,
+    RateLimitResult,
+    gcra_hit,
+    gcra_result,
+)
+
+# number of hits between sweeps of the keys whose limits are fully replenished
+SWEEP_INTERVAL_HITS = 10_000
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Keeps the rate limit state in the process itself, so the limits are per worker process.
+    Meant for local development and tests, see RedisRateLimitBackend for limits that hold across
+    workers.
+    """
+
+    def __init__(self) -> None:
+        # TAT by rate limit and key
+        self._tats: dict[tuple[RateLimit, str], float] = {}
+        self._hits_since_sweep = 0
+
+    @property
+    def backend_type(self) -> RateLimitBackendType:
+        return RateLimitBackendType.MEMORY
+
+    async def hit(self, key: str, rate_limit: RateLimit) -> RateLimitResult:
+        # NOTE: a monotonic clock, so that the limits are not affected by changes of the wall clock
+        now = time.monotonic()
+        state_key = (rate_limit, key)
+        tat, allowed = gcra_hit(self._tats.get(state_key), now, rate_limit)
+        self._tats[state_key] = tat
+
+        self._hits_since_sweep += 1
+        if self._hits_since_sweep >= SWEEP_INTERVAL_HITS:
+            self._sweep(now)
+
+        return gcra_result(tat, now, allowed, rate_limit, time.time())
+
+    def _sweep(self, now: float) -> None:
+        # a TAT in the past is the same as no TAT, the limit is fully replenished
+        self._tats = {state_key: tat for state_key, tat in self._tats.items() if tat > now}
+        self._hits_since_sweep = 0
@@ -0,0 +1,59 @@
+from typing import Any
+
+from aci.common.enums import RateLimitBackendType
+from aci.server.rate_limiting.base import (
+    GCRA_TOLERANCE_SECONDS,
+    RateLimit,
+    RateLimitBackend,
+    RateLimitResult,
+    gcra_result,
+)
+
+# GCRA (see RateLimitBackend) as one atomic script, with the clock of the redis server so that
+# all workers agree on the time. The TAT expires once the limit is fully replenished.
+# NOTE: numbers are returned as strings, redis truncates lua numbers to integers. They are
+# formatted with microsecond precision, tostring() keeps only 14 significant digits.
+GCRA_SCRIPT = """
+local emission_interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local tolerance = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local new_tat = tat + emission_interval
+if new_tat - period > now + tolerance then
+    return {0, string.format('%.6f', tat), string.format('%.6f', now)}
+end
+redis.call('SET', KEYS[1], string.format('%.6f', new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, string.format('%.6f', new_tat), string.format('%.6f', now)}
+"""
+
+KEY_PREFIX = "ratelimit"
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Keeps the rate limit state in redis, shared by all workers, so that the limits hold across
+    them. One round trip per hit.
+    NOTE: redis is an optional dependency of the project, install the "redis" extra to use this
+    backend.
+    """
+
+    def __init__(self, redis_url: str):
+        from redis.asyncio import Redis
+
+        self._redis: Redis = Redis.from_url(redis_url)
+        self._gcra_script: Any = self._redis.register_script(GCRA_SCRIPT)
+
+    @property
+    def backend_type(self) -> RateLimitBackendType:
+        return RateLimitBackendType.REDIS
+
+    async def hit(self, key: str, rate_limit: RateLimit) -> RateLimitResult:
+        allowed, tat, now = await self._gcra_script(
+            keys=[
+                f"{KEY_PREFIX}:{rate_limit.name}:{rate_limit.amount}/{rate_limit.period_seconds}:{key}"
+            ],
+            args=[rate_limit.emission_interval, rate_limit.period_seconds, GCRA_TOLERANCE_SECONDS],
+        )
+        return gcra_result(float(tat), float(now), bool(allowed), rate_limit, float(now))
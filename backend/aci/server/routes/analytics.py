@@ -1,8 +1,7 @@
 from datetime import datetime, timedelta
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 from fastapi import APIRouter, Depends
-from logfire.experimental.query_client import AsyncLogfireQueryClient
 
 from aci.common.db import crud
 from aci.common.logging_setup import get_logger
@@ -10,10 +9,20 @@ from aci.common.schemas.analytics import DistributionDatapoint, TimeSeriesDatapo
 from aci.server import config
 from aci.server import dependencies as deps
 
+if TYPE_CHECKING:
+    from logfire.experimental.query_client import AsyncLogfireQueryClient
+
 router = APIRouter()
 logger = get_logger(__name__)
 
 
+def _get_logfire_query_client() -> "AsyncLogfireQueryClient":
+    # imported lazily to keep logfire out of the server's startup import path
+    from logfire.experimental.query_client import AsyncLogfireQueryClient
+
+    return AsyncLogfireQueryClient(read_token=config.LOGFIRE_READ_TOKEN)
+
+
 def _get_project_api_key_ids_sql_list(context: deps.RequestContext) -> str | None:
     project_api_key_ids = crud.projects.get_all_api_key_ids_for_project(
         context.db_session, context.project.id
@@ -47,7 +56,7 @@ GROUP BY name
 ORDER BY value DESC;
     """
 
-    async with AsyncLogfireQueryClient(read_token=config.LOGFIRE_READ_TOKEN) as client:
+    async with _get_logfire_query_client() as client:
         json_rows = await client.query_json_rows(
             sql=query, min_timestamp=datetime.now() - timedelta(days=7)
         )
@@ -76,7 +85,7 @@ GROUP BY name
 ORDER BY value DESC;
     """
 
-    async with AsyncLogfireQueryClient(read_token=config.LOGFIRE_READ_TOKEN) as client:
+    async with _get_logfire_query_client() as client:
         json_rows = await client.query_json_rows(
             sql=query, min_timestamp=datetime.now() - timedelta(days=7)
         )
@@ -106,7 +115,7 @@ GROUP BY app_name, x
 ORDER BY x DESC;
     """
 
-    async with AsyncLogfireQueryClient(read_token=config.LOGFIRE_READ_TOKEN) as client:
+    async with _get_logfire_query_client() as client:
         json_rows = await client.query_json_rows(
             sql=query, min_timestamp=datetime.now() - timedelta(days=7)
         )
@@ -151,7 +160,7 @@ GROUP BY function_name, x
 ORDER BY x DESC;
     """
 
-    async with AsyncLogfireQueryClient(read_token=config.LOGFIRE_READ_TOKEN) as client:
+    async with _get_logfire_query_client() as client:
         json_rows = await client.query_json_rows(
             sql=query, min_timestamp=datetime.now() - timedelta(days=7)
         )
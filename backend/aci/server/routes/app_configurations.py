@@ -1,6 +1,8 @@
+from datetime import datetime
 from typing import Annotated
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
 from aci.common.db import crud
 from aci.common.db.sql_models import AppConfiguration
@@ -18,6 +20,7 @@ from aci.common.schemas.app_configurations import (
     AppConfigurationsList,
     AppConfigurationUpdate,
 )
+from aci.common.utils import decode_cursor, encode_cursor
 from aci.server import config
 from aci.server import dependencies as deps
 
@@ -74,16 +77,33 @@ async def create_app_configuration(
 async def list_app_configurations(
     context: Annotated[deps.RequestContext, Depends(deps.get_request_context)],
     query_params: Annotated[AppConfigurationsList, Query()],
+    response: Response,
 ) -> list[AppConfiguration]:
-    """List all app configurations for a project, with optionally filters"""
+    """
+    List all app configurations for a project, with optionally filters.
+    Paginated by either offset or cursor (from the X-Next-Cursor header of the previous response).
+    """
+
+    after: tuple[datetime, UUID] | None = None
+    if query_params.cursor:
+        created_at, id_ = decode_cursor(query_params.cursor, 2)
+        after = (datetime.fromisoformat(created_at), UUID(id_))
 
-    return crud.app_configurations.get_app_configurations(
+    app_configurations = crud.app_configurations.get_app_configurations(
         context.db_session,
         context.project.id,
         query_params.app_names,
         query_params.limit,
         query_params.offset,
+        after=after,
     )
+    if len(app_configurations) == query_params.limit:
+        last = app_configurations[-1]
+        response.headers[config.NEXT_CURSOR_HEADER] = encode_cursor(
+            [last.created_at.isoformat(), str(last.id)]
+        )
+
+    return app_configurations
 
 
 @router.get("/{app_name}", response_model=AppConfigurationPublic, response_model_exclude_none=True)
@@ -1,10 +1,9 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query
-from openai import OpenAI
+from fastapi import APIRouter, Depends, Query, Response
 
 from aci.common.db import crud
-from aci.common.embeddings import generate_embedding
+from aci.common.db.sql_models import Function
 from aci.common.enums import Visibility
 from aci.common.exceptions import AppNotFound
 from aci.common.logging_setup import get_logger
@@ -16,22 +15,24 @@ from aci.common.schemas.app import (
 )
 from aci.common.schemas.function import BasicFunctionDefinition, FunctionDetails
 from aci.common.schemas.security_scheme import SecuritySchemesPublic
-from aci.server import config
+from aci.common.utils import decode_cursor, encode_cursor
+from aci.server import config, utils
 from aci.server import dependencies as deps
+from aci.server.bounded_json import dumps_bounded
 
 logger = get_logger(__name__)
 router = APIRouter()
-# TODO: will this be a bottleneck and problem if high concurrent requests from users?
-openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
 
 
 @router.get("", response_model_exclude_none=True)
 async def list_apps(
     context: Annotated[deps.RequestContext, Depends(deps.get_request_context)],
     query_params: Annotated[AppsList, Query()],
+    response: Response,
 ) -> list[AppDetails]:
     """
     Get a list of Apps and their details. Sorted by App name.
+    Paginated by either offset or cursor (from the X-Next-Cursor header of the previous response).
     """
     apps = crud.apps.get_apps(
         context.db_session,
@@ -40,11 +41,15 @@ async def list_apps(
         query_params.app_names,
         query_params.limit,
         query_params.offset,
+        include_functions=True,
+        after_name=decode_cursor(query_params.cursor, 1)[0] if query_params.cursor else None,
     )
+    if len(apps) == query_params.limit:
+        response.headers[config.NEXT_CURSOR_HEADER] = encode_cursor([apps[-1].name])
 
     # TODO: Now if include_functions=true, it returns all functions of the app whether or not it is enabled by the agent.
     # We can either add a optional filtering logic or add a flag to clarify whether each function is enabled by the agent.
-    response: list[AppDetails] = []
+    app_details_list: list[AppDetails] = []
     for app in apps:
         app_details = AppDetails(
             id=app.id,
@@ -60,13 +65,13 @@ async def list_apps(
             security_schemes=list(app.security_schemes.keys()),
             # TODO: check validation latency
             supported_security_schemes=SecuritySchemesPublic.model_validate(app.security_schemes),
-            functions=[FunctionDetails.model_validate(function) for function in app.functions],
+            functions=[_to_function_details(function) for function in app.functions],
             created_at=app.created_at,
             updated_at=app.updated_at,
         )
-        response.append(app_details)
+        app_details_list.append(app_details)
 
-    return response
+    return app_details_list
 
 
 @router.get("/search", response_model_exclude_none=True)
@@ -85,12 +90,7 @@ async def search_apps(
     # We can either add a optional filtering logic or add a flag to clarify whether each function is enabled by the agent.
 
     intent_embedding = (
-        generate_embedding(
-            openai_client,
-            config.OPENAI_EMBEDDING_MODEL,
-            config.OPENAI_EMBEDDING_DIMENSION,
-            query_params.intent,
-        )
+        await utils.get_embedding_batcher().embed(query_params.intent)
         if query_params.intent
         else None
     )
@@ -110,6 +110,9 @@ async def search_apps(
         intent_embedding,
         query_params.limit,
         query_params.offset,
+        include_functions=query_params.include_functions,
+        embedding_model=utils.get_embedding_provider().model_id,
+        embedding_search_mode=config.EMBEDDING_SEARCH_MODE,
     )
 
     apps: list[AppBasic] = []
@@ -128,7 +131,7 @@ async def search_apps(
         "Search apps result",
         extra={
             "search_apps": {
-                "query_params_json": query_params.model_dump_json(),
+                "query_params_json": dumps_bounded(query_params, config.MAX_LOG_FIELD_SIZE),
                 "app_names": [app.name for app, _ in apps_with_scores],
             },
         },
@@ -182,9 +185,30 @@ async def get_app_details(
         active=app.active,
         security_schemes=list(app.security_schemes.keys()),
         supported_security_schemes=SecuritySchemesPublic.model_validate(app.security_schemes),
-        functions=[FunctionDetails.model_validate(function) for function in functions],
+        functions=[_to_function_details(function) for function in functions],
         created_at=app.created_at,
         updated_at=app.updated_at,
     )
 
     return app_details
+
+
+def _to_function_details(function: Function) -> FunctionDetails:
+    # NOTE: built directly from the loaded function instead of FunctionDetails.model_validate(function)
+    # to skip the from_attributes lookup of every field for every function of every app.
+    # function.app is a many-to-one already in the identity map (the parent app), so no query here.
+    return FunctionDetails(
+        id=function.id,
+        app_name=function.app_name,
+        name=function.name,
+        description=function.description,
+        tags=function.tags,
+        visibility=function.visibility,
+        active=function.active,
+        protocol=function.protocol,
+        protocol_data=function.protocol_data,
+        parameters=function.parameters,
+        response=function.response,
+        created_at=function.created_at,
+        updated_at=function.updated_at,
+    )
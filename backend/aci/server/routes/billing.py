@@ -36,6 +36,8 @@ logger = get_logger(__name__)
 
 auth = acl.get_propelauth()
 
+stripe.api_key = config.STRIPE_SECRET_KEY
+
 
 @router.get("/get-subscription", response_model=SubscriptionPublic)
 async def get_subscription(
@@ -1,9 +1,8 @@
 import uuid
 from datetime import datetime
-from typing import Annotated, Any
+from typing import TYPE_CHECKING, Annotated, Any
 
 from fastapi import APIRouter, Depends, Query
-from langchain_openai import OpenAIEmbeddings
 from pgvector.sqlalchemy import Vector
 from pydantic import SecretStr
 from sqlalchemy import Column, DateTime, String, Text
@@ -18,6 +17,9 @@ from aci.common.logging_setup import get_logger
 from aci.server import config
 from aci.server import dependencies as deps
 
+if TYPE_CHECKING:
+    from langchain_openai import OpenAIEmbeddings
+
 router = APIRouter()
 logger = get_logger(__name__)
 
@@ -37,7 +39,10 @@ class Document(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
-def _get_embedding_model() -> OpenAIEmbeddings:
+def _get_embedding_model() -> "OpenAIEmbeddings":
+    # imported lazily, langchain is expensive to import and only needed by this route
+    from langchain_openai import OpenAIEmbeddings
+
     return OpenAIEmbeddings(
         model=config.OPENAI_EMBEDDING_MODEL, api_key=SecretStr(config.OPENAI_API_KEY)
     )
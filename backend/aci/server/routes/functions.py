@@ -1,16 +1,16 @@
-import json
+import asyncio
 from datetime import UTC, datetime
 from typing import Annotated
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from openai import OpenAI
 from sqlalchemy.orm import Session
 
 from aci.common import processor
-from aci.common.db import crud
+from aci.common.db import catalog_version, crud
 from aci.common.db.sql_models import Agent, Function, Project
-from aci.common.embeddings import generate_embedding
-from aci.common.enums import FunctionDefinitionFormat, Visibility
+from aci.common.enums import FunctionDefinitionFormat, RequestStage, Visibility
 from aci.common.exceptions import (
     AppConfigurationDisabled,
     AppConfigurationNotFound,
@@ -28,16 +28,20 @@ from aci.common.schemas.function import (
     FunctionDetails,
     FunctionExecute,
     FunctionExecutionResult,
+    FunctionsBatchSearch,
     FunctionsList,
     FunctionsSearch,
     OpenAIFunction,
     OpenAIFunctionDefinition,
     OpenAIResponsesFunctionDefinition,
 )
-from aci.server import config, custom_instructions, utils
+from aci.common.utils import decode_cursor, encode_cursor
+from aci.server import config, custom_instructions, timing, utils
 from aci.server import dependencies as deps
 from aci.server import security_credentials_manager as scm
+from aci.server.bounded_json import dumps_bounded
 from aci.server.function_executors import get_executor
+from aci.server.function_search_cache import FunctionSearchCacheKey
 from aci.server.security_credentials_manager import SecurityCredentialsResponse
 
 router = APIRouter()
@@ -51,16 +55,25 @@ openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
 async def list_functions(
     context: Annotated[deps.RequestContext, Depends(deps.get_request_context)],
     query_params: Annotated[FunctionsList, Query()],
+    response: Response,
 ) -> list[Function]:
-    """Get a list of functions and their details. Sorted by function name."""
-    return crud.functions.get_functions(
+    """
+    Get a list of functions and their details. Sorted by function name.
+    Paginated by either offset or cursor (from the X-Next-Cursor header of the previous response).
+    """
+    functions = crud.functions.get_functions(
         context.db_session,
         context.project.visibility_access == Visibility.PUBLIC,
         True,
         query_params.app_names,
         query_params.limit,
         query_params.offset,
+        after_name=decode_cursor(query_params.cursor, 1)[0] if query_params.cursor else None,
     )
+    if len(functions) == query_params.limit:
+        response.headers[config.NEXT_CURSOR_HEADER] = encode_cursor([functions[-1].name])
+
+    return functions
 
 
 @router.get("/search", response_model_exclude_none=True)
@@ -79,13 +92,40 @@ async def search_functions(
     # TODO: currently the search is done across all apps, we might want to add flags to account for below scenarios:
     # - when clients search for functions, if the app of the functions is configured but disabled by client, should the functions be discoverable?
 
-    intent_embedding = (
-        generate_embedding(
-            openai_client,
-            config.OPENAI_EMBEDDING_MODEL,
-            config.OPENAI_EMBEDDING_DIMENSION,
-            query_params.intent,
+    # if "allowed_only" (or "allowed_apps_only" for backward compatibility) is true, search functions from enabled functions under allowed apps only.
+    apps_to_filter, enabled_in_project_id = _get_search_filters(
+        context,
+        query_params.app_names,
+        query_params.allowed_only or query_params.allowed_apps_only,
+    )
+
+    search_cache = utils.get_function_search_cache()
+    search_cache_key = FunctionSearchCacheKey.create(
+        context.project.visibility_access,
+        apps_to_filter,
+        enabled_in_project_id,
+        query_params.intent,
+        query_params.format,
+        query_params.limit,
+        query_params.offset,
+    )
+    # NOTE: the version must be read before the search, so that a result computed from a catalog
+    # that changed during the search is stored under an already outdated version
+    search_catalog_version = catalog_version.get_catalog_version(context.db_session)
+    cached_function_definitions = search_cache.get(search_cache_key, search_catalog_version)
+    if cached_function_definitions is not None:
+        logger.info(
+            "Search functions result from cache",
+            extra={
+                "search_functions": {
+                    "query_params_json": dumps_bounded(query_params, config.MAX_LOG_FIELD_SIZE)
+                }
+            },
         )
+        return cached_function_definitions
+
+    intent_embedding = (
+        await utils.get_embedding_batcher().embed(query_params.intent)
         if query_params.intent
         else None
     )
@@ -93,58 +133,25 @@ async def search_functions(
         f"Generated intent embedding, intent={query_params.intent}, intent_embedding={intent_embedding}"
     )
 
-    # if "allowed_only" (or "allowed_apps_only" for backward compatibility) is true, search functions from enabled functions under allowed apps only.
-    enabled_function_names: list[str] | None = None
-    if query_params.allowed_only or query_params.allowed_apps_only:
-        if query_params.app_names is None:
-            apps_to_filter = context.agent.allowed_apps
-        else:
-            apps_to_filter = list(set(query_params.app_names) & set(context.agent.allowed_apps))
-
-        # TODO: currently it fetches all allowed functions of the agents and compare the function names in code runtime to see if they are enabled.
-        # It may not be efficient if the number of apps / enabled functions is large. We can modify the db schema to create relational table between
-        # app config and functions. So we can filter by joining the tables which is more efficient.
-
-        # Compute the enabled function names from the app configurations of the filtered apps
-        enabled_function_names = []
-        app_configs = crud.app_configurations.get_app_configurations(
-            context.db_session,
-            context.project.id,
-            apps_to_filter,
-            None,
-            None,
-        )
-        for app_config in app_configs:
-            if app_config.enabled:
-                if app_config.all_functions_enabled:
-                    enabled_function_names.extend(
-                        [function.name for function in app_config.app.functions]
-                    )
-                else:
-                    enabled_function_names.extend(app_config.enabled_functions)
-    else:
-        # Not filter by allowed functions. Simply search from all apps or follow the app names filter.
-        if query_params.app_names is None:
-            apps_to_filter = None
-        else:
-            apps_to_filter = query_params.app_names
-
     functions = crud.functions.search_functions(
         context.db_session,
         context.project.visibility_access == Visibility.PUBLIC,
         True,
         apps_to_filter,
-        enabled_function_names,
+        None,
         intent_embedding,
         query_params.limit,
         query_params.offset,
+        embedding_model=utils.get_embedding_provider().model_id,
+        embedding_search_mode=config.EMBEDDING_SEARCH_MODE,
+        enabled_in_project_id=enabled_in_project_id,
     )
 
     logger.info(
         "Search functions result",
         extra={
             "search_functions": {
-                "query_params_json": query_params.model_dump_json(),
+                "query_params_json": dumps_bounded(query_params, config.MAX_LOG_FIELD_SIZE),
                 "function_names": [function.name for function in functions],
             }
         },
@@ -152,10 +159,86 @@ async def search_functions(
     function_definitions = [
         format_function_definition(function, query_params.format) for function in functions
     ]
+    search_cache.set(search_cache_key, search_catalog_version, function_definitions)
 
     return function_definitions
 
 
+@router.post("/search/batch", response_model_exclude_none=True)
+async def search_functions_batch(
+    context: Annotated[deps.RequestContext, Depends(deps.get_request_context)],
+    body: FunctionsBatchSearch,
+) -> list[
+    list[
+        BasicFunctionDefinition
+        | OpenAIFunctionDefinition
+        | OpenAIResponsesFunctionDefinition
+        | AnthropicFunctionDefinition
+    ]
+]:
+    """
+    Search functions for multiple intents at once, e.g., the sub-intents of a task.
+    Returns one list of functions per intent (in the order of the intents), each sorted by
+    relevance to its intent. Supports the same filters as the search of a single intent.
+    """
+    deps.use_monthly_api_quota(context.db_session, context.project, len(body.intents))
+
+    # NOTE: the intents arrive at the embedding batcher together, so they are embedded in one batch
+    intent_embeddings = await asyncio.gather(
+        *(utils.get_embedding_batcher().embed(intent) for intent in body.intents)
+    )
+
+    apps_to_filter, enabled_in_project_id = _get_search_filters(
+        context, body.app_names, body.allowed_only
+    )
+    functions_per_intent = crud.functions.search_functions_batch(
+        context.db_session,
+        context.project.visibility_access == Visibility.PUBLIC,
+        True,
+        apps_to_filter,
+        intent_embeddings,
+        body.limit,
+        body.offset,
+        embedding_model=utils.get_embedding_provider().model_id,
+        enabled_in_project_id=enabled_in_project_id,
+    )
+
+    logger.info(
+        "Search functions batch result",
+        extra={
+            "search_functions_batch": {
+                "body_json": dumps_bounded(body, config.MAX_LOG_FIELD_SIZE),
+                "function_names": [
+                    [function.name for function in functions] for functions in functions_per_intent
+                ],
+            }
+        },
+    )
+    return [
+        [format_function_definition(function, body.format) for function in functions]
+        for functions in functions_per_intent
+    ]
+
+
+def _get_search_filters(
+    context: deps.RequestContext, app_names: list[str] | None, allowed_only: bool
+) -> tuple[list[str] | None, UUID | None]:
+    """
+    Get the apps to filter by and the project whose enabled functions to filter by (if any) of a
+    function search.
+    """
+    if allowed_only:
+        if app_names is None:
+            apps_to_filter = context.agent.allowed_apps
+        else:
+            apps_to_filter = list(set(app_names) & set(context.agent.allowed_apps))
+        # the functions enabled in the project's app configurations are filtered in the query
+        return apps_to_filter, context.project.id
+    else:
+        # Not filter by allowed functions. Simply search from all apps or follow the app names filter.
+        return app_names, None
+
+
 # TODO: have "structured_outputs" flag ("structured_outputs_if_possible") to support openai's structured outputs function calling?
 # which need "strict: true" and only support a subset of json schema and a bunch of other restrictions like "All fields must be required"
 # If you turn on Structured Outputs by supplying strict: true and call the API with an unsupported JSON Schema, you will receive an error.
@@ -235,19 +318,14 @@ async def execute(
 
     end_time = datetime.now(UTC)
 
-    # TODO: reconsider the implementation handling large log fields
     try:
-        execute_result_data = utils.truncate_if_too_large(
-            json.dumps(result.data, default=str), config.MAX_LOG_FIELD_SIZE
-        )
+        execute_result_data = dumps_bounded(result.data, config.MAX_LOG_FIELD_SIZE)
     except Exception:
         logger.exception("Failed to dump execute_result_data")
         execute_result_data = "failed to dump execute_result_data"
 
     try:
-        function_input_data = utils.truncate_if_too_large(
-            json.dumps(body.function_input, default=str), config.MAX_LOG_FIELD_SIZE
-        )
+        function_input_data = dumps_bounded(body.function_input, config.MAX_LOG_FIELD_SIZE)
     except Exception:
         logger.exception("Failed to dump function_input_data")
         function_input_data = "failed to dump function_input_data"
@@ -349,22 +427,25 @@ async def execute_function(
         LinkedAccountDisabled: If the linked account is disabled
     """
     # Get the function
-    function = crud.functions.get_function(
-        db_session,
-        function_name,
-        project.visibility_access == Visibility.PUBLIC,
-        True,
-    )
+    with timing.span(RequestStage.FUNCTION_LOOKUP):
+        function = crud.functions.get_function(
+            db_session,
+            function_name,
+            project.visibility_access == Visibility.PUBLIC,
+            True,
+        )
     if not function:
         logger.error(
             f"Failed to execute function, function not found, function_name={function_name}"
         )
         raise FunctionNotFound(f"function={function_name} not found")
+    timing.set_app_name(function.app.name)
 
     # Check if the App (that this function belongs to) is configured
-    app_configuration = crud.app_configurations.get_app_configuration(
-        db_session, project.id, function.app.name
-    )
+    with timing.span(RequestStage.APP_CONFIGURATION_LOOKUP):
+        app_configuration = crud.app_configurations.get_app_configuration(
+            db_session, project.id, function.app.name
+        )
     if not app_configuration:
         logger.error(
             f"Failed to execute function, app configuration not found, "
@@ -406,12 +487,13 @@ async def execute_function(
         )
 
     # Check if the linked account status (configured, enabled, etc.)
-    linked_account = crud.linked_accounts.get_linked_account(
-        db_session,
-        project.id,
-        function.app.name,
-        linked_account_owner_id,
-    )
+    with timing.span(RequestStage.LINKED_ACCOUNT_LOOKUP):
+        linked_account = crud.linked_accounts.get_linked_account(
+            db_session,
+            project.id,
+            function.app.name,
+            linked_account_owner_id,
+        )
     if not linked_account:
         logger.error(
             f"Failed to execute function, linked account not found, "
@@ -432,13 +514,16 @@ async def execute_function(
             f"please enable the account for this app here: {config.DEV_PORTAL_URL}/appconfigs/{function.app.name}"
         )
 
-    security_credentials_response: SecurityCredentialsResponse = await scm.get_security_credentials(
-        app_configuration.app, app_configuration, linked_account
-    )
+    with timing.span(RequestStage.SECURITY_CREDENTIALS):
+        security_credentials_response: SecurityCredentialsResponse = (
+            await scm.get_security_credentials(
+                db_session, app_configuration.app, app_configuration, linked_account
+            )
+        )
 
-    scm.update_security_credentials(
-        db_session, function.app, linked_account, security_credentials_response
-    )
+        scm.update_security_credentials(
+            db_session, function.app, linked_account, security_credentials_response
+        )
 
     logger.info(
         f"Fetched security credentials for function execution, function_name={function_name}, "
@@ -448,12 +533,13 @@ async def execute_function(
     )
     db_session.commit()
 
-    custom_instructions.check_for_violation(
-        openai_client,
-        function,
-        function_input,
-        agent.custom_instructions,
-    )
+    with timing.span(RequestStage.CUSTOM_INSTRUCTIONS):
+        custom_instructions.check_for_violation(
+            openai_client,
+            function,
+            function_input,
+            agent.custom_instructions,
+        )
 
     function_executor = get_executor(function.protocol, linked_account)
     logger.info(
@@ -462,20 +548,22 @@ async def execute_function(
     )
 
     # Execute the function
-    execution_result = function_executor.execute(
-        function,
-        function_input,
-        security_credentials_response.scheme,
-        security_credentials_response.credentials,
-    )
+    with timing.span(RequestStage.UPSTREAM):
+        execution_result = function_executor.execute(
+            function,
+            function_input,
+            security_credentials_response.scheme,
+            security_credentials_response.credentials,
+        )
 
-    last_used_at: datetime = datetime.now(UTC)
-    crud.linked_accounts.update_linked_account_last_used_at(
-        db_session,
-        last_used_at,
-        linked_account,
-    )
-    db_session.commit()
+    with timing.span(RequestStage.LINKED_ACCOUNT_UPDATE):
+        last_used_at: datetime = datetime.now(UTC)
+        crud.linked_accounts.update_linked_account_last_used_at(
+            db_session,
+            last_used_at,
+            linked_account,
+        )
+        db_session.commit()
 
     if not execution_result.success:
         logger.error(
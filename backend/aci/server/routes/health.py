@@ -1,6 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
 
 from aci.common.logging_setup import get_logger
+from aci.server.dependency_check import check_dependencies_ready
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -10,3 +11,14 @@ router = APIRouter()
 @router.get("", include_in_schema=False)
 async def health() -> bool:
     return True
+
+
+@router.get("/ready", include_in_schema=False)
+async def ready(response: Response) -> bool:
+    """
+    Readiness probe. Returns 503 until the external dependencies (e.g., AWS KMS) are reachable.
+    """
+    is_ready = await check_dependencies_ready()
+    if not is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return is_ready
@@ -1,8 +1,9 @@
+from datetime import datetime
 from typing import Annotated
 from uuid import UUID
 
 from authlib.jose import jwt
-from fastapi import APIRouter, Body, Depends, Query, Request, status
+from fastapi import APIRouter, Body, Depends, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from starlette.responses import RedirectResponse
 
@@ -35,6 +36,7 @@ from aci.common.schemas.security_scheme import (
     APIKeySchemeCredentials,
     NoAuthSchemeCredentials,
 )
+from aci.common.utils import decode_cursor, encode_cursor
 from aci.server import config, quota_manager
 from aci.server import dependencies as deps
 from aci.server import security_credentials_manager as scm
@@ -566,25 +568,38 @@ async def linked_accounts_oauth2_callback(
     return linked_account
 
 
-# TODO: add pagination
 @router.get("", response_model=list[LinkedAccountPublic])
 async def list_linked_accounts(
     context: Annotated[deps.RequestContext, Depends(deps.get_request_context)],
     query_params: Annotated[LinkedAccountsList, Query()],
+    response: Response,
 ) -> list[LinkedAccount]:
     """
     List all linked accounts.
     - Optionally filter by app_name and linked_account_owner_id.
     - app_name + linked_account_owner_id can uniquely identify a linked account.
     - This can be an alternatively way to GET /linked-accounts/{linked_account_id} for getting a specific linked account.
+    - Optionally paginated by limit and cursor (from the X-Next-Cursor header of the previous response).
     """
 
+    after: tuple[datetime, UUID] | None = None
+    if query_params.cursor:
+        created_at, id_ = decode_cursor(query_params.cursor, 2)
+        after = (datetime.fromisoformat(created_at), UUID(id_))
+
     linked_accounts = crud.linked_accounts.get_linked_accounts(
         context.db_session,
         context.project.id,
         query_params.app_name,
         query_params.linked_account_owner_id,
+        query_params.limit,
+        after=after,
     )
+    if query_params.limit is not None and len(linked_accounts) == query_params.limit:
+        last = linked_accounts[-1]
+        response.headers[config.NEXT_CURSOR_HEADER] = encode_cursor(
+            [last.created_at.isoformat(), str(last.id)]
+        )
 
     return linked_accounts
 
@@ -624,7 +639,7 @@ async def get_linked_account(
         )
 
     security_credentials_response = await scm.get_security_credentials(
-        linked_account.app, app_configuration, linked_account
+        context.db_session, linked_account.app, app_configuration, linked_account
     )
     scm.update_security_credentials(
         context.db_session, linked_account.app, linked_account, security_credentials_response
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from aci.server import metrics
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# NOTE: per worker process, see aci.server.metrics
+@router.get("", include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(content=metrics.generate_latest(), media_type=PROMETHEUS_CONTENT_TYPE)
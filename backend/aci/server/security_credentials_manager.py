@@ -1,4 +1,7 @@
+import asyncio
 import time
+import weakref
+from uuid import UUID
 
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -17,10 +20,17 @@ from aci.common.schemas.security_scheme import (
     OAuth2SchemeCredentials,
     SecuritySchemeOverrides,
 )
+from aci.server import config
 from aci.server.oauth2_manager import OAuth2Manager
 
 logger = get_logger(__name__)
 
+_REFRESH_LOCK_POLL_INTERVAL_SECONDS = 0.05
+
+# per linked account locks of this process, so that concurrent requests for the same linked account
+# don't all refresh its access token. Locks are dropped once no request holds or waits for them.
+_refresh_locks: weakref.WeakValueDictionary[UUID, asyncio.Lock] = weakref.WeakValueDictionary()
+
 
 # TODO: only pass necessary data to the functions
 class SecurityCredentialsResponse(BaseModel):
@@ -31,12 +41,30 @@ class SecurityCredentialsResponse(BaseModel):
 
 
 async def get_security_credentials(
-    app: App, app_configuration: AppConfiguration, linked_account: LinkedAccount
+    db_session: Session,
+    app: App,
+    app_configuration: AppConfiguration,
+    linked_account: LinkedAccount,
 ) -> SecurityCredentialsResponse:
+    """
+    Get the security credentials of a linked account, refreshing an OAuth2 access token that is
+    expired or about to expire.
+
+    NOTE: while an access token is refreshed, the linked account is locked (see
+    crud.linked_accounts.try_lock_linked_account) until the transaction of db_session ends, so the
+    caller should persist the refreshed credentials (update_security_credentials) and commit right
+    away.
+    """
     if linked_account.security_scheme == SecurityScheme.API_KEY:
         return _get_api_key_credentials(app, linked_account)
     elif linked_account.security_scheme == SecurityScheme.OAUTH2:
-        return await _get_oauth2_credentials(app, app_configuration, linked_account)
+        return await _get_oauth2_credentials(
+            db_session,
+            app,
+            app_configuration,
+            linked_account,
+            config.OAUTH2_ACCESS_TOKEN_EXPIRY_LEEWAY_SECONDS,
+        )
     elif linked_account.security_scheme == SecurityScheme.NO_AUTH:
         return _get_no_auth_credentials(app, linked_account)
     else:
@@ -84,52 +112,98 @@ def update_security_credentials(
     db_session.refresh(linked_account)
 
 
+async def renew_oauth2_credentials(
+    db_session: Session,
+    app_configuration: AppConfiguration,
+    linked_account: LinkedAccount,
+    renewal_window_seconds: int,
+) -> SecurityCredentialsResponse | None:
+    """
+    Refresh the OAuth2 access token of a linked account ahead of time if it expires within
+    renewal_window_seconds, for the background renewal (see aci.server.oauth2_token_renewer).
+    Returns None if another request is refreshing the access token at the moment.
+    Unlike get_security_credentials, the DB work runs in a worker thread, so that the event loop
+    isn't blocked on it (db_session must not be used by anything else meanwhile), and the app of
+    app_configuration must be loaded. Like for get_security_credentials, the caller should persist
+    the credentials and commit right away.
+    """
+    refresh_lock = _refresh_locks.setdefault(linked_account.id, asyncio.Lock())
+    if refresh_lock.locked():
+        # a request of this process is refreshing the access token
+        return None
+    async with refresh_lock:
+        if not await asyncio.to_thread(
+            _try_lock_and_refresh_linked_account, db_session, linked_account
+        ):
+            return None
+        is_updated = False
+        oauth2_scheme = get_app_configuration_oauth2_scheme(
+            app_configuration.app, app_configuration
+        )
+        oauth2_scheme_credentials = OAuth2SchemeCredentials.model_validate(
+            linked_account.security_credentials
+        )
+        # another request might have refreshed the access token in the meantime
+        if _access_token_is_expired(oauth2_scheme_credentials, renewal_window_seconds):
+            oauth2_scheme_credentials = await _refresh_oauth2_credentials(
+                app_configuration.app, oauth2_scheme, oauth2_scheme_credentials, linked_account
+            )
+            is_updated = True
+
+    return SecurityCredentialsResponse(
+        scheme=oauth2_scheme,
+        credentials=oauth2_scheme_credentials,
+        is_app_default_credentials=False,
+        is_updated=is_updated,
+    )
+
+
+def _try_lock_and_refresh_linked_account(
+    db_session: Session, linked_account: LinkedAccount
+) -> bool:
+    if not crud.linked_accounts.try_lock_linked_account(db_session, linked_account.id):
+        return False
+    db_session.refresh(linked_account)
+    return True
+
+
 async def _get_oauth2_credentials(
-    app: App, app_configuration: AppConfiguration, linked_account: LinkedAccount
+    db_session: Session,
+    app: App,
+    app_configuration: AppConfiguration,
+    linked_account: LinkedAccount,
+    leeway_seconds: int,
 ) -> SecurityCredentialsResponse:
     """Get OAuth2 credentials from linked account or app's default credentials.
-    If the access token is expired, it will be refreshed.
+    If the access token is expired (or expires within leeway_seconds), it will be refreshed.
+
+    The refresh is single-flight per linked account: only one request (across all server
+    processes) refreshes the access token at a time, the others wait for it and use the refreshed
+    access token. Besides saving calls to the OAuth2 provider, this matters for apps whose refresh
+    tokens can only be used once, where concurrent refreshes invalidate each other.
     """
     is_updated = False
     oauth2_scheme = get_app_configuration_oauth2_scheme(app_configuration.app, app_configuration)
     oauth2_scheme_credentials = OAuth2SchemeCredentials.model_validate(
         linked_account.security_credentials
     )
-    if _access_token_is_expired(oauth2_scheme_credentials):
-        logger.warning(
-            f"Access token expired, trying to refresh linked_account_id={linked_account.id}, "
-            f"security_scheme={linked_account.security_scheme}, app={app.name}"
-        )
-        token_response = await _refresh_oauth2_access_token(
-            app.name, oauth2_scheme, oauth2_scheme_credentials
-        )
-        # TODO: refactor parsing to _refresh_oauth2_access_token
-        expires_at: int | None = None
-        if "expires_at" in token_response:
-            expires_at = int(token_response["expires_at"])
-        elif "expires_in" in token_response:
-            expires_at = int(time.time()) + int(token_response["expires_in"])
-
-        if not token_response.get("access_token") or not expires_at:
-            logger.error(
-                f"Failed to refresh access token, token_response={token_response}, "
-                f"app={app.name}, linked_account_id={linked_account.id}, "
-                f"security_scheme={linked_account.security_scheme}"
+    if _access_token_is_expired(oauth2_scheme_credentials, leeway_seconds):
+        # NOTE: the process local lock keeps the requests of this process from polling the DB lock
+        # while one of them refreshes the access token
+        refresh_lock = _refresh_locks.setdefault(linked_account.id, asyncio.Lock())
+        async with refresh_lock:
+            await _lock_linked_account(db_session, linked_account)
+            # another request might have refreshed the access token while this one was waiting
+            # for the lock, in which case its access token is used
+            db_session.refresh(linked_account)
+            oauth2_scheme_credentials = OAuth2SchemeCredentials.model_validate(
+                linked_account.security_credentials
             )
-            raise OAuth2Error("failed to refresh access token")
-
-        fields_to_update = {
-            "access_token": token_response["access_token"],
-            "expires_at": expires_at,
-        }
-        # NOTE: some app's refresh token can only be used once, so we need to update the refresh token (if returned)
-        if token_response.get("refresh_token"):
-            fields_to_update["refresh_token"] = token_response["refresh_token"]
-
-        oauth2_scheme_credentials = oauth2_scheme_credentials.model_copy(
-            update=fields_to_update,
-        )
-        is_updated = True
+            if _access_token_is_expired(oauth2_scheme_credentials, leeway_seconds):
+                oauth2_scheme_credentials = await _refresh_oauth2_credentials(
+                    app, oauth2_scheme, oauth2_scheme_credentials, linked_account
+                )
+                is_updated = True
 
     return SecurityCredentialsResponse(
         scheme=oauth2_scheme,
@@ -139,6 +213,64 @@ async def _get_oauth2_credentials(
     )
 
 
+async def _lock_linked_account(db_session: Session, linked_account: LinkedAccount) -> None:
+    """
+    Take the DB lock of a linked account, which holds across server processes, polling for it (up
+    to OAUTH2_REFRESH_LOCK_TIMEOUT_SECONDS) instead of blocking the event loop on it.
+    """
+    deadline = time.monotonic() + config.OAUTH2_REFRESH_LOCK_TIMEOUT_SECONDS
+    while not crud.linked_accounts.try_lock_linked_account(db_session, linked_account.id):
+        if time.monotonic() >= deadline:
+            logger.error(
+                f"Timed out waiting for another request to refresh the access token, "
+                f"linked_account_id={linked_account.id}, app={linked_account.app_name}"
+            )
+            raise OAuth2Error("timed out waiting for the access token to be refreshed")
+        await asyncio.sleep(_REFRESH_LOCK_POLL_INTERVAL_SECONDS)
+
+
+async def _refresh_oauth2_credentials(
+    app: App,
+    oauth2_scheme: OAuth2Scheme,
+    oauth2_scheme_credentials: OAuth2SchemeCredentials,
+    linked_account: LinkedAccount,
+) -> OAuth2SchemeCredentials:
+    logger.warning(
+        f"Access token expired or about to expire, trying to refresh "
+        f"linked_account_id={linked_account.id}, "
+        f"security_scheme={linked_account.security_scheme}, app={app.name}"
+    )
+    token_response = await _refresh_oauth2_access_token(
+        app.name, oauth2_scheme, oauth2_scheme_credentials
+    )
+    # TODO: refactor parsing to _refresh_oauth2_access_token
+    expires_at: int | None = None
+    if "expires_at" in token_response:
+        expires_at = int(token_response["expires_at"])
+    elif "expires_in" in token_response:
+        expires_at = int(time.time()) + int(token_response["expires_in"])
+
+    if not token_response.get("access_token") or not expires_at:
+        logger.error(
+            f"Failed to refresh access token, token_response={token_response}, "
+            f"app={app.name}, linked_account_id={linked_account.id}, "
+            f"security_scheme={linked_account.security_scheme}"
+        )
+        raise OAuth2Error("failed to refresh access token")
+
+    fields_to_update = {
+        "access_token": token_response["access_token"],
+        "expires_at": expires_at,
+    }
+    # NOTE: some app's refresh token can only be used once, so we need to update the refresh token (if returned)
+    if token_response.get("refresh_token"):
+        fields_to_update["refresh_token"] = token_response["refresh_token"]
+
+    return oauth2_scheme_credentials.model_copy(
+        update=fields_to_update,
+    )
+
+
 async def _refresh_oauth2_access_token(
     app_name: str, oauth2_scheme: OAuth2Scheme, oauth2_scheme_credentials: OAuth2SchemeCredentials
 ) -> dict:
@@ -209,11 +341,15 @@ def _get_no_auth_credentials(
     )
 
 
-# TODO: consider adding leeway for expiration
-def _access_token_is_expired(oauth2_credentials: OAuth2SchemeCredentials) -> bool:
+def _access_token_is_expired(
+    oauth2_credentials: OAuth2SchemeCredentials, leeway_seconds: int = 0
+) -> bool:
+    """
+    Whether the access token is expired or expires within leeway_seconds.
+    """
     if oauth2_credentials.expires_at is None:
         return False
-    return oauth2_credentials.expires_at < int(time.time())
+    return oauth2_credentials.expires_at < int(time.time()) + leeway_seconds
 
 
 def get_app_configuration_oauth2_scheme(
@@ -52,8 +52,9 @@ logger = logging.getLogger(__name__)
 
 auth = acl.get_propelauth()
 
-# call this one time for entire tests because it's slow and costs money (negligible) as it needs
-# to generate embeddings using OpenAI for each app and function
+# call this one time for entire tests because it's slow (and with OpenAI costs money, negligible)
+# as it needs to generate embeddings for each app and function, with the embedding provider of the
+# test config (the local embedding model in the test-runner service)
 dummy_apps_and_functions_to_be_inserted_into_db = helper.prepare_dummy_apps_and_functions()
 GOOGLE_APP_NAME = "GOOGLE"
 GITHUB_APP_NAME = "GITHUB"
@@ -254,8 +255,18 @@ def dummy_apps(
         app_embedding,
         functions_embeddings,
     ) in dummy_apps_and_functions_to_be_inserted_into_db:
-        app = crud.apps.create_app(db_session, app_upsert, app_embedding)
-        crud.functions.create_functions(db_session, functions_upsert, functions_embeddings)
+        app = crud.apps.create_app(
+            db_session,
+            app_upsert,
+            app_embedding,
+            embedding_model=helper.embedding_provider.model_id,
+        )
+        crud.functions.create_functions(
+            db_session,
+            functions_upsert,
+            functions_embeddings,
+            embedding_model=helper.embedding_provider.model_id,
+        )
         db_session.commit()
         dummy_apps.append(app)
 
@@ -0,0 +1,50 @@
+from sqlalchemy.orm import Session
+
+from aci.common import utils
+from aci.common.db import catalog_version, crud
+from aci.common.db.sql_models import App
+from aci.server import config
+
+
+def test_catalog_version_is_bumped_by_commits_of_other_processes(
+    db_session: Session,
+    dummy_app_google: App,
+) -> None:
+    version = catalog_version.get_catalog_version(db_session)
+    db_session.commit()
+
+    # e.g., another server worker or the CLI, with a connection of its own
+    with utils.create_db_session(config.DB_FULL_URL) as other_db_session:
+        crud.apps.set_app_active_status(other_db_session, dummy_app_google.name, False)
+        other_db_session.flush()
+        # not visible before the changes are
+        assert catalog_version.get_catalog_version(db_session) == version
+        db_session.commit()
+
+        other_db_session.commit()
+
+    assert catalog_version.get_catalog_version(db_session) == version + 1
+
+
+def test_catalog_version_is_not_bumped_by_rolled_back_changes(
+    db_session: Session,
+    dummy_app_google: App,
+) -> None:
+    version = catalog_version.get_catalog_version(db_session)
+
+    crud.apps.set_app_active_status(db_session, dummy_app_google.name, False)
+    db_session.rollback()
+    # nothing to commit, the rolled back change must not be remembered
+    db_session.commit()
+
+    assert catalog_version.get_catalog_version(db_session) == version
+
+
+def test_catalog_version_is_not_bumped_by_empty_upserts(db_session: Session) -> None:
+    version = catalog_version.get_catalog_version(db_session)
+
+    assert crud.apps.upsert_apps(db_session, [], []) == []
+    assert crud.functions.upsert_functions(db_session, [], []) == []
+    db_session.commit()
+
+    assert catalog_version.get_catalog_version(db_session) == version
@@ -0,0 +1,162 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from aci.common.db import crud, embedding_search
+from aci.common.db.sql_models import App, Function
+from aci.common.enums import EmbeddingSearchMode
+from aci.server.tests.crud.test_query_plans import _get_seq_scanned_tables
+
+
+@pytest.fixture
+def skip_if_approximate_search_not_supported(db_session: Session) -> None:
+    version = db_session.execute(
+        text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar_one()
+    if tuple(int(part) for part in version.split(".")) < (0, 8, 0):
+        pytest.skip(
+            f"the quantized indexes and iterative index scans require pgvector >= 0.8.0, "
+            f"got {version}"
+        )
+
+
+def _restrict_hnsw_index_scans(db_session: Session) -> None:
+    """
+    Make an HNSW index scan return a single row (per iteration), as if the rows closest to the
+    intent that are filtered out were more than hnsw.ef_search, for the current transaction.
+    """
+    db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    db_session.execute(text("SET LOCAL hnsw.ef_search = 1"))
+
+
+@pytest.mark.usefixtures("skip_if_approximate_search_not_supported")
+@pytest.mark.parametrize(
+    "embedding_search_mode", [EmbeddingSearchMode.HALFVEC, EmbeddingSearchMode.BINARY]
+)
+def test_approximate_search_is_reranked_exactly(
+    db_session: Session,
+    dummy_apps: list[App],
+    dummy_functions: list[Function],
+    embedding_search_mode: EmbeddingSearchMode,
+) -> None:
+    intent_embedding = list(dummy_functions[0].embedding)
+
+    def search(embedding_search_mode: EmbeddingSearchMode) -> list[str]:
+        functions = crud.functions.search_functions(
+            db_session,
+            False,
+            True,
+            None,
+            None,
+            intent_embedding,
+            limit=3,
+            offset=0,
+            embedding_search_mode=embedding_search_mode,
+        )
+        return [function.name for function in functions]
+
+    # the candidate set covers all the functions of the dummy apps, so the exact re-ranking must
+    # give the exact results
+    approximate_result = search(embedding_search_mode)
+    assert approximate_result == search(EmbeddingSearchMode.EXACT)
+    assert approximate_result[0] == dummy_functions[0].name
+
+
+@pytest.mark.usefixtures("skip_if_approximate_search_not_supported")
+@pytest.mark.parametrize(
+    "embedding_search_mode", [EmbeddingSearchMode.HALFVEC, EmbeddingSearchMode.BINARY]
+)
+def test_approximate_search_uses_quantized_index(
+    db_session: Session,
+    dummy_functions: list[Function],
+    embedding_search_mode: EmbeddingSearchMode,
+) -> None:
+    # NOTE: the candidates can only be found without a sequential scan of functions if the
+    # approximate distance expression matches the expression of a quantized index
+    seq_scanned_tables = _get_seq_scanned_tables(
+        db_session,
+        lambda: crud.functions.search_functions(
+            db_session,
+            False,
+            True,
+            None,
+            None,
+            list(dummy_functions[0].embedding),
+            limit=3,
+            offset=0,
+            embedding_search_mode=embedding_search_mode,
+        ),
+    )
+
+    assert "functions" not in seq_scanned_tables
+
+
+@pytest.mark.usefixtures("skip_if_approximate_search_not_supported")
+@pytest.mark.parametrize(
+    "embedding_search_mode", [EmbeddingSearchMode.HALFVEC, EmbeddingSearchMode.BINARY]
+)
+def test_app_filtered_approximate_search(
+    db_session: Session,
+    dummy_functions: list[Function],
+    embedding_search_mode: EmbeddingSearchMode,
+) -> None:
+    # the functions closest to the intent are of another app than the one searched
+    intent_embedding = list(dummy_functions[0].embedding)
+    app_name = next(
+        function.app_name
+        for function in dummy_functions
+        if function.app_name != dummy_functions[0].app_name
+    )
+    _restrict_hnsw_index_scans(db_session)
+
+    def search(embedding_search_mode: EmbeddingSearchMode) -> list[str]:
+        functions = crud.functions.search_functions(
+            db_session,
+            False,
+            True,
+            [app_name],
+            None,
+            intent_embedding,
+            limit=3,
+            offset=0,
+            embedding_search_mode=embedding_search_mode,
+        )
+        return [function.name for function in functions]
+
+    approximate_result = search(embedding_search_mode)
+    assert approximate_result == search(EmbeddingSearchMode.EXACT)
+    assert len(approximate_result) == min(
+        3, sum(function.app_name == app_name for function in dummy_functions)
+    )
+
+
+@pytest.mark.usefixtures("skip_if_approximate_search_not_supported")
+@pytest.mark.parametrize(
+    "embedding_search_mode", [EmbeddingSearchMode.HALFVEC, EmbeddingSearchMode.BINARY]
+)
+def test_approximate_candidates_are_found_past_filtered_out_rows(
+    db_session: Session,
+    dummy_functions: list[Function],
+    embedding_search_mode: EmbeddingSearchMode,
+) -> None:
+    # the functions closest to the intent are filtered out
+    intent_embedding = list(dummy_functions[0].embedding)
+    app_id = next(
+        function.app_id
+        for function in dummy_functions
+        if function.app_id != dummy_functions[0].app_id
+    )
+    app_function_ids = {function.id for function in dummy_functions if function.app_id == app_id}
+    _restrict_hnsw_index_scans(db_session)
+
+    statement = embedding_search.filter_by_approximate_candidates(
+        db_session,
+        select(Function.id).filter(Function.app_id == app_id),
+        Function.id,
+        Function.embedding,
+        intent_embedding,
+        embedding_search_mode,
+        len(app_function_ids),
+    )
+
+    assert set(db_session.execute(statement).scalars().all()) == app_function_ids
@@ -0,0 +1,145 @@
+"""
+EXPLAIN based regression tests for the hot lookup paths.
+The tables are tiny in tests, so the planner would happily seq scan them no matter which indexes
+exist. Sequential scans are disabled for the EXPLAIN (which makes the planner use an index whenever
+there is a usable one), so a "Seq Scan" in the plan means the query has no index to use.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from aci.common.db import crud
+from aci.common.db.sql_models import Agent, App, AppConfiguration, LinkedAccount, Project
+from aci.common.test_utils import capture_sql_statements_with_parameters
+
+
+def _find_seq_scans(plan: dict) -> list[str]:
+    seq_scans = []
+    if plan["Node Type"] == "Seq Scan":
+        seq_scans.append(plan["Relation Name"])
+    for sub_plan in plan.get("Plans", []):
+        seq_scans.extend(_find_seq_scans(sub_plan))
+    return seq_scans
+
+
+def _get_seq_scanned_tables(db_session: Session, run_query: Callable[[], Any]) -> list[str]:
+    """
+    Run the query (e.g., a crud function), then EXPLAIN every statement it executed with
+    sequential scans disabled and return the tables that are still sequentially scanned.
+    """
+    with capture_sql_statements_with_parameters(db_session) as statements:
+        run_query()
+    assert statements
+
+    db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    seq_scanned_tables = []
+    for statement, parameters in statements:
+        plan = (
+            db_session.connection()
+            .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            .scalar_one()
+        )
+        seq_scanned_tables.extend(_find_seq_scans(plan[0]["Plan"]))
+    db_session.rollback()
+
+    return seq_scanned_tables
+
+
+def test_get_linked_account_uses_index(
+    db_session: Session,
+    dummy_linked_account_oauth2_google_project_1: LinkedAccount,
+    dummy_linked_account_api_key_github_project_1: LinkedAccount,
+) -> None:
+    seq_scanned_tables = _get_seq_scanned_tables(
+        db_session,
+        lambda: crud.linked_accounts.get_linked_account(
+            db_session,
+            dummy_linked_account_oauth2_google_project_1.project_id,
+            dummy_linked_account_oauth2_google_project_1.app_name,
+            dummy_linked_account_oauth2_google_project_1.linked_account_owner_id,
+        ),
+    )
+    assert seq_scanned_tables == []
+
+
+def test_get_app_configuration_uses_index(
+    db_session: Session,
+    dummy_app_configuration_oauth2_google_project_1: AppConfiguration,
+    dummy_app_configuration_api_key_github_project_1: AppConfiguration,
+) -> None:
+    seq_scanned_tables = _get_seq_scanned_tables(
+        db_session,
+        lambda: crud.app_configurations.get_app_configuration(
+            db_session,
+            dummy_app_configuration_oauth2_google_project_1.project_id,
+            dummy_app_configuration_oauth2_google_project_1.app_name,
+        ),
+    )
+    assert seq_scanned_tables == []
+
+
+def test_get_total_number_of_unique_linked_account_owner_ids_uses_index(
+    db_session: Session,
+    dummy_project_1: Project,
+    dummy_linked_account_oauth2_google_project_1: LinkedAccount,
+    dummy_linked_account_api_key_github_project_1: LinkedAccount,
+    dummy_linked_account_oauth2_google_project_2: LinkedAccount,
+) -> None:
+    seq_scanned_tables = _get_seq_scanned_tables(
+        db_session,
+        lambda: crud.linked_accounts.get_total_number_of_unique_linked_account_owner_ids(
+            db_session, dummy_project_1.org_id
+        ),
+    )
+    assert seq_scanned_tables == []
+
+
+def test_get_agents_whose_allowed_apps_contains_uses_index(
+    db_session: Session,
+    dummy_agent_1_with_all_apps_allowed: Agent,
+    dummy_app_google: App,
+) -> None:
+    seq_scanned_tables = _get_seq_scanned_tables(
+        db_session,
+        lambda: crud.projects.get_agents_whose_allowed_apps_contains(
+            db_session, dummy_app_google.name
+        ),
+    )
+    assert seq_scanned_tables == []
+
+
+def test_get_functions_of_apps_uses_index(
+    db_session: Session,
+    dummy_apps: list[App],
+) -> None:
+    seq_scanned_tables = _get_seq_scanned_tables(
+        db_session,
+        lambda: crud.apps.get_apps(
+            db_session, False, True, [dummy_apps[0].name], None, None, include_functions=True
+        ),
+    )
+    assert seq_scanned_tables == []
+
+
+def test_search_enabled_functions_of_project_uses_index(
+    db_session: Session,
+    dummy_app_configuration_api_key_github_project_1: AppConfiguration,
+) -> None:
+    seq_scanned_tables = _get_seq_scanned_tables(
+        db_session,
+        lambda: crud.functions.search_functions(
+            db_session,
+            False,
+            True,
+            [dummy_app_configuration_api_key_github_project_1.app.name],
+            None,
+            None,
+            limit=10,
+            offset=0,
+            enabled_in_project_id=dummy_app_configuration_api_key_github_project_1.project_id,
+        ),
+    )
+    assert seq_scanned_tables == []
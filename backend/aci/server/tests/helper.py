@@ -2,15 +2,13 @@ import json
 import logging
 from pathlib import Path
 
-from openai import OpenAI
-
 from aci.common import embeddings
 from aci.common.schemas.app import AppEmbeddingFields, AppUpsert
 from aci.common.schemas.function import FunctionEmbeddingFields, FunctionUpsert
-from aci.server import config
+from aci.server import utils
 
 logger = logging.getLogger(__name__)
-openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
+embedding_provider = utils.get_embedding_provider()
 DUMMY_APPS_DIR = Path(__file__).parent / "dummy_apps"
 REAL_APPS_DIR = Path(__file__).parent.parent.parent.parent / "apps"
 CONNECTOR_APPS = [
@@ -50,15 +48,11 @@ def prepare_dummy_apps_and_functions() -> list[
 
         app_embedding = embeddings.generate_app_embedding(
             app_embedding_fields,
-            openai_client,
-            config.OPENAI_EMBEDDING_MODEL,
-            config.OPENAI_EMBEDDING_DIMENSION,
+            embedding_provider,
         )
         function_embeddings = embeddings.generate_function_embeddings(
             functions_embedding_fields,
-            openai_client,
-            config.OPENAI_EMBEDDING_MODEL,
-            config.OPENAI_EMBEDDING_DIMENSION,
+            embedding_provider,
         )
         results.append((app_upsert, functions_upsert, app_embedding, function_embeddings))
     return results
@@ -60,6 +60,42 @@ def test_list_non_existent_app_configuration(
     assert len(response.json()) == 0
 
 
+def test_list_app_configuration_with_cursor(
+    test_client: TestClient,
+    dummy_api_key_1: str,
+    dummy_app_configuration_oauth2_google_project_1: AppConfigurationPublic,
+    dummy_app_configuration_api_key_github_project_1: AppConfigurationPublic,
+) -> None:
+    response = test_client.get(
+        f"{config.ROUTER_PREFIX_APP_CONFIGURATIONS}",
+        headers={"x-api-key": dummy_api_key_1},
+        params={"limit": 1},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+    assert response.json()[0]["id"] == str(dummy_app_configuration_oauth2_google_project_1.id)
+    next_cursor = response.headers[config.NEXT_CURSOR_HEADER]
+
+    response = test_client.get(
+        f"{config.ROUTER_PREFIX_APP_CONFIGURATIONS}",
+        headers={"x-api-key": dummy_api_key_1},
+        params={"limit": 1, "cursor": next_cursor},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+    assert response.json()[0]["id"] == str(dummy_app_configuration_api_key_github_project_1.id)
+    next_cursor = response.headers[config.NEXT_CURSOR_HEADER]
+
+    response = test_client.get(
+        f"{config.ROUTER_PREFIX_APP_CONFIGURATIONS}",
+        headers={"x-api-key": dummy_api_key_1},
+        params={"limit": 1, "cursor": next_cursor},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 0
+    assert config.NEXT_CURSOR_HEADER not in response.headers
+
+
 def test_list_app_configuration_with_limit_and_offset(
     test_client: TestClient,
     dummy_api_key_1: str,
@@ -8,6 +8,7 @@ from aci.common.db.sql_models import Agent, App, Project
 from aci.common.enums import Visibility
 from aci.common.schemas.app import AppBasic, AppsSearch
 from aci.common.schemas.app_configurations import AppConfigurationPublic
+from aci.common.test_utils import capture_sql_statements
 from aci.server import config
 
 
@@ -74,6 +75,36 @@ def test_search_apps_without_intent(
     assert len(apps) == len(dummy_apps)
 
 
+def test_search_apps_include_functions_query_count_independent_of_number_of_apps(
+    test_client: TestClient,
+    db_session: Session,
+    dummy_apps: list[App],
+    dummy_api_key_1: str,
+) -> None:
+    # functions of all returned apps should be loaded in a fixed number of queries (no N+1)
+    apps_search = AppsSearch(limit=1, offset=0, include_functions=True)
+    with capture_sql_statements(db_session) as statements_one_app:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}/search",
+            params=apps_search.model_dump(exclude_none=True),
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+
+    apps_search.limit = 100
+    with capture_sql_statements(db_session) as statements_all_apps:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}/search",
+            params=apps_search.model_dump(exclude_none=True),
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == len(dummy_apps)
+
+    assert len(statements_all_apps) == len(statements_one_app)
+
+
 @pytest.mark.parametrize("include_functions", [True, False])
 def test_search_apps_with_categories(
     test_client: TestClient,
@@ -1,3 +1,5 @@
+import re
+
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -6,6 +8,7 @@ from aci.common.db import crud
 from aci.common.db.sql_models import App, Project
 from aci.common.enums import Visibility
 from aci.common.schemas.app import AppDetails
+from aci.common.test_utils import capture_sql_statements
 from aci.server import config
 
 NON_EXISTENT_APP_ID = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
@@ -28,6 +31,22 @@ def test_get_app(
     assert len(app.functions) > 0
 
 
+def test_get_app_does_not_load_embedding(
+    test_client: TestClient,
+    db_session: Session,
+    dummy_api_key_1: str,
+    dummy_app_github: App,
+) -> None:
+    with capture_sql_statements(db_session) as statements:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}/{dummy_app_github.name}",
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert statements
+    assert not [statement for statement in statements if re.search(r"\.embedding\b", statement)]
+
+
 def test_get_non_existent_app(test_client: TestClient, dummy_api_key_1: str) -> None:
     response = test_client.get(
         f"{config.ROUTER_PREFIX_APPS}/{NON_EXISTENT_APP_ID}",
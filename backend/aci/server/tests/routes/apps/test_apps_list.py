@@ -1,3 +1,4 @@
+import re
 from typing import Any
 
 from fastapi import status
@@ -8,6 +9,7 @@ from aci.common.db import crud
 from aci.common.db.sql_models import App, Function, Project
 from aci.common.enums import Visibility
 from aci.common.schemas.app import AppDetails
+from aci.common.test_utils import capture_sql_statements
 from aci.server import config
 
 
@@ -34,6 +36,52 @@ def test_list_apps(
         assert len(app.functions) == len([f for f in dummy_functions if f.app.name == app.name])
 
 
+def test_list_apps_does_not_load_embedding(
+    test_client: TestClient,
+    db_session: Session,
+    dummy_apps: list[App],
+    dummy_api_key_1: str,
+) -> None:
+    with capture_sql_statements(db_session) as statements:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}",
+            params={"limit": 100, "offset": 0},
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert statements
+    assert not [statement for statement in statements if re.search(r"\.embedding\b", statement)]
+
+
+def test_list_apps_query_count_independent_of_number_of_apps(
+    test_client: TestClient,
+    db_session: Session,
+    dummy_apps: list[App],
+    dummy_functions: list[Function],
+    dummy_api_key_1: str,
+) -> None:
+    # functions of all listed apps should be loaded in a fixed number of queries (no N+1)
+    with capture_sql_statements(db_session) as statements_one_app:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}",
+            params={"limit": 1, "offset": 0},
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+
+    with capture_sql_statements(db_session) as statements_all_apps:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}",
+            params={"limit": 100, "offset": 0},
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == len(dummy_apps)
+
+    assert len(statements_all_apps) == len(statements_one_app)
+
+
 def test_list_apps_pagination(
     test_client: TestClient, dummy_apps: list[App], dummy_api_key_1: str
 ) -> None:
@@ -66,6 +114,30 @@ def test_list_apps_pagination(
     assert len(apps) == 1
 
 
+def test_list_apps_cursor_pagination(
+    test_client: TestClient, dummy_apps: list[App], dummy_api_key_1: str
+) -> None:
+    app_names: list[str] = []
+    params: dict[str, str | int] = {"limit": 1}
+    while True:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}",
+            params=params,
+            headers={"x-api-key": dummy_api_key_1},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) <= 1
+        app_names.extend(app["name"] for app in response.json())
+
+        next_cursor = response.headers.get(config.NEXT_CURSOR_HEADER)
+        if next_cursor is None:
+            break
+        params["cursor"] = next_cursor
+
+    # NOTE: not comparing the order, python and the db collation can sort names differently
+    assert sorted(app_names) == sorted(app.name for app in dummy_apps)
+
+
 def test_list_apps_with_private_apps(
     db_session: Session,
     test_client: TestClient,
@@ -1,3 +1,5 @@
+import re
+
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
@@ -11,6 +13,7 @@ from aci.common.schemas.function import (
     BasicFunctionDefinition,
     OpenAIFunctionDefinition,
 )
+from aci.common.test_utils import capture_sql_statements
 from aci.server import config
 
 
@@ -66,6 +69,23 @@ def test_get_function_definition_by_identifier(
             )
 
 
+def test_get_function_definition_does_not_load_embedding(
+    test_client: TestClient,
+    db_session: Session,
+    dummy_function_github__create_repository: Function,
+    dummy_api_key_1: str,
+) -> None:
+    with capture_sql_statements(db_session) as statements:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_FUNCTIONS}/{dummy_function_github__create_repository.name}/definition",
+            params={"format": FunctionDefinitionFormat.OPENAI},
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert statements
+    assert not [statement for statement in statements if re.search(r"\.embedding\b", statement)]
+
+
 def test_get_private_function(
     db_session: Session,
     test_client: TestClient,
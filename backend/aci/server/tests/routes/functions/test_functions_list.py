@@ -1,3 +1,5 @@
+import re
+
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -6,6 +8,7 @@ from aci.common.db import crud
 from aci.common.db.sql_models import App, Function, Project
 from aci.common.enums import Visibility
 from aci.common.schemas.function import FunctionDetails
+from aci.common.test_utils import capture_sql_statements
 from aci.server import config
 
 
@@ -28,6 +31,51 @@ def test_list_all_functions(
     assert len(functions) == len(dummy_functions)
 
 
+def test_list_functions_does_not_load_embedding(
+    test_client: TestClient,
+    db_session: Session,
+    dummy_functions: list[Function],
+    dummy_api_key_1: str,
+) -> None:
+    with capture_sql_statements(db_session) as statements:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_FUNCTIONS}",
+            params={"limit": 100, "offset": 0},
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert statements
+    assert not [statement for statement in statements if re.search(r"\.embedding\b", statement)]
+
+
+def test_list_functions_query_count_independent_of_number_of_functions(
+    test_client: TestClient,
+    db_session: Session,
+    dummy_functions: list[Function],
+    dummy_api_key_1: str,
+) -> None:
+    # the app of every listed function (for app_name) should not be loaded one query at a time
+    with capture_sql_statements(db_session) as statements_one_function:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_FUNCTIONS}",
+            params={"limit": 1, "offset": 0},
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+
+    with capture_sql_statements(db_session) as statements_all_functions:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_FUNCTIONS}",
+            params={"limit": 100, "offset": 0},
+            headers={"x-api-key": dummy_api_key_1},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == len(dummy_functions)
+
+    assert len(statements_all_functions) == len(statements_one_function)
+
+
 def test_list_all_functions_pagination(
     test_client: TestClient, dummy_functions: list[Function], dummy_api_key_1: str
 ) -> None:
@@ -55,6 +103,57 @@ def test_list_all_functions_pagination(
     assert len(functions) == 1
 
 
+def test_list_all_functions_cursor_pagination(
+    test_client: TestClient, dummy_functions: list[Function], dummy_api_key_1: str
+) -> None:
+    page_size = 2
+    function_names: list[str] = []
+    params: dict[str, str | int] = {"limit": page_size}
+    while True:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_FUNCTIONS}",
+            params=params,
+            headers={"x-api-key": dummy_api_key_1},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) <= page_size
+        function_names.extend(function["name"] for function in response.json())
+
+        next_cursor = response.headers.get(config.NEXT_CURSOR_HEADER)
+        if next_cursor is None:
+            break
+        params["cursor"] = next_cursor
+
+    # NOTE: not comparing the order, python and the db collation can sort names differently
+    assert sorted(function_names) == sorted(function.name for function in dummy_functions)
+
+
+def test_list_functions_cursor_and_offset_not_allowed_together(
+    test_client: TestClient, dummy_functions: list[Function], dummy_api_key_1: str
+) -> None:
+    response = test_client.get(
+        f"{config.ROUTER_PREFIX_FUNCTIONS}",
+        params={"limit": 1},
+        headers={"x-api-key": dummy_api_key_1},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    next_cursor = response.headers[config.NEXT_CURSOR_HEADER]
+
+    response = test_client.get(
+        f"{config.ROUTER_PREFIX_FUNCTIONS}",
+        params={"limit": 1, "offset": 1, "cursor": next_cursor},
+        headers={"x-api-key": dummy_api_key_1},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = test_client.get(
+        f"{config.ROUTER_PREFIX_FUNCTIONS}",
+        params={"limit": 1, "cursor": "not a cursor"},
+        headers={"x-api-key": dummy_api_key_1},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 def test_list_functions_with_app_names(
     test_client: TestClient,
     dummy_apps: list[App],
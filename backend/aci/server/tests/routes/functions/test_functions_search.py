@@ -1,4 +1,5 @@
 from enum import Enum
+from unittest.mock import patch
 
 import pytest
 from fastapi import status
@@ -18,7 +19,8 @@ from aci.common.schemas.function import (
     FunctionsSearch,
     OpenAIFunctionDefinition,
 )
-from aci.server import config
+from aci.common.test_utils import capture_sql_statements
+from aci.server import config, utils
 
 
 @pytest.mark.parametrize(
@@ -455,6 +457,49 @@ def test_search_functions_allowed_apps_only_true(
         assert function_name in dummy_app_function_names
 
 
+def test_search_functions_allowed_only_query_count_independent_of_number_of_apps(
+    db_session: Session,
+    test_client: TestClient,
+    dummy_app_configuration_oauth2_aci_test_project_1: AppConfigurationPublic,
+    dummy_app_configuration_oauth2_google_project_1: AppConfigurationPublic,
+    dummy_app_configuration_api_key_github_project_1: AppConfigurationPublic,
+    dummy_app_aci_test: App,
+    dummy_app_google: App,
+    dummy_app_github: App,
+    dummy_agent_1_with_no_apps_allowed: Agent,
+) -> None:
+    # the enabled functions of all allowed apps should be resolved in a fixed number of queries
+    function_search = FunctionsSearch(allowed_only=True, limit=100)
+
+    dummy_agent_1_with_no_apps_allowed.allowed_apps = [dummy_app_aci_test.name]
+    db_session.commit()
+    with capture_sql_statements(db_session) as statements_one_app:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_FUNCTIONS}/search",
+            params=function_search.model_dump(exclude_none=True),
+            headers={"x-api-key": dummy_agent_1_with_no_apps_allowed.api_keys[0].key},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == len(dummy_app_aci_test.functions)
+
+    dummy_agent_1_with_no_apps_allowed.allowed_apps = [
+        dummy_app_aci_test.name,
+        dummy_app_google.name,
+        dummy_app_github.name,
+    ]
+    db_session.commit()
+    with capture_sql_statements(db_session) as statements_three_apps:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_FUNCTIONS}/search",
+            params=function_search.model_dump(exclude_none=True),
+            headers={"x-api-key": dummy_agent_1_with_no_apps_allowed.api_keys[0].key},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) > len(dummy_app_aci_test.functions)
+
+    assert len(statements_three_apps) == len(statements_one_app)
+
+
 @pytest.mark.parametrize(
     "format",
     [
@@ -749,3 +794,48 @@ def _get_function_name_from_definition(
             return function_definition.name
         case _:
             raise AssertionError(f"Invalid function definition: {function_definition}")
+
+
+def test_search_functions_repeated_search_is_cached(
+    db_session: Session,
+    test_client: TestClient,
+    dummy_functions: list[Function],
+    dummy_api_key_1: str,
+) -> None:
+    function_search = FunctionsSearch(intent="i want to create a new code repo", limit=100)
+
+    def search() -> tuple[list[dict], list[str], int]:
+        with (
+            capture_sql_statements(db_session) as statements,
+            patch.object(
+                utils.get_embedding_batcher(),
+                "embed",
+                wraps=utils.get_embedding_batcher().embed,
+            ) as embed,
+        ):
+            response = test_client.get(
+                f"{config.ROUTER_PREFIX_FUNCTIONS}/search",
+                params=function_search.model_dump(exclude_none=True),
+                headers={"x-api-key": dummy_api_key_1},
+            )
+        assert response.status_code == status.HTTP_200_OK
+        search_statements = [statement for statement in statements if "FROM functions" in statement]
+        return response.json(), search_statements, embed.call_count
+
+    functions, search_statements, embed_call_count = search()
+    assert len(functions) == len(dummy_functions)
+    assert len(search_statements) > 0
+    assert embed_call_count == 1
+
+    # the repeated search skips both the embedding and the DB search
+    cached_functions, search_statements, embed_call_count = search()
+    assert cached_functions == functions
+    assert search_statements == []
+    assert embed_call_count == 0
+
+    # a change of the catalog invalidates the cached result
+    crud.functions.set_function_active_status(db_session, dummy_functions[0].name, False)
+    db_session.commit()
+    functions, search_statements, embed_call_count = search()
+    assert len(functions) == len(dummy_functions) - 1
+    assert len(search_statements) > 0
@@ -0,0 +1,130 @@
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from aci.common.db.sql_models import Agent, App, Function, Project
+from aci.common.schemas.app_configurations import AppConfigurationPublic
+from aci.common.schemas.function import FunctionsBatchSearch, FunctionsSearch
+from aci.server import billing, config
+
+INTENTS = [
+    "i want to create a new code repo for my project",
+    "add this meeting to my calendar",
+]
+
+
+def test_search_functions_batch_returns_one_result_per_intent(
+    test_client: TestClient,
+    dummy_functions: list[Function],
+    dummy_api_key_1: str,
+) -> None:
+    response = test_client.post(
+        f"{config.ROUTER_PREFIX_FUNCTIONS}/search/batch",
+        json=FunctionsBatchSearch(intents=INTENTS, limit=3).model_dump(mode="json"),
+        headers={"x-api-key": dummy_api_key_1},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    assert len(results) == len(INTENTS)
+
+    # every intent gets the same functions, in the same order, as a search of the intent alone
+    for intent, functions in zip(INTENTS, results, strict=True):
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_FUNCTIONS}/search",
+            params=FunctionsSearch(intent=intent, limit=3).model_dump(exclude_none=True),
+            headers={"x-api-key": dummy_api_key_1},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [function["name"] for function in functions] == [
+            function["name"] for function in response.json()
+        ]
+
+
+def test_search_functions_batch_allowed_only(
+    db_session: Session,
+    test_client: TestClient,
+    dummy_app_configuration_oauth2_aci_test_project_1: AppConfigurationPublic,
+    dummy_app_aci_test: App,
+    dummy_agent_1_with_no_apps_allowed: Agent,
+) -> None:
+    dummy_agent_1_with_no_apps_allowed.allowed_apps = [dummy_app_aci_test.name]
+    db_session.commit()
+
+    response = test_client.post(
+        f"{config.ROUTER_PREFIX_FUNCTIONS}/search/batch",
+        json=FunctionsBatchSearch(intents=INTENTS, allowed_only=True, limit=100).model_dump(
+            mode="json"
+        ),
+        headers={"x-api-key": dummy_agent_1_with_no_apps_allowed.api_keys[0].key},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    dummy_app_function_names = {function.name for function in dummy_app_aci_test.functions}
+    for functions in response.json():
+        assert {function["name"] for function in functions} == dummy_app_function_names
+
+
+def test_search_functions_batch_without_intents(
+    test_client: TestClient,
+    dummy_api_key_1: str,
+) -> None:
+    response = test_client.post(
+        f"{config.ROUTER_PREFIX_FUNCTIONS}/search/batch",
+        json={"intents": []},
+        headers={"x-api-key": dummy_api_key_1},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def _set_monthly_quota_used(db_session: Session, project: Project, used: int) -> None:
+    project.api_quota_monthly_used = used
+    project.api_quota_last_reset = datetime.now(UTC).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    db_session.commit()
+
+
+def test_search_functions_batch_uses_monthly_quota_per_intent(
+    db_session: Session,
+    test_client: TestClient,
+    dummy_functions: list[Function],
+    dummy_api_key_1: str,
+    dummy_project_1: Project,
+) -> None:
+    _set_monthly_quota_used(db_session, dummy_project_1, 1)
+
+    response = test_client.post(
+        f"{config.ROUTER_PREFIX_FUNCTIONS}/search/batch",
+        json=FunctionsBatchSearch(intents=INTENTS, limit=1).model_dump(mode="json"),
+        headers={"x-api-key": dummy_api_key_1},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    db_session.refresh(dummy_project_1)
+    assert dummy_project_1.api_quota_monthly_used == 1 + len(INTENTS)
+
+
+@pytest.mark.parametrize("quota_left", [0, len(INTENTS) - 1])
+def test_search_functions_batch_monthly_quota_exceeded(
+    db_session: Session,
+    test_client: TestClient,
+    dummy_functions: list[Function],
+    dummy_api_key_1: str,
+    dummy_project_1: Project,
+    quota_left: int,
+) -> None:
+    active_plan = billing.get_active_plan_by_org_id(db_session, dummy_project_1.org_id)
+    quota_used = active_plan.features["api_calls_monthly"] - quota_left
+    _set_monthly_quota_used(db_session, dummy_project_1, quota_used)
+
+    response = test_client.post(
+        f"{config.ROUTER_PREFIX_FUNCTIONS}/search/batch",
+        json=FunctionsBatchSearch(intents=INTENTS, limit=1).model_dump(mode="json"),
+        headers={"x-api-key": dummy_api_key_1},
+    )
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    db_session.refresh(dummy_project_1)
+    assert dummy_project_1.api_quota_monthly_used == quota_used
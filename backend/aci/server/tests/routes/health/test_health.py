@@ -1,9 +1,12 @@
+import asyncio
 import logging
+from unittest.mock import patch
 
 from fastapi import status
 from fastapi.testclient import TestClient
 
-from aci.server import config
+from aci.common.exceptions import DependencyCheckError
+from aci.server import config, dependency_check
 
 logger = logging.getLogger(__name__)
 
@@ -14,3 +17,24 @@ def test_health_check(test_client: TestClient) -> None:
     response = test_client.get(f"{config.ROUTER_PREFIX_HEALTH}")
     assert response.status_code == status.HTTP_200_OK
     assert response.json() is True
+
+
+def test_readiness_check(test_client: TestClient) -> None:
+    with patch.object(dependency_check, "_dependencies_ready", asyncio.Event()):
+        response = test_client.get(f"{config.ROUTER_PREFIX_HEALTH}/ready")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() is True
+
+
+def test_readiness_check_dependency_failure(test_client: TestClient) -> None:
+    with (
+        patch.object(dependency_check, "_dependencies_ready", asyncio.Event()),
+        patch.object(
+            dependency_check,
+            "check_dependencies",
+            side_effect=DependencyCheckError("kms unavailable"),
+        ),
+    ):
+        response = test_client.get(f"{config.ROUTER_PREFIX_HEALTH}/ready")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json() is False
@@ -20,6 +20,33 @@ def test_list_linked_accounts_no_filters(
     assert len(response.json()) == 2, "Should only return linked accounts under dummy project 1"
 
 
+def test_list_linked_accounts_with_cursor(
+    test_client: TestClient,
+    dummy_api_key_1: str,
+    dummy_linked_account_oauth2_google_project_1: LinkedAccount,
+    dummy_linked_account_oauth2_google_project_2: LinkedAccount,
+    dummy_linked_account_api_key_github_project_1: LinkedAccount,
+) -> None:
+    response = test_client.get(
+        f"{config.ROUTER_PREFIX_LINKED_ACCOUNTS}",
+        headers={"x-api-key": dummy_api_key_1},
+        params={"limit": 1},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    assert len(response.json()) == 1
+    assert response.json()[0]["id"] == str(dummy_linked_account_oauth2_google_project_1.id)
+    next_cursor = response.headers[config.NEXT_CURSOR_HEADER]
+
+    response = test_client.get(
+        f"{config.ROUTER_PREFIX_LINKED_ACCOUNTS}",
+        headers={"x-api-key": dummy_api_key_1},
+        params={"limit": 1, "cursor": next_cursor},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    assert len(response.json()) == 1
+    assert response.json()[0]["id"] == str(dummy_linked_account_api_key_github_project_1.id)
+
+
 def test_list_linked_accounts_filter_by_app_name(
     test_client: TestClient,
     dummy_api_key_1: str,
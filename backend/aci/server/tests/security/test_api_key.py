@@ -1,6 +1,10 @@
+from uuid import uuid4
+
 from fastapi import status
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 
+from aci.common.test_utils import capture_sql_statements
 from aci.server import config
 
 
@@ -35,4 +39,24 @@ def test_with_invalid_api_key(test_client: TestClient, dummy_api_key_1: str) ->
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+def test_invalid_api_key_is_rejected_without_db_query(
+    db_session: Session, test_client: TestClient
+) -> None:
+    api_key = f"invalid_api_key_{uuid4()}"
+    response = test_client.get(
+        f"{config.ROUTER_PREFIX_APPS}/search",
+        headers={"x-api-key": api_key},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    # the key is remembered as invalid and rejected by the admission stage from now on
+    with capture_sql_statements(db_session) as statements:
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}/search",
+            headers={"x-api-key": api_key},
+        )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert statements == []
+
+
 # TODO: test disabled/deleted api key
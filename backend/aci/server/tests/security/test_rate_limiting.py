@@ -1,39 +1,45 @@
+import asyncio
 import logging
 import time
 from typing import cast
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 from fastapi import FastAPI, status
 from fastapi.testclient import TestClient
-from limits import RateLimitItemPerDay, RateLimitItemPerSecond
+from sqlalchemy.orm import Session
 
+from aci.common.db import crud
+from aci.common.db.sql_models import Project
 from aci.server import config
 from aci.server.main import app as fastapi_app
-from aci.server.middleware.ratelimit import RateLimitMiddleware
+from aci.server.middleware import admission
+from aci.server.middleware.admission import DAY, SECOND, AdmissionMiddleware, hit_rate_limits
+from aci.server.middleware.interceptor import InterceptorMiddleware
+from aci.server.rate_limiting import RateLimit
 
 logger = logging.getLogger(__name__)
 
 
 # TODO: not sure if there is a better way to test rate limiting (without meaningless mocking)
-def get_ratelimit_middleware_instance(fastapi_app: FastAPI) -> RateLimitMiddleware:
-    """find the RateLimitMiddleware instance in the middleware stack"""
+def get_middleware_instance[T](fastapi_app: FastAPI, middleware_class: type[T]) -> T:
+    """find the instance of the middleware class in the middleware stack"""
     layer = fastapi_app.middleware_stack
     while layer is not None:
-        if layer.__class__.__name__ == RateLimitMiddleware.__name__:
-            return cast(RateLimitMiddleware, layer)
+        if layer.__class__.__name__ == middleware_class.__name__:
+            return cast(T, layer)
         layer = getattr(layer, "app", None)
 
-    assert False, f"{RateLimitMiddleware.__name__} instance not found"  # noqa: B011
+    assert False, f"{middleware_class.__name__} instance not found"  # noqa: B011
 
 
 def test_rate_limiting_ip_per_second(test_client: TestClient, dummy_api_key_1: str) -> None:
     OVERRIDE_RATE_LIMIT_IP_PER_SECOND = 1
 
-    rate_limit_middleware_instance = get_ratelimit_middleware_instance(fastapi_app)
-    patched_rate_limits = {
-        "ip-per-second": RateLimitItemPerSecond(OVERRIDE_RATE_LIMIT_IP_PER_SECOND),
-        "ip-per-day": RateLimitItemPerDay(9999),
-    }
+    rate_limit_middleware_instance = get_middleware_instance(fastapi_app, AdmissionMiddleware)
+    patched_rate_limits = [
+        RateLimit("ip-per-second", OVERRIDE_RATE_LIMIT_IP_PER_SECOND, SECOND),
+        RateLimit("ip-per-day", 9999, DAY),
+    ]
 
     with patch.object(rate_limit_middleware_instance, "rate_limits", patched_rate_limits):
         # Test successful requests
@@ -69,11 +75,11 @@ def test_rate_limiting_ip_per_second(test_client: TestClient, dummy_api_key_1: s
 def test_rate_limiting_ip_per_day(test_client: TestClient, dummy_api_key_1: str) -> None:
     OVERRIDE_RATE_LIMIT_IP_PER_DAY = 1
 
-    rate_limit_middleware_instance = get_ratelimit_middleware_instance(fastapi_app)
-    patched_rate_limits = {
-        "ip-per-second": RateLimitItemPerSecond(9999),
-        "ip-per-day": RateLimitItemPerDay(OVERRIDE_RATE_LIMIT_IP_PER_DAY),
-    }
+    rate_limit_middleware_instance = get_middleware_instance(fastapi_app, AdmissionMiddleware)
+    patched_rate_limits = [
+        RateLimit("ip-per-second", 9999, SECOND),
+        RateLimit("ip-per-day", OVERRIDE_RATE_LIMIT_IP_PER_DAY, DAY),
+    ]
 
     with patch.object(rate_limit_middleware_instance, "rate_limits", patched_rate_limits):
         # Test successful requests
@@ -104,3 +110,136 @@ def test_rate_limiting_ip_per_day(test_client: TestClient, dummy_api_key_1: str)
             headers={"x-api-key": dummy_api_key_1},
         )
         assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_rate_limiting_api_key_per_second(
+    test_client: TestClient, dummy_api_key_1: str, dummy_api_key_2: str
+) -> None:
+    rate_limit_middleware_instance = get_middleware_instance(fastapi_app, AdmissionMiddleware)
+    patched_api_key_rate_limits = [
+        RateLimit("api-key-per-second", 1, SECOND),
+        RateLimit("api-key-per-day", 9999, DAY),
+    ]
+
+    with patch.object(
+        rate_limit_middleware_instance, "api_key_rate_limits", patched_api_key_rate_limits
+    ):
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}/search",
+            headers={"x-api-key": dummy_api_key_1},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["x-ratelimit-remaining-api-key-per-second"] == "0"
+
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}/search",
+            headers={"x-api-key": dummy_api_key_1},
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.json() == {"error": "Rate limit exceeded: api-key-per-second"}
+
+        # the limits are per API key
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}/search",
+            headers={"x-api-key": dummy_api_key_2},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+
+def test_rate_limiting_project_per_second(
+    db_session: Session, test_client: TestClient, dummy_project_1: Project, dummy_api_key_1: str
+) -> None:
+    interceptor_middleware_instance = get_middleware_instance(fastapi_app, InterceptorMiddleware)
+    patched_project_rate_limits = [
+        RateLimit("project-per-second", 1, SECOND),
+        RateLimit("project-per-day", 9999, DAY),
+    ]
+    # another agent (and API key) of the same project
+    agent = crud.projects.create_agent(
+        db_session, dummy_project_1.id, "Dummy Agent 2", "Dummy Agent 2", [], {}
+    )
+    db_session.commit()
+
+    with patch.object(
+        interceptor_middleware_instance, "project_rate_limits", patched_project_rate_limits
+    ):
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}/search",
+            headers={"x-api-key": dummy_api_key_1},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["x-ratelimit-remaining-project-per-second"] == "0"
+
+        # the limits are per project, across its API keys
+        response = test_client.get(
+            f"{config.ROUTER_PREFIX_APPS}/search",
+            headers={"x-api-key": agent.api_keys[0].key},
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.json() == {"error": "Rate limit exceeded: project-per-second"}
+
+
+def test_rate_limit_exceeded_response_has_cors_and_request_id_headers(
+    test_client: TestClient, dummy_api_key_1: str
+) -> None:
+    rate_limit_middleware_instance = get_middleware_instance(fastapi_app, AdmissionMiddleware)
+    patched_rate_limits = [
+        RateLimit("ip-per-second", 1, SECOND),
+        RateLimit("ip-per-day", 9999, DAY),
+    ]
+    headers = {"x-api-key": dummy_api_key_1, "origin": config.DEV_PORTAL_URL}
+
+    with patch.object(rate_limit_middleware_instance, "rate_limits", patched_rate_limits):
+        # CORS preflight requests are answered before the admission stage
+        for _ in range(3):
+            response = test_client.options(
+                f"{config.ROUTER_PREFIX_APPS}/search",
+                headers={
+                    "origin": config.DEV_PORTAL_URL,
+                    "access-control-request-method": "GET",
+                },
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        response = test_client.get(f"{config.ROUTER_PREFIX_APPS}/search", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = test_client.get(f"{config.ROUTER_PREFIX_APPS}/search", headers=headers)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["access-control-allow-origin"] == config.DEV_PORTAL_URL
+        assert response.headers["x-request-id"]
+
+
+def test_rate_limits_fail_open_when_backend_is_unavailable() -> None:
+    rate_limits = [RateLimit("per-second", 1, SECOND), RateLimit("per-day", 1, DAY)]
+    headers: dict[str, str] = {}
+
+    with patch.object(admission, "get_rate_limit_backend") as mock_get_rate_limit_backend:
+        mock_get_rate_limit_backend.return_value.hit = AsyncMock(
+            side_effect=ConnectionError("redis is down")
+        )
+        exceeded_rate_limit = asyncio.run(hit_rate_limits(rate_limits, "ip:127.0.0.1", headers))
+
+    assert exceeded_rate_limit is None
+    assert headers == {}
+
+
+def test_metrics_scrapes_are_exempt_from_rate_limits(test_client: TestClient) -> None:
+    rate_limit_middleware_instance = get_middleware_instance(fastapi_app, AdmissionMiddleware)
+    # NOTE: named apart from the limits of the other tests, which share the client IP
+    patched_rate_limits = [RateLimit("metrics-ip-per-second", 1, SECOND)]
+
+    with patch.object(rate_limit_middleware_instance, "rate_limits", patched_rate_limits):
+        for _ in range(3):
+            response = test_client.get(
+                config.ROUTER_PREFIX_METRICS,
+                headers={"Authorization": f"Bearer {config.METRICS_TOKEN}"},
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert "X-RateLimit-Limit-metrics-ip-per-second" not in response.headers
+
+        # unauthenticated requests to /metrics are not
+        response = test_client.get(config.ROUTER_PREFIX_METRICS)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        response = test_client.get(config.ROUTER_PREFIX_METRICS)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
@@ -0,0 +1,66 @@
+import logging
+import subprocess
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Budget (in seconds) for importing the server app, i.e., the per-worker boot cost before the
+# first request can be served. Generous on purpose to not be flaky on slow CI runners, the
+# main guard against regressions is the list of modules that must stay out of the import path.
+SERVER_IMPORT_TIME_BUDGET_SECONDS = 6.0
+
+# Expensive modules that are initialized lazily (on first use) and must not be imported as
+# part of importing the server app.
+LAZILY_IMPORTED_MODULES = [
+    "aws_encryption_sdk",
+    "aws_cryptographic_material_providers",
+    "boto3",
+    "logfire",
+    "langchain_openai",
+]
+
+
+def _parse_importtime(stderr: str) -> dict[str, int]:
+    """
+    Parse the output of `python -X importtime`, returns a mapping of module name to
+    the cumulative import time in microseconds.
+    e.g., "import time:      2860 |    2501309 | aci.server.main"
+    """
+    cumulative_us_by_module: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        if not cumulative.strip().isdigit():
+            # header line: "import time: self [us] | cumulative | imported package"
+            continue
+        cumulative_us_by_module[module.strip()] = int(cumulative)
+    return cumulative_us_by_module
+
+
+def _import_server_app_with_importtime() -> dict[str, int]:
+    # run in a fresh interpreter, modules imported by the test session are already cached
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import aci.server.main"],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=120,
+    )
+    assert result.returncode == 0, f"failed to import aci.server.main: {result.stderr[-2000:]}"
+    return _parse_importtime(result.stderr)
+
+
+def test_server_import_time_within_budget() -> None:
+    cumulative_us_by_module = _import_server_app_with_importtime()
+
+    import_time_seconds = cumulative_us_by_module["aci.server.main"] / 1_000_000
+    logger.info(f"aci.server.main import time, import_time_seconds={import_time_seconds}")
+    assert import_time_seconds < SERVER_IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_expensive_modules_not_imported_at_startup() -> None:
+    cumulative_us_by_module = _import_server_app_with_importtime()
+
+    imported = [module for module in LAZILY_IMPORTED_MODULES if module in cumulative_us_by_module]
+    assert not imported, f"modules should be imported lazily, imported={imported}"
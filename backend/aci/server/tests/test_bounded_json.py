@@ -0,0 +1,63 @@
+import json
+from datetime import UTC, datetime
+from uuid import UUID
+
+import pytest
+from pydantic import BaseModel
+
+from aci.server.bounded_json import TRUNCATION_MARGIN, dumps_bounded
+
+
+class _QueryParams(BaseModel):
+    intent: str | None
+    limit: int
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        123,
+        1.5,
+        float("nan"),
+        'héllo "world"\n',
+        [],
+        {},
+        {"a": [1, 2.5, None, False], "b": {"c": "d"}, 1: "int key", None: "none key"},
+        (1, "tuple"),
+        {"created_at": datetime(2025, 1, 1, tzinfo=UTC), "id": UUID(int=1)},
+    ],
+)
+def test_small_values_are_encoded_like_json_dumps(value: object) -> None:
+    assert dumps_bounded(value, 8192) == json.dumps(value, default=str)
+
+
+def test_pydantic_models_are_encoded_as_their_json_dump() -> None:
+    query_params = _QueryParams(intent="send an email", limit=10)
+
+    assert json.loads(dumps_bounded(query_params, 8192)) == query_params.model_dump(mode="json")
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"items": [{"id": i, "name": f"item {i}"} for i in range(100_000)]},
+        {"content": "x" * 10_000_000},
+        ["é" * 10_000],
+    ],
+)
+def test_large_values_are_truncated(value: object) -> None:
+    max_size = 8192
+
+    data = dumps_bounded(value, max_size)
+
+    assert len(data.encode("utf-8")) <= max_size
+    assert data.endswith(f"... [truncated, size>{max_size}]")
+    assert data.startswith(json.dumps(value)[: max_size - TRUNCATION_MARGIN])
+
+
+def test_value_of_exactly_max_size_is_not_truncated() -> None:
+    value = "x" * 98
+    assert dumps_bounded(value, 100) == json.dumps(value)
+    assert dumps_bounded(value, 99).endswith("... [truncated, size>99]")
@@ -0,0 +1,70 @@
+import asyncio
+
+from aci.common.embedding_providers import EmbeddingProvider
+from aci.common.enums import EmbeddingProviderType
+from aci.server.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, fail: bool = False):
+        super().__init__("recording", 1)
+        self.fail = fail
+        self.batches: list[list[str]] = []
+
+    @property
+    def provider_type(self) -> EmbeddingProviderType:
+        return EmbeddingProviderType.LOCAL
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(texts)
+        if self.fail:
+            raise RuntimeError("embedding failed")
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_intents_are_batched_and_coalesced() -> None:
+    provider = RecordingEmbeddingProvider()
+    batcher = EmbeddingBatcher(provider, max_batch_size=10, max_wait_seconds=0.05)
+
+    async def search() -> list[list[float]]:
+        return await asyncio.gather(
+            *(batcher.embed(intent) for intent in ["a", "bb", "a", "ccc", "bb"])
+        )
+
+    embeddings = asyncio.run(search())
+
+    assert embeddings == [[1.0], [2.0], [1.0], [3.0], [2.0]]
+    assert provider.batches == [["a", "bb", "ccc"]]
+
+
+def test_batch_is_flushed_at_max_batch_size() -> None:
+    provider = RecordingEmbeddingProvider()
+    # the wait would time out the test if batches were not flushed once full
+    batcher = EmbeddingBatcher(provider, max_batch_size=2, max_wait_seconds=60)
+
+    async def search() -> list[list[float]]:
+        return await asyncio.gather(*(batcher.embed(intent) for intent in ["a", "bb", "ccc", "dd"]))
+
+    embeddings = asyncio.run(asyncio.wait_for(search(), timeout=5))
+
+    assert embeddings == [[1.0], [2.0], [3.0], [2.0]]
+    assert provider.batches == [["a", "bb"], ["ccc", "dd"]]
+
+
+def test_error_is_propagated_to_all_waiting_requests() -> None:
+    provider = RecordingEmbeddingProvider(fail=True)
+    batcher = EmbeddingBatcher(provider, max_batch_size=10, max_wait_seconds=0.01)
+
+    async def search() -> list[list[float] | BaseException]:
+        return list(
+            await asyncio.gather(
+                batcher.embed("a"), batcher.embed("a"), batcher.embed("b"), return_exceptions=True
+            )
+        )
+
+    results = asyncio.run(search())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # failed intents are not cached, the next request embeds them again
+    provider.fail = False
+    assert asyncio.run(batcher.embed("a")) == [1.0]
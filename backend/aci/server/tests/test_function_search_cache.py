@@ -0,0 +1,56 @@
+from unittest.mock import patch
+from uuid import uuid4
+
+from aci.common.enums import FunctionDefinitionFormat, Visibility
+from aci.server.function_search_cache import FunctionSearchCache, FunctionSearchCacheKey
+
+
+def _key(
+    intent: str | None = "intent", app_names: list[str] | None = None
+) -> FunctionSearchCacheKey:
+    return FunctionSearchCacheKey.create(
+        Visibility.PUBLIC, app_names, None, intent, FunctionDefinitionFormat.BASIC, 10, 0
+    )
+
+
+def test_cache_key_ignores_order_of_app_names() -> None:
+    assert _key(app_names=["B", "A", "A"]) == _key(app_names=["A", "B"])
+    assert _key(app_names=[]) != _key(app_names=None)
+    assert _key(intent="intent") != _key(intent=None)
+    assert FunctionSearchCacheKey.create(
+        Visibility.PUBLIC, None, uuid4(), None, FunctionDefinitionFormat.BASIC, 10, 0
+    ) != _key(intent=None)
+
+
+def test_entries_are_invalidated_by_catalog_version() -> None:
+    cache = FunctionSearchCache(max_size=10, ttl_seconds=60)
+    cache.set(_key(), 1, ["result"])
+    assert cache.get(_key(), 1) == ["result"]
+
+    # the catalog changed
+    assert cache.get(_key(), 2) is None
+    # including during the search, whose result is stored under the version read before it
+    cache.set(_key(), 1, ["outdated result"])
+    assert cache.get(_key(), 2) is None
+
+
+def test_entries_expire_after_ttl() -> None:
+    cache = FunctionSearchCache(max_size=10, ttl_seconds=60)
+    with patch("aci.server.function_search_cache.time.monotonic", return_value=1000.0):
+        cache.set(_key(), 1, ["result"])
+    with patch("aci.server.function_search_cache.time.monotonic", return_value=1059.0):
+        assert cache.get(_key(), 1) == ["result"]
+    with patch("aci.server.function_search_cache.time.monotonic", return_value=1060.0):
+        assert cache.get(_key(), 1) is None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = FunctionSearchCache(max_size=2, ttl_seconds=60)
+    cache.set(_key("a"), 1, ["a"])
+    cache.set(_key("b"), 1, ["b"])
+    assert cache.get(_key("a"), 1) == ["a"]
+    cache.set(_key("c"), 1, ["c"])
+
+    assert cache.get(_key("a"), 1) == ["a"]
+    assert cache.get(_key("b"), 1) is None
+    assert cache.get(_key("c"), 1) == ["c"]
@@ -0,0 +1,81 @@
+import logging
+from collections.abc import AsyncIterator
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from aci.server import config
+from aci.server.middleware.interceptor import InterceptorMiddleware
+
+app = FastAPI()
+app.add_middleware(InterceptorMiddleware)
+
+
+@app.post("/echo")
+async def echo(request: Request) -> dict:
+    return {"size": len(await request.body())}
+
+
+@app.get("/stream")
+async def stream() -> StreamingResponse:
+    async def chunks() -> AsyncIterator[bytes]:
+        for i in range(3):
+            yield f"chunk-{i}\n".encode()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+@app.get("/error")
+async def error() -> None:
+    raise RuntimeError("unexpected error")
+
+
+def _get_log_records(caplog: pytest.LogCaptureFixture, message: str) -> list[logging.LogRecord]:
+    return [record for record in caplog.records if record.getMessage() == message]
+
+
+def test_request_body_is_logged_and_passed_through(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(logging.INFO), TestClient(app) as client:
+        response = client.post("/echo", content=b'{"hello": "world"}')
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 18}
+    assert response.headers["X-Request-ID"]
+    (request_record,) = _get_log_records(caplog, "Received request")
+    assert request_record.__dict__["request_body"] == '{"hello": "world"}'
+    (response_record,) = _get_log_records(caplog, "Response sent")
+    assert response_record.__dict__["status_code"] == 200
+
+
+def test_large_request_body_is_truncated_in_log(caplog: pytest.LogCaptureFixture) -> None:
+    body_size = config.MAX_LOG_FIELD_SIZE * 3
+
+    def body_chunks() -> list[bytes]:
+        return [b"x" * config.MAX_LOG_FIELD_SIZE] * 3
+
+    with caplog.at_level(logging.INFO), TestClient(app) as client:
+        response = client.post("/echo", content=iter(body_chunks()))
+
+    # the app still receives the whole body
+    assert response.json() == {"size": body_size}
+    (request_record,) = _get_log_records(caplog, "Received request")
+    request_body = request_record.__dict__["request_body"]
+    assert len(request_body) < config.MAX_LOG_FIELD_SIZE
+    assert request_body.endswith(f"... [truncated, size={body_size}]")
+
+
+def test_streaming_response_is_passed_through() -> None:
+    with TestClient(app) as client, client.stream("GET", "/stream") as response:
+        assert response.headers["X-Request-ID"]
+        assert list(response.iter_lines()) == ["chunk-0", "chunk-1", "chunk-2"]
+
+
+def test_unhandled_error_returns_internal_server_error() -> None:
+    with TestClient(app, raise_server_exceptions=False) as client:
+        response = client.get("/error")
+
+    assert response.status_code == 500
+    assert response.json() == {"error": "Internal server error"}
+    assert response.headers["X-Request-ID"]
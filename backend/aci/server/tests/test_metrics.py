@@ -0,0 +1,42 @@
+from aci.server.metrics import OVERFLOW_LABEL_VALUE, Histogram
+
+
+def test_histogram_collect() -> None:
+    histogram = Histogram("test_duration_seconds", "Test durations.", ["stage"], buckets=[0.1, 1])
+
+    histogram.observe(["db"], 0.05)
+    histogram.observe(["db"], 0.5)
+    histogram.observe(["db"], 5)
+    histogram.observe(['with "quotes"'], 0.1)
+
+    assert histogram.collect().splitlines() == [
+        "# HELP test_duration_seconds Test durations.",
+        "# TYPE test_duration_seconds histogram",
+        'test_duration_seconds_bucket{stage="db",le="0.1"} 1',
+        'test_duration_seconds_bucket{stage="db",le="1.0"} 2',
+        'test_duration_seconds_bucket{stage="db",le="+Inf"} 3',
+        'test_duration_seconds_sum{stage="db"} 5.55',
+        'test_duration_seconds_count{stage="db"} 3',
+        'test_duration_seconds_bucket{stage="with \\"quotes\\"",le="0.1"} 1',
+        'test_duration_seconds_bucket{stage="with \\"quotes\\"",le="1.0"} 1',
+        'test_duration_seconds_bucket{stage="with \\"quotes\\"",le="+Inf"} 1',
+        'test_duration_seconds_sum{stage="with \\"quotes\\""} 0.1',
+        'test_duration_seconds_count{stage="with \\"quotes\\""} 1',
+    ]
+
+
+def test_histogram_label_values_are_bounded() -> None:
+    histogram = Histogram(
+        "test_duration_seconds", "Test durations.", ["app", "stage"], max_label_values=2
+    )
+
+    for app in ["APP_1", "APP_2", "APP_3", "APP_4"]:
+        histogram.observe([app, "upstream"], 0.1)
+
+    collected = histogram.collect()
+    assert 'test_duration_seconds_count{app="APP_2",stage="upstream"} 1' in collected
+    assert 'test_duration_seconds_count{app="APP_3",stage="upstream"} 1' not in collected
+    assert (
+        f'test_duration_seconds_count{{app="{OVERFLOW_LABEL_VALUE}",stage="upstream"}} 2'
+        in collected
+    )
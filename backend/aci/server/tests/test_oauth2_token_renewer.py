@@ -0,0 +1,168 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from aci.common.db import crud
+from aci.common.db.sql_models import AppConfiguration, LinkedAccount
+from aci.common.schemas.app_configurations import AppConfigurationUpdate
+from aci.common.schemas.security_scheme import OAuth2SchemeCredentials
+from aci.server import config
+from aci.server import security_credentials_manager as scm
+from aci.server.oauth2_token_renewer import OAuth2TokenRenewer
+
+WINDOW_SECONDS = 600
+MOCK_REFRESH_RESPONSE = {
+    "access_token": "renewed_access_token",
+    "expires_in": 3600,
+}
+
+
+def _create_renewer() -> OAuth2TokenRenewer:
+    return OAuth2TokenRenewer(
+        config.DB_FULL_URL, interval_seconds=60, window_seconds=WINDOW_SECONDS, batch_size=10
+    )
+
+
+@pytest.mark.parametrize(
+    "expires_in, should_renew",
+    [
+        # about to expire
+        (WINDOW_SECONDS // 2, True),
+        # not about to expire
+        (WINDOW_SECONDS * 2, False),
+        # already expired, left to be refreshed on use
+        (-60, False),
+    ],
+)
+def test_renew_expiring_access_tokens(
+    db_session: Session,
+    dummy_linked_account_oauth2_aci_test_project_1: LinkedAccount,
+    expires_in: int,
+    should_renew: bool,
+) -> None:
+    credentials = OAuth2SchemeCredentials.model_validate(
+        dummy_linked_account_oauth2_aci_test_project_1.security_credentials
+    )
+    credentials.expires_at = int(time.time()) + expires_in
+    crud.linked_accounts.update_linked_account_credentials(
+        db_session, dummy_linked_account_oauth2_aci_test_project_1, credentials
+    )
+    db_session.commit()
+
+    with patch.object(
+        scm, "_refresh_oauth2_access_token", return_value=MOCK_REFRESH_RESPONSE
+    ) as mock_refresh:
+        num_renewed = asyncio.run(_create_renewer().renew_expiring_access_tokens())
+
+    assert num_renewed == int(should_renew)
+    assert mock_refresh.called == should_renew
+
+    db_session.refresh(dummy_linked_account_oauth2_aci_test_project_1)
+    renewed_credentials = OAuth2SchemeCredentials.model_validate(
+        dummy_linked_account_oauth2_aci_test_project_1.security_credentials
+    )
+    if should_renew:
+        assert renewed_credentials.access_token == MOCK_REFRESH_RESPONSE["access_token"]
+        assert renewed_credentials.expires_at is not None
+        assert renewed_credentials.expires_at > int(time.time()) + WINDOW_SECONDS
+        assert (
+            dummy_linked_account_oauth2_aci_test_project_1.access_token_expires_at
+            == renewed_credentials.expires_at
+        )
+    else:
+        assert renewed_credentials.access_token == credentials.access_token
+
+
+def test_renewal_skips_access_token_being_refreshed(
+    db_session: Session,
+    dummy_linked_account_oauth2_aci_test_project_1: LinkedAccount,
+) -> None:
+    credentials = OAuth2SchemeCredentials.model_validate(
+        dummy_linked_account_oauth2_aci_test_project_1.security_credentials
+    )
+    credentials.expires_at = int(time.time()) + WINDOW_SECONDS // 2
+    crud.linked_accounts.update_linked_account_credentials(
+        db_session, dummy_linked_account_oauth2_aci_test_project_1, credentials
+    )
+    db_session.commit()
+
+    # another request is refreshing the access token
+    assert crud.linked_accounts.try_lock_linked_account(
+        db_session, dummy_linked_account_oauth2_aci_test_project_1.id
+    )
+
+    with patch.object(scm, "_refresh_oauth2_access_token") as mock_refresh:
+        num_renewed = asyncio.run(_create_renewer().renew_expiring_access_tokens())
+
+    assert num_renewed == 0
+    mock_refresh.assert_not_called()
+    db_session.rollback()
+
+
+def test_renewal_skips_disabled_app_configuration(
+    db_session: Session,
+    dummy_app_configuration_oauth2_aci_test_project_1: AppConfiguration,
+    dummy_linked_account_oauth2_aci_test_project_1: LinkedAccount,
+) -> None:
+    credentials = OAuth2SchemeCredentials.model_validate(
+        dummy_linked_account_oauth2_aci_test_project_1.security_credentials
+    )
+    credentials.expires_at = int(time.time()) + WINDOW_SECONDS // 2
+    crud.linked_accounts.update_linked_account_credentials(
+        db_session, dummy_linked_account_oauth2_aci_test_project_1, credentials
+    )
+    crud.app_configurations.update_app_configuration(
+        db_session,
+        dummy_app_configuration_oauth2_aci_test_project_1,
+        AppConfigurationUpdate(enabled=False),
+    )
+    db_session.commit()
+
+    with patch.object(scm, "_refresh_oauth2_access_token") as mock_refresh:
+        num_renewed = asyncio.run(_create_renewer().renew_expiring_access_tokens())
+
+    assert num_renewed == 0
+    mock_refresh.assert_not_called()
+
+
+def test_disabled_app_configurations_do_not_take_up_the_batch(
+    db_session: Session,
+    dummy_app_configuration_oauth2_aci_test_project_1: AppConfiguration,
+    dummy_linked_account_oauth2_aci_test_project_1: LinkedAccount,
+    dummy_linked_account_oauth2_google_project_1: LinkedAccount,
+) -> None:
+    # the access token of the disabled app configuration expires first
+    for linked_account, expires_in in [
+        (dummy_linked_account_oauth2_aci_test_project_1, WINDOW_SECONDS // 4),
+        (dummy_linked_account_oauth2_google_project_1, WINDOW_SECONDS // 2),
+    ]:
+        credentials = OAuth2SchemeCredentials.model_validate(linked_account.security_credentials)
+        credentials.expires_at = int(time.time()) + expires_in
+        crud.linked_accounts.update_linked_account_credentials(
+            db_session, linked_account, credentials
+        )
+    crud.app_configurations.update_app_configuration(
+        db_session,
+        dummy_app_configuration_oauth2_aci_test_project_1,
+        AppConfigurationUpdate(enabled=False),
+    )
+    db_session.commit()
+
+    renewer = OAuth2TokenRenewer(
+        config.DB_FULL_URL, interval_seconds=60, window_seconds=WINDOW_SECONDS, batch_size=1
+    )
+    with patch.object(
+        scm, "_refresh_oauth2_access_token", return_value=MOCK_REFRESH_RESPONSE
+    ) as mock_refresh:
+        num_renewed = asyncio.run(renewer.renew_expiring_access_tokens())
+
+    assert num_renewed == 1
+    mock_refresh.assert_called_once()
+    db_session.refresh(dummy_linked_account_oauth2_google_project_1)
+    assert (
+        dummy_linked_account_oauth2_google_project_1.security_credentials["access_token"]
+        == MOCK_REFRESH_RESPONSE["access_token"]
+    )
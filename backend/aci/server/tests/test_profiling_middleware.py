@@ -0,0 +1,70 @@
+import pstats
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from aci.common.profiling_token import MAX_TTL_SECONDS, create_profiling_token
+from aci.server import config
+
+
+@pytest.fixture
+def profile_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(config, "PROFILING_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_request_with_profiling_token_is_profiled(
+    test_client: TestClient, profile_dir: Path
+) -> None:
+    token = create_profiling_token(config.PROFILING_SIGNING_KEY, ttl_seconds=60)
+
+    response = test_client.get(
+        config.ROUTER_PREFIX_HEALTH,
+        headers={config.PROFILING_HEADER: token, config.PROFILING_MEMORY_HEADER: "true"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    request_id = response.headers["X-Request-ID"]
+    stats = pstats.Stats(str(profile_dir / f"{request_id}.prof"))
+    assert stats.total_calls > 0  # type: ignore[attr-defined]
+    assert (profile_dir / f"{request_id}.tracemalloc.txt").exists()
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        create_profiling_token("wrong_signing_key", ttl_seconds=60),
+        create_profiling_token(config.PROFILING_SIGNING_KEY, ttl_seconds=60, now=time.time() - 120),
+        # expires further in the future than tokens can be valid for
+        create_profiling_token(
+            config.PROFILING_SIGNING_KEY, ttl_seconds=60, now=time.time() + 2 * MAX_TTL_SECONDS
+        ),
+        "not a token",
+    ],
+)
+def test_request_with_invalid_profiling_token_is_not_profiled(
+    test_client: TestClient, profile_dir: Path, token: str
+) -> None:
+    response = test_client.get(
+        config.ROUTER_PREFIX_HEALTH, headers={config.PROFILING_HEADER: token}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert list(profile_dir.iterdir()) == []
+
+
+def test_functions_requests_are_sampled(
+    test_client: TestClient, profile_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config, "PROFILING_SAMPLE_RATE", 1.0)
+
+    test_client.get(config.ROUTER_PREFIX_HEALTH)
+    assert list(profile_dir.iterdir()) == []
+
+    response = test_client.get(f"{config.ROUTER_PREFIX_FUNCTIONS}/search")
+    assert [path.name for path in profile_dir.iterdir()] == [
+        f"{response.headers['X-Request-ID']}.prof"
+    ]
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from aci.server import config
+from aci.server.rate_limiting import (
+    MemoryRateLimitBackend,
+    RateLimit,
+    RateLimitResult,
+    RedisRateLimitBackend,
+    memory_rate_limit_backend,
+)
+
+
+def _hit_at(
+    backend: MemoryRateLimitBackend, now: float, rate_limit: RateLimit, key: str = "key"
+) -> RateLimitResult:
+    with (
+        patch.object(memory_rate_limit_backend.time, "monotonic", return_value=now),
+        patch.object(memory_rate_limit_backend.time, "time", return_value=now),
+    ):
+        return asyncio.run(backend.hit(key, rate_limit))
+
+
+def test_burst_up_to_amount_is_allowed_then_replenished_gradually() -> None:
+    backend = MemoryRateLimitBackend()
+    rate_limit = RateLimit("per-second", 10, 1)
+
+    results = [_hit_at(backend, 1000.0, rate_limit) for _ in range(11)]
+
+    assert [result.allowed for result in results] == [True] * 10 + [False]
+    assert [result.remaining for result in results] == [*range(9, -1, -1), 0]
+    assert results[-1].reset_at == pytest.approx(1001.0)
+    # one hit is replenished every emission interval (0.1s)
+    assert not _hit_at(backend, 1000.05, rate_limit).allowed
+    assert _hit_at(backend, 1000.1, rate_limit).allowed
+    assert not _hit_at(backend, 1000.1, rate_limit).allowed
+    # all hits are replenished after the period
+    assert _hit_at(backend, 1002.0, rate_limit).remaining == 9
+
+
+def test_limits_are_per_key_and_rate_limit() -> None:
+    backend = MemoryRateLimitBackend()
+    rate_limit = RateLimit("per-day", 1, 24 * 60 * 60)
+
+    assert _hit_at(backend, 1000.0, rate_limit, "a").allowed
+    assert not _hit_at(backend, 1000.0, rate_limit, "a").allowed
+    assert _hit_at(backend, 1000.0, rate_limit, "b").allowed
+    # a changed limit starts from a fresh state
+    assert _hit_at(backend, 1000.0, RateLimit("per-day", 2, 24 * 60 * 60), "a").allowed
+
+
+def test_memory_is_constant_per_key() -> None:
+    backend = MemoryRateLimitBackend()
+    rate_limit = RateLimit("per-day", 100_000, 24 * 60 * 60)
+
+    for i in range(1000):
+        _hit_at(backend, 1000.0 + i / 1000, rate_limit)
+
+    assert len(backend._tats) == 1
+
+
+def test_replenished_keys_are_swept() -> None:
+    backend = MemoryRateLimitBackend()
+    rate_limit = RateLimit("per-second", 10, 1)
+
+    with patch.object(memory_rate_limit_backend, "SWEEP_INTERVAL_HITS", 3):
+        _hit_at(backend, 1000.0, rate_limit, "a")
+        _hit_at(backend, 1000.0, rate_limit, "b")
+        assert len(backend._tats) == 2
+        _hit_at(backend, 1001.0, rate_limit, "c")
+
+    assert list(backend._tats) == [(rate_limit, "c")]
+
+
+@pytest.fixture
+def redis_url() -> str:
+    redis = pytest.importorskip("redis")
+    try:
+        redis.Redis.from_url(config.RATE_LIMIT_REDIS_URL).ping()
+    except redis.ConnectionError:
+        pytest.skip(f"redis is not available at {config.RATE_LIMIT_REDIS_URL}")
+    return config.RATE_LIMIT_REDIS_URL
+
+
+def _hit_redis(redis_url: str, hits: list[tuple[str, RateLimit]]) -> list[RateLimitResult]:
+    async def hit_all() -> list[RateLimitResult]:
+        # NOTE: a backend per event loop, the connections of a redis client are bound to it
+        backend = RedisRateLimitBackend(redis_url)
+        try:
+            return [await backend.hit(key, rate_limit) for key, rate_limit in hits]
+        finally:
+            await backend._redis.aclose()
+
+    return asyncio.run(hit_all())
+
+
+def test_redis_burst_up_to_amount_is_allowed_then_replenished_gradually(redis_url: str) -> None:
+    key = str(uuid4())
+    rate_limit = RateLimit("per-second", 10, 1)
+
+    results = _hit_redis(redis_url, [(key, rate_limit)] * 11)
+
+    assert [result.allowed for result in results] == [True] * 10 + [False]
+    assert [result.remaining for result in results] == [*range(9, -1, -1), 0]
+    assert results[-1].reset_at == pytest.approx(time.time() + 1, abs=0.5)
+    # one hit is replenished every emission interval (0.1s)
+    time.sleep(0.15)
+    assert [result.allowed for result in _hit_redis(redis_url, [(key, rate_limit)] * 2)] == [
+        True,
+        False,
+    ]
+
+
+def test_redis_limits_are_per_key_and_rate_limit(redis_url: str) -> None:
+    key, other_key = str(uuid4()), str(uuid4())
+    rate_limit = RateLimit("per-day", 1, 24 * 60 * 60)
+
+    results = _hit_redis(
+        redis_url,
+        [
+            (key, rate_limit),
+            (key, rate_limit),
+            (other_key, rate_limit),
+            # a changed limit starts from a fresh state
+            (key, RateLimit("per-day", 2, 24 * 60 * 60)),
+        ],
+    )
+
+    assert [result.allowed for result in results] == [True, False, True, True]
+
+
+def test_redis_state_expires_once_replenished(redis_url: str) -> None:
+    import redis
+
+    key = str(uuid4())
+    rate_limit = RateLimit("per-minute", 60, 60)
+
+    _hit_redis(redis_url, [(key, rate_limit)] * 3)
+
+    # the state of 3 hits is fully replenished after 3 emission intervals (3s)
+    ttl_ms = redis.Redis.from_url(redis_url).pttl(f"ratelimit:{rate_limit.name}:60/60:{key}")
+    assert 2000 < ttl_ms <= 3000
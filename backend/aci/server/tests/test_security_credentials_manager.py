@@ -0,0 +1,157 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from aci.common import utils
+from aci.common.db import crud
+from aci.common.db.sql_models import LinkedAccount
+from aci.common.exceptions import OAuth2Error
+from aci.common.schemas.security_scheme import OAuth2SchemeCredentials
+from aci.server import config
+from aci.server import security_credentials_manager as scm
+
+MOCK_REFRESH_RESPONSE = {
+    "access_token": "refreshed_access_token",
+    "expires_in": 3600,
+    "refresh_token": "refreshed_refresh_token",
+}
+
+
+class _NoProcessLocalLocks(dict):
+    """
+    Stand-in for the process local locks that hands every request a lock of its own, as if every
+    request ran in a different server process, so only the DB lock keeps them apart.
+    """
+
+    def setdefault(self, key: object, default: object = None) -> object:
+        return default
+
+
+def _set_access_token_expires_at(
+    db_session: Session, linked_account: LinkedAccount, expires_at: int
+) -> None:
+    credentials = OAuth2SchemeCredentials.model_validate(linked_account.security_credentials)
+    credentials.expires_at = expires_at
+    crud.linked_accounts.update_linked_account_credentials(db_session, linked_account, credentials)
+    db_session.commit()
+
+
+async def _get_security_credentials(linked_account_id: object) -> scm.SecurityCredentialsResponse:
+    """
+    Get (and persist) the security credentials like a function execution does, with a DB session
+    (and so a DB connection) of its own.
+    """
+    with utils.create_db_session(config.DB_FULL_URL) as db_session:
+        linked_account = db_session.get(LinkedAccount, linked_account_id)
+        assert linked_account is not None
+        app_configuration = crud.app_configurations.get_app_configuration(
+            db_session, linked_account.project_id, linked_account.app_name
+        )
+        assert app_configuration is not None
+
+        security_credentials_response = await scm.get_security_credentials(
+            db_session, linked_account.app, app_configuration, linked_account
+        )
+        scm.update_security_credentials(
+            db_session, linked_account.app, linked_account, security_credentials_response
+        )
+        db_session.commit()
+        return security_credentials_response
+
+
+@pytest.mark.parametrize("process_local_lock", [True, False])
+def test_concurrent_requests_refresh_access_token_once(
+    db_session: Session,
+    dummy_linked_account_oauth2_aci_test_project_1: LinkedAccount,
+    process_local_lock: bool,
+) -> None:
+    _set_access_token_expires_at(db_session, dummy_linked_account_oauth2_aci_test_project_1, 0)
+
+    async def refresh(*args: object) -> dict:
+        # slow enough for the other requests to find the access token expired too
+        await asyncio.sleep(0.2)
+        return MOCK_REFRESH_RESPONSE
+
+    async def get_security_credentials_concurrently() -> list[scm.SecurityCredentialsResponse]:
+        return await asyncio.gather(
+            *(
+                _get_security_credentials(dummy_linked_account_oauth2_aci_test_project_1.id)
+                for _ in range(5)
+            )
+        )
+
+    with (
+        patch.object(scm, "_refresh_oauth2_access_token", side_effect=refresh) as mock_refresh,
+        patch.object(
+            scm,
+            "_refresh_locks",
+            scm._refresh_locks if process_local_lock else _NoProcessLocalLocks(),
+        ),
+    ):
+        responses = asyncio.run(get_security_credentials_concurrently())
+
+    mock_refresh.assert_called_once()
+    assert sum(response.is_updated for response in responses) == 1
+    for response in responses:
+        assert isinstance(response.credentials, OAuth2SchemeCredentials)
+        assert response.credentials.access_token == MOCK_REFRESH_RESPONSE["access_token"]
+        assert response.credentials.refresh_token == MOCK_REFRESH_RESPONSE["refresh_token"]
+
+    db_session.refresh(dummy_linked_account_oauth2_aci_test_project_1)
+    assert (
+        dummy_linked_account_oauth2_aci_test_project_1.security_credentials["access_token"]
+        == MOCK_REFRESH_RESPONSE["access_token"]
+    )
+
+
+@pytest.mark.parametrize(
+    "expires_in, should_refresh",
+    [
+        (config.OAUTH2_ACCESS_TOKEN_EXPIRY_LEEWAY_SECONDS // 2, True),
+        (config.OAUTH2_ACCESS_TOKEN_EXPIRY_LEEWAY_SECONDS + 60, False),
+    ],
+)
+def test_access_token_about_to_expire_is_refreshed(
+    db_session: Session,
+    dummy_linked_account_oauth2_aci_test_project_1: LinkedAccount,
+    expires_in: int,
+    should_refresh: bool,
+) -> None:
+    _set_access_token_expires_at(
+        db_session, dummy_linked_account_oauth2_aci_test_project_1, int(time.time()) + expires_in
+    )
+
+    with patch.object(
+        scm, "_refresh_oauth2_access_token", return_value=MOCK_REFRESH_RESPONSE
+    ) as mock_refresh:
+        response = asyncio.run(
+            _get_security_credentials(dummy_linked_account_oauth2_aci_test_project_1.id)
+        )
+
+    assert mock_refresh.called == should_refresh
+    assert response.is_updated == should_refresh
+
+
+def test_waiting_for_refresh_of_another_request_times_out(
+    db_session: Session,
+    dummy_linked_account_oauth2_aci_test_project_1: LinkedAccount,
+) -> None:
+    _set_access_token_expires_at(db_session, dummy_linked_account_oauth2_aci_test_project_1, 0)
+
+    # another request (e.g., of another server process) holds the lock and never finishes
+    assert crud.linked_accounts.try_lock_linked_account(
+        db_session, dummy_linked_account_oauth2_aci_test_project_1.id
+    )
+
+    with (
+        patch.object(config, "OAUTH2_REFRESH_LOCK_TIMEOUT_SECONDS", 0.2),
+        patch.object(scm, "_refresh_oauth2_access_token") as mock_refresh,
+        pytest.raises(OAuth2Error),
+    ):
+        asyncio.run(_get_security_credentials(dummy_linked_account_oauth2_aci_test_project_1.id))
+
+    mock_refresh.assert_not_called()
+    db_session.rollback()
@@ -0,0 +1,78 @@
+"""
+Timing spans of the stages of a request, e.g., the API key lookup or the upstream call of a
+function execution, to tell where the latency of a request goes.
+
+The interceptor middleware starts a RequestTiming for every request, the spans are reported in
+the Server-Timing response header and observed by the request stage duration histogram (see
+aci.server.metrics) once the request completes.
+"""
+
+import contextvars
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from aci.common.enums import RequestStage
+from aci.server import metrics
+
+# NOTE: the RequestTiming object is shared (not copied) with the contexts copied from the request's
+# context, e.g., of the sync dependencies run in the threadpool, so their spans are collected too
+request_timing_ctx_var = contextvars.ContextVar["RequestTiming | None"](
+    "request_timing", default=None
+)
+
+# the app label value of the spans of requests that are not about an app
+NO_APP_LABEL_VALUE = "none"
+
+
+class RequestTiming:
+    def __init__(self) -> None:
+        self.spans: list[tuple[RequestStage, float]] = []
+        # the app the request is about (e.g., the app of the executed function), if any
+        self.app_name: str | None = None
+
+    def get_server_timing_header(self) -> str:
+        """
+        The Server-Timing header value, with the durations in milliseconds.
+        """
+        return ", ".join(f"{stage};dur={duration * 1000:.1f}" for stage, duration in self.spans)
+
+    def observe(self) -> None:
+        """
+        Observe the spans in the request stage duration histogram.
+        """
+        app_label_value = self.app_name or NO_APP_LABEL_VALUE
+        for stage, duration in self.spans:
+            metrics.REQUEST_STAGE_DURATION_SECONDS.observe([app_label_value, stage], duration)
+
+
+def start_request_timing() -> RequestTiming:
+    request_timing = RequestTiming()
+    request_timing_ctx_var.set(request_timing)
+    return request_timing
+
+
+@contextmanager
+def span(stage: RequestStage) -> Iterator[None]:
+    """
+    Time the stage as a span of the current request, a no-op outside of a request.
+    """
+    request_timing = request_timing_ctx_var.get()
+    if request_timing is None:
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_timing.spans.append((stage, time.perf_counter() - start_time))
+
+
+def set_app_name(app_name: str) -> None:
+    """
+    Set the app the current request is about, which labels the spans of the request.
+    """
+    request_timing = request_timing_ctx_var.get()
+    if request_timing is not None:
+        request_timing.app_name = app_name
@@ -1,8 +1,43 @@
-def truncate_if_too_large(data: str, max_size: int) -> str:
-    data_size = len(data.encode("utf-8"))
-    if data_size > max_size:
-        return (
-            data.encode("utf-8")[: max_size - 100].decode("utf-8", errors="replace")
-            + f"... [truncated, size={data_size}]"
-        )
-    return data
+from functools import cache
+
+from aci.common.embedding_providers import EmbeddingProvider, create_embedding_provider
+from aci.server import config
+from aci.server.embedding_batcher import EmbeddingBatcher
+from aci.server.function_search_cache import FunctionSearchCache
+
+
+@cache
+def get_embedding_provider() -> EmbeddingProvider:
+    """
+    The embedding provider used for intent embeddings, shared by all routes so that a local
+    embedding model is only loaded once per worker process.
+    """
+    return create_embedding_provider(
+        config.EMBEDDING_PROVIDER,
+        config.EMBEDDING_MODEL,
+        config.OPENAI_EMBEDDING_DIMENSION,
+        openai_api_key=config.OPENAI_API_KEY,
+    )
+
+
+@cache
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """
+    The micro-batcher that concurrent search requests embed their intents through.
+    """
+    return EmbeddingBatcher(
+        get_embedding_provider(),
+        max_batch_size=config.EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_seconds=config.EMBEDDING_BATCH_MAX_WAIT_SECONDS,
+    )
+
+
+@cache
+def get_function_search_cache() -> FunctionSearchCache:
+    """
+    The cache of function search results, shared by all search requests of the worker process.
+    """
+    return FunctionSearchCache(
+        max_size=config.FUNCTION_SEARCH_CACHE_MAX_SIZE,
+        ttl_seconds=config.FUNCTION_SEARCH_CACHE_TTL_SECONDS,
+    )
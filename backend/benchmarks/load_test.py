@@ -0,0 +1,384 @@
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+import click
+import httpx
+from rich.console import Console
+from rich.table import Table
+
+from aci.common import utils
+from aci.common.test_utils import clear_database
+from aci.server import config
+from benchmarks.seed import UNLIMITED, BenchmarkData, seed_benchmark_data
+from benchmarks.server import DB_QUERY_COUNT_PATH
+from benchmarks.stand_ins import FakeEmbeddingProvider, install_stand_ins
+
+console = Console()
+
+SERVER_START_TIMEOUT_SECONDS = 60
+# the inputs of the functions of the benchmark app
+BENCHMARK_FUNCTION_INPUTS = {
+    "BENCHMARK__GET_ITEMS": {},
+    "BENCHMARK__SEARCH_ITEMS": {
+        "path": {"collectionId": "benchmark"},
+        "query": {"limit": 10},
+        "body": {"text": "benchmark"},
+    },
+}
+
+
+@dataclass
+class RequestSpec:
+    method: str
+    path: str
+    params: dict | None = None
+    json: dict | None = None
+
+
+def _search_functions(data: BenchmarkData, rng: random.Random, i: int) -> RequestSpec:
+    # NOTE: the intents are unique, so every search misses the function search cache
+    function_name = rng.choice(data.function_names)
+    return RequestSpec(
+        "GET",
+        f"{config.ROUTER_PREFIX_FUNCTIONS}/search",
+        params={"intent": f"{function_name.replace('_', ' ').lower()} {i}", "limit": 10},
+    )
+
+
+def _get_function_definition(data: BenchmarkData, rng: random.Random, i: int) -> RequestSpec:
+    return RequestSpec(
+        "GET", f"{config.ROUTER_PREFIX_FUNCTIONS}/{rng.choice(data.function_names)}/definition"
+    )
+
+
+def _execute_function(data: BenchmarkData, rng: random.Random, i: int) -> RequestSpec:
+    function_name = rng.choice(data.benchmark_function_names)
+    return RequestSpec(
+        "POST",
+        f"{config.ROUTER_PREFIX_FUNCTIONS}/{function_name}/execute",
+        json={
+            "function_input": BENCHMARK_FUNCTION_INPUTS[function_name],
+            "linked_account_owner_id": rng.choice(data.linked_account_owner_ids),
+        },
+    )
+
+
+def _list_apps(data: BenchmarkData, rng: random.Random, i: int) -> RequestSpec:
+    return RequestSpec("GET", config.ROUTER_PREFIX_APPS, params={"limit": 100})
+
+
+def _list_linked_accounts(data: BenchmarkData, rng: random.Random, i: int) -> RequestSpec:
+    return RequestSpec("GET", config.ROUTER_PREFIX_LINKED_ACCOUNTS)
+
+
+SCENARIOS: dict[str, Callable[[BenchmarkData, random.Random, int], RequestSpec]] = {
+    "search_functions": _search_functions,
+    "get_function_definition": _get_function_definition,
+    "execute_function": _execute_function,
+    "list_apps": _list_apps,
+    "list_linked_accounts": _list_linked_accounts,
+}
+
+
+class LoadTest:
+    """
+    Drives the scenarios against a running server, with a number of concurrent workers sharing one
+    HTTP client (and its connection pool).
+    """
+
+    def __init__(self, server_url: str, data: BenchmarkData, seed: int):
+        self.server_url = server_url
+        self.data = data
+        self.rng = random.Random(seed)
+
+    async def run(
+        self, scenario: str, concurrency: int, num_requests: int, num_warmup_requests: int
+    ) -> dict:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(
+            base_url=self.server_url,
+            headers={config.ACI_API_KEY_HEADER: self.data.api_key},
+            limits=limits,
+            timeout=60,
+        ) as client:
+            await self._send_requests(client, scenario, concurrency, num_warmup_requests)
+
+            db_query_count_before = await self._get_db_query_count(client)
+            start_time = time.perf_counter()
+            latencies, num_errors = await self._send_requests(
+                client, scenario, concurrency, num_requests
+            )
+            duration = time.perf_counter() - start_time
+            db_query_count = await self._get_db_query_count(client) - db_query_count_before
+
+        return {
+            "scenario": scenario,
+            "concurrency": concurrency,
+            "num_requests": num_requests,
+            "num_errors": num_errors,
+            "throughput_rps": num_requests / duration,
+            "latency_mean_ms": statistics.mean(latencies) * 1000,
+            "latency_p50_ms": utils.percentile(latencies, 50) * 1000,
+            "latency_p95_ms": utils.percentile(latencies, 95) * 1000,
+            "latency_p99_ms": utils.percentile(latencies, 99) * 1000,
+            "db_queries_per_request": db_query_count / num_requests,
+        }
+
+    async def _send_requests(
+        self, client: httpx.AsyncClient, scenario: str, concurrency: int, num_requests: int
+    ) -> tuple[list[float], int]:
+        request_specs = [SCENARIOS[scenario](self.data, self.rng, i) for i in range(num_requests)]
+        latencies: list[float] = []
+        num_errors = 0
+
+        async def worker() -> None:
+            nonlocal num_errors
+            while request_specs:
+                request_spec = request_specs.pop()
+                start_time = time.perf_counter()
+                response = await client.request(
+                    request_spec.method,
+                    request_spec.path,
+                    params=request_spec.params,
+                    json=request_spec.json,
+                )
+                latencies.append(time.perf_counter() - start_time)
+                if not response.is_success or (
+                    scenario == "execute_function" and not response.json()["success"]
+                ):
+                    num_errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, num_errors
+
+    async def _get_db_query_count(self, client: httpx.AsyncClient) -> int:
+        response = await client.get(DB_QUERY_COUNT_PATH)
+        response.raise_for_status()
+        count: int = response.json()["count"]
+        return count
+
+
+def _seed(apps_dir: Path, mock_upstream_url: str, num_linked_accounts: int) -> BenchmarkData:
+    # the DB is cleared, it must not be the DB of a deployed (or local development) server
+    if config.DB_HOST != "test-db":
+        raise click.ClickException("The load test must run against the test-db (SERVER_DB_HOST)")
+
+    with utils.create_db_session(config.DB_FULL_URL) as db_session:
+        clear_database(db_session)
+        return seed_benchmark_data(
+            db_session, FakeEmbeddingProvider(), apps_dir, mock_upstream_url, num_linked_accounts
+        )
+
+
+def _start_process(
+    module: str, args: list[str], env: dict[str, str], show_logs: bool
+) -> subprocess.Popen:
+    # NOTE: the logs are still produced (and cost what they cost in production) when not shown
+    return subprocess.Popen(
+        [sys.executable, "-m", module, *args],
+        env=env,
+        stdout=None if show_logs else subprocess.DEVNULL,
+        stderr=None if show_logs else subprocess.DEVNULL,
+    )
+
+
+def _wait_until_ready(process: subprocess.Popen, url: str) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise click.ClickException(
+                f"Process exited with code {process.returncode} (see --show-server-logs), url={url}"
+            )
+        try:
+            if httpx.get(url).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise click.ClickException(
+        f"Process not ready after {SERVER_START_TIMEOUT_SECONDS}s, url={url}"
+    )
+
+
+def _stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+@click.command()
+@click.option(
+    "--scenario",
+    "scenarios",
+    type=click.Choice(list(SCENARIOS)),
+    multiple=True,
+    default=list(SCENARIOS),
+    show_default=True,
+)
+@click.option(
+    "--concurrency",
+    "concurrencies",
+    type=int,
+    multiple=True,
+    default=[1, 10, 50],
+    show_default=True,
+    help="Number of concurrent requests, every scenario is run at every concurrency",
+)
+@click.option("--num-requests", type=int, default=500, show_default=True)
+@click.option("--num-warmup-requests", type=int, default=20, show_default=True)
+@click.option(
+    "--apps-dir", type=click.Path(exists=True, path_type=Path), default="apps", show_default=True
+)
+@click.option("--num-linked-accounts", type=int, default=100, show_default=True)
+@click.option("--upstream-latency-ms", type=float, default=50.0, show_default=True)
+@click.option("--upstream-response-size", type=int, default=2048, show_default=True)
+@click.option("--embedding-latency-ms", type=float, default=0.0, show_default=True)
+@click.option("--server-port", type=int, default=8100, show_default=True)
+@click.option("--mock-upstream-port", type=int, default=8101, show_default=True)
+@click.option("--seed", type=int, default=42, show_default=True)
+@click.option("--show-server-logs", is_flag=True, help="Show the logs of the server processes")
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default="load_test_results.json",
+    show_default=True,
+)
+def main(
+    scenarios: tuple[str, ...],
+    concurrencies: tuple[int, ...],
+    num_requests: int,
+    num_warmup_requests: int,
+    apps_dir: Path,
+    num_linked_accounts: int,
+    upstream_latency_ms: float,
+    upstream_response_size: int,
+    embedding_latency_ms: float,
+    server_port: int,
+    mock_upstream_port: int,
+    seed: int,
+    show_server_logs: bool,
+    output: Path,
+) -> None:
+    """
+    Load test the search, definition, execute and listing endpoints of aci.server.main:app, with
+    the external dependencies replaced by local stand-ins (see benchmarks.stand_ins), against the
+    test-db, which is cleared and seeded with the apps catalog.
+    """
+    install_stand_ins()
+    mock_upstream_url = f"http://127.0.0.1:{mock_upstream_port}"
+    server_url = f"http://127.0.0.1:{server_port}"
+    data = _seed(apps_dir, mock_upstream_url, num_linked_accounts)
+
+    # the rate limits and quotas are still checked for every request, but must not reject any
+    env = os.environ | {
+        f"SERVER_RATE_LIMIT_{limit}": str(UNLIMITED)
+        for limit in [
+            "IP_PER_SECOND",
+            "IP_PER_DAY",
+            "API_KEY_PER_SECOND",
+            "API_KEY_PER_DAY",
+            "PROJECT_PER_SECOND",
+            "PROJECT_PER_DAY",
+        ]
+    }
+    env["SERVER_PROJECT_DAILY_QUOTA"] = str(UNLIMITED)
+
+    processes = []
+    try:
+        processes.append(
+            _start_process(
+                "benchmarks.mock_upstream",
+                [
+                    f"--port={mock_upstream_port}",
+                    f"--latency-ms={upstream_latency_ms}",
+                    f"--response-size={upstream_response_size}",
+                ],
+                env,
+                show_server_logs,
+            )
+        )
+        _wait_until_ready(processes[-1], mock_upstream_url)
+        processes.append(
+            _start_process(
+                "benchmarks.server",
+                [f"--port={server_port}", f"--embedding-latency-ms={embedding_latency_ms}"],
+                env,
+                show_server_logs,
+            )
+        )
+        _wait_until_ready(processes[-1], f"{server_url}{config.ROUTER_PREFIX_HEALTH}")
+
+        load_test = LoadTest(server_url, data, seed)
+        results = []
+        for scenario in scenarios:
+            for concurrency in concurrencies:
+                console.print(f"Running scenario={scenario}, concurrency={concurrency}...")
+                results.append(
+                    asyncio.run(
+                        load_test.run(scenario, concurrency, num_requests, num_warmup_requests)
+                    )
+                )
+    finally:
+        for process in processes:
+            _stop_process(process)
+
+    table = Table(
+        "Scenario",
+        "Concurrency",
+        "Requests/s",
+        "p50 (ms)",
+        "p95 (ms)",
+        "p99 (ms)",
+        "DB queries/request",
+        "Errors",
+        title=f"{num_requests} requests per run, {len(data.function_names)} functions",
+    )
+    for result in results:
+        table.add_row(
+            result["scenario"],
+            str(result["concurrency"]),
+            f"{result['throughput_rps']:.0f}",
+            f"{result['latency_p50_ms']:.1f}",
+            f"{result['latency_p95_ms']:.1f}",
+            f"{result['latency_p99_ms']:.1f}",
+            f"{result['db_queries_per_request']:.1f}",
+            str(result["num_errors"]),
+        )
+    console.print(table)
+
+    output.write_text(
+        json.dumps(
+            {
+                "timestamp": datetime.now(UTC).isoformat(),
+                "options": {
+                    "num_requests": num_requests,
+                    "num_warmup_requests": num_warmup_requests,
+                    "num_functions": len(data.function_names),
+                    "num_linked_accounts": num_linked_accounts,
+                    "upstream_latency_ms": upstream_latency_ms,
+                    "upstream_response_size": upstream_response_size,
+                    "embedding_latency_ms": embedding_latency_ms,
+                    "seed": seed,
+                },
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+    console.print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from collections.abc import Generator
+
+import pytest
+from _pytest.terminal import TerminalReporter
+
+from aci.common import encryption
+from benchmarks.micro import helper
+from benchmarks.stand_ins import get_local_keyring
+
+
+@pytest.fixture(scope="session")
+def catalog_functions() -> list[dict]:
+    return helper.load_catalog_functions()
+
+
+@pytest.fixture(scope="session")
+def catalog_apps() -> list[dict]:
+    return helper.load_catalog_apps()
+
+
+@pytest.fixture(scope="session")
+def local_keyring() -> Generator[None, None, None]:
+    """
+    Encrypt with the local keyring stand-in instead of KMS, so that the benchmarks of the encrypted
+    types measure the encryption itself rather than round trips to KMS.
+    """
+    kms_keyring_getter = encryption._get_kms_keyring
+    encryption._get_kms_keyring = get_local_keyring
+    yield
+    encryption._get_kms_keyring = kms_keyring_getter
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter) -> None:
+    if not helper.reports:
+        return
+
+    terminalreporter.section("cost per item and worst offenders")
+    for report in helper.reports:
+        terminalreporter.write_line(
+            f"{report.name}: {report.mean_per_item_seconds * 1e6:.1f}us per item "
+            f"({report.num_items} items)"
+        )
+        for item_name, duration in report.worst_offenders:
+            terminalreporter.write_line(f"    {duration * 1e6:10.1f}us  {item_name}")
@@ -0,0 +1,86 @@
+import json
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from pytest_benchmark.fixture import BenchmarkFixture
+
+APPS_DIR = Path(__file__).parents[2] / "apps"
+# the number of (slowest) items reported as the worst offenders of a benchmark
+NUM_WORST_OFFENDERS = 10
+# every item is timed this many times for the worst offenders, the fastest time is kept
+WORST_OFFENDER_REPEAT = 5
+
+
+@dataclass
+class CorpusBenchmarkReport:
+    name: str
+    num_items: int
+    mean_per_item_seconds: float
+    # (item name, seconds) of the slowest items
+    worst_offenders: list[tuple[str, float]]
+
+
+# the reports of the benchmarks of the session, printed in the terminal summary (see conftest)
+reports: list[CorpusBenchmarkReport] = []
+
+
+def load_catalog_functions() -> list[dict]:
+    """
+    The functions of every app in the catalog, as in the functions.json files.
+    """
+    functions: list[dict] = []
+    for functions_file in sorted(APPS_DIR.glob("*/functions.json")):
+        functions.extend(json.loads(functions_file.read_text()))
+    return functions
+
+
+def load_catalog_apps() -> list[dict]:
+    """
+    The apps of the catalog, as in the app.json files.
+    """
+    return [json.loads(app_file.read_text()) for app_file in sorted(APPS_DIR.glob("*/app.json"))]
+
+
+def run_corpus_benchmark(
+    benchmark: BenchmarkFixture,
+    func: Callable[[Any], object],
+    items: Sequence[Any],
+    item_names: Sequence[str],
+) -> None:
+    """
+    Benchmark one pass of func over every item of the corpus, and report the mean cost per item and
+    the items func is the slowest on (timed one by one, outside of the benchmark).
+    """
+
+    def run_pass() -> None:
+        for item in items:
+            func(item)
+
+    benchmark(run_pass)
+    # e.g., with --benchmark-disable, the pass is run once as a test and not timed
+    if not benchmark.enabled:
+        return
+
+    item_durations = []
+    for item, item_name in zip(items, item_names, strict=True):
+        durations = []
+        for _ in range(WORST_OFFENDER_REPEAT):
+            start_time = time.perf_counter()
+            func(item)
+            durations.append(time.perf_counter() - start_time)
+        item_durations.append((item_name, min(durations)))
+    worst_offenders = sorted(item_durations, key=lambda item_duration: -item_duration[1])[
+        :NUM_WORST_OFFENDERS
+    ]
+
+    assert benchmark.stats is not None
+    mean_per_item_seconds = benchmark.stats.stats.mean / len(items)
+    benchmark.extra_info["num_items"] = len(items)
+    benchmark.extra_info["mean_per_item_seconds"] = mean_per_item_seconds
+    benchmark.extra_info["worst_offenders"] = worst_offenders
+    reports.append(
+        CorpusBenchmarkReport(benchmark.name, len(items), mean_per_item_seconds, worst_offenders)
+    )
@@ -0,0 +1,122 @@
+import secrets
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy.dialects.postgresql.psycopg import PGDialect_psycopg
+
+from aci.common.db.custom_sql_types import (
+    EncryptedSecurityCredentials,
+    EncryptedSecurityScheme,
+    Key,
+)
+from aci.common.enums import SecurityScheme
+from benchmarks.micro.helper import run_corpus_benchmark
+
+pytestmark = pytest.mark.usefixtures("local_keyring")
+
+NUM_API_KEYS = 100
+
+dialect = PGDialect_psycopg()  # type: ignore[no-untyped-call]
+
+
+def _build_security_credentials(security_scheme: str) -> dict:
+    match security_scheme:
+        case SecurityScheme.OAUTH2:
+            return {
+                "client_id": "benchmark_client_id",
+                "client_secret": secrets.token_urlsafe(32),
+                "scope": "openid email profile",
+                "access_token": secrets.token_urlsafe(128),
+                "token_type": "Bearer",
+                "expires_at": 2_000_000_000,
+                "refresh_token": secrets.token_urlsafe(64),
+                "raw_token_response": {
+                    "access_token": secrets.token_urlsafe(128),
+                    "refresh_token": secrets.token_urlsafe(64),
+                    "expires_in": 3600,
+                    "scope": "openid email profile",
+                },
+            }
+        case SecurityScheme.API_KEY:
+            return {"secret_key": secrets.token_urlsafe(32)}
+        case _:
+            return {}
+
+
+@pytest.fixture(scope="module")
+def catalog_security_credentials(catalog_apps: list[dict]) -> list[tuple[str, dict]]:
+    """
+    (name, security credentials) of a linked account of every security scheme of every app.
+    """
+    return [
+        (f"{app['name']}.{security_scheme}", _build_security_credentials(security_scheme))
+        for app in catalog_apps
+        for security_scheme in app["security_schemes"]
+    ]
+
+
+@pytest.mark.parametrize("processor", ["bind", "result"])
+def test_key(benchmark: BenchmarkFixture, processor: str) -> None:
+    key_type = Key()
+    api_keys = [secrets.token_hex(32) for _ in range(NUM_API_KEYS)]
+    if processor == "bind":
+        run_corpus_benchmark(
+            benchmark,
+            lambda api_key: key_type.process_bind_param(api_key, dialect),
+            api_keys,
+            [f"api_key_{i}" for i in range(NUM_API_KEYS)],
+        )
+    else:
+        run_corpus_benchmark(
+            benchmark,
+            lambda encrypted_api_key: key_type.process_result_value(encrypted_api_key, dialect),
+            [key_type.process_bind_param(api_key, dialect) for api_key in api_keys],
+            [f"api_key_{i}" for i in range(NUM_API_KEYS)],
+        )
+
+
+@pytest.mark.parametrize("processor", ["bind", "result"])
+def test_encrypted_security_scheme(
+    benchmark: BenchmarkFixture, catalog_apps: list[dict], processor: str
+) -> None:
+    security_scheme_type = EncryptedSecurityScheme()
+    security_schemes = [app["security_schemes"] for app in catalog_apps]
+    if processor == "bind":
+        run_corpus_benchmark(
+            benchmark,
+            lambda value: security_scheme_type.process_bind_param(value, dialect),
+            security_schemes,
+            [app["name"] for app in catalog_apps],
+        )
+    else:
+        run_corpus_benchmark(
+            benchmark,
+            lambda value: security_scheme_type.process_result_value(value, dialect),
+            [security_scheme_type.process_bind_param(value, dialect) for value in security_schemes],
+            [app["name"] for app in catalog_apps],
+        )
+
+
+@pytest.mark.parametrize("processor", ["bind", "result"])
+def test_encrypted_security_credentials(
+    benchmark: BenchmarkFixture,
+    catalog_security_credentials: list[tuple[str, dict]],
+    processor: str,
+) -> None:
+    security_credentials_type = EncryptedSecurityCredentials()
+    names = [name for name, _ in catalog_security_credentials]
+    values = [value for _, value in catalog_security_credentials]
+    if processor == "bind":
+        run_corpus_benchmark(
+            benchmark,
+            lambda value: security_credentials_type.process_bind_param(value, dialect),
+            values,
+            names,
+        )
+    else:
+        run_corpus_benchmark(
+            benchmark,
+            lambda value: security_credentials_type.process_result_value(value, dialect),
+            [security_credentials_type.process_bind_param(value, dialect) for value in values],
+            names,
+        )
@@ -0,0 +1,103 @@
+import uuid
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from aci.common import processor, validator
+from aci.common.db.sql_models import Function
+from aci.common.enums import FunctionDefinitionFormat
+from aci.common.schemas.function import FunctionUpsert
+from aci.server.routes.functions import format_function_definition
+from benchmarks.micro.helper import run_corpus_benchmark
+
+
+def _build_input(parameters_schema: dict) -> dict:
+    """
+    The smallest input an LLM could send: an empty object for every visible object property, so
+    that the defaults of the nested required but invisible properties are injected too.
+    """
+    return {
+        name: _build_input(property_schema)
+        for name, property_schema in parameters_schema.get("properties", {}).items()
+        if name in parameters_schema.get("visible", []) and property_schema.get("type") == "object"
+    }
+
+
+def test_filter_visible_properties(
+    benchmark: BenchmarkFixture, catalog_functions: list[dict]
+) -> None:
+    run_corpus_benchmark(
+        benchmark,
+        processor.filter_visible_properties,
+        [function["parameters"] for function in catalog_functions],
+        [function["name"] for function in catalog_functions],
+    )
+
+
+def test_inject_required_but_invisible_defaults(
+    benchmark: BenchmarkFixture, catalog_functions: list[dict]
+) -> None:
+    # NOTE: the defaults are injected into a new input on every call, like into the input of every
+    # execution, so building the (small) input is part of the measured cost
+    run_corpus_benchmark(
+        benchmark,
+        lambda parameters_schema: processor.inject_required_but_invisible_defaults(
+            parameters_schema, _build_input(parameters_schema)
+        ),
+        [function["parameters"] for function in catalog_functions],
+        [function["name"] for function in catalog_functions],
+    )
+
+
+def test_remove_none_values(benchmark: BenchmarkFixture, catalog_functions: list[dict]) -> None:
+    # the parameters schemas of the catalog stand in for (deeply nested) function inputs
+    run_corpus_benchmark(
+        benchmark,
+        processor.remove_none_values,
+        [function["parameters"] for function in catalog_functions],
+        [function["name"] for function in catalog_functions],
+    )
+
+
+def test_validate_function_parameters_schema_common(
+    benchmark: BenchmarkFixture, catalog_functions: list[dict]
+) -> None:
+    run_corpus_benchmark(
+        benchmark,
+        lambda function: validator.validate_function_parameters_schema_common(
+            function["parameters"], f"{function['name']}.parameters"
+        ),
+        catalog_functions,
+        [function["name"] for function in catalog_functions],
+    )
+
+
+@pytest.mark.parametrize("format", list(FunctionDefinitionFormat))
+def test_format_function_definition(
+    benchmark: BenchmarkFixture, catalog_functions: list[dict], format: FunctionDefinitionFormat
+) -> None:
+    functions = []
+    for function in catalog_functions:
+        function_upsert = FunctionUpsert.model_validate(function)
+        functions.append(
+            Function(
+                app_id=uuid.uuid4(),
+                name=function_upsert.name,
+                description=function_upsert.description,
+                tags=function_upsert.tags,
+                visibility=function_upsert.visibility,
+                active=function_upsert.active,
+                protocol=function_upsert.protocol,
+                protocol_data=function_upsert.protocol_data.model_dump(),
+                parameters=function_upsert.parameters,
+                response=function_upsert.response,
+                embedding=[],
+            )
+        )
+
+    run_corpus_benchmark(
+        benchmark,
+        lambda function: format_function_definition(function, format),
+        functions,
+        [function.name for function in functions],
+    )
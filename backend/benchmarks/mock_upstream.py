@@ -0,0 +1,23 @@
+"""
+Runs the mock upstream server (see benchmarks.stand_ins.create_mock_upstream_app) the functions of
+the benchmark app are executed against.
+"""
+
+import click
+import uvicorn
+
+from benchmarks.stand_ins import create_mock_upstream_app
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8101, show_default=True)
+@click.option("--latency-ms", type=float, default=50.0, show_default=True)
+@click.option("--response-size", type=int, default=2048, show_default=True, help="In bytes")
+def main(host: str, port: int, latency_ms: float, response_size: int) -> None:
+    app = create_mock_upstream_app(latency_ms / 1000, response_size)
+    uvicorn.run(app, host=host, port=port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Seeds the DB with what the load tests need: the apps catalog (with the embeddings of the fake
+embedding provider), the benchmark app pointing at the mock upstream server, a project with an
+agent allowed to use every app, linked accounts of the benchmark app and a free plan.
+"""
+
+import json
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from jinja2 import StrictUndefined, Template
+from sqlalchemy.orm import Session
+
+from aci.common import embeddings
+from aci.common.db import crud
+from aci.common.embedding_providers import EmbeddingProvider
+from aci.common.enums import SecurityScheme, Visibility
+from aci.common.logging_setup import get_logger
+from aci.common.schemas.app import AppEmbeddingFields, AppUpsert
+from aci.common.schemas.app_configurations import AppConfigurationCreate
+from aci.common.schemas.function import FunctionEmbeddingFields, FunctionUpsert
+from aci.common.schemas.plans import PlanFeatures
+from aci.common.schemas.security_scheme import APIKeySchemeCredentials
+
+logger = get_logger(__name__)
+
+BENCHMARK_APP_DIR = Path(__file__).parent / "benchmark_app"
+BENCHMARK_APP_NAME = "BENCHMARK"
+# large enough to never be reached by a load test
+UNLIMITED = 1_000_000_000
+
+
+@dataclass
+class BenchmarkData:
+    api_key: str
+    app_names: list[str]
+    function_names: list[str]
+    benchmark_function_names: list[str]
+    linked_account_owner_ids: list[str]
+
+
+def seed_benchmark_data(
+    db_session: Session,
+    embedding_provider: EmbeddingProvider,
+    apps_dir: Path,
+    mock_upstream_url: str,
+    num_linked_accounts: int,
+) -> BenchmarkData:
+    app_names: list[str] = []
+    function_names: list[str] = []
+    app_files: list[tuple[Path, Path, dict[str, str]]] = [
+        (app_file, app_file.with_name("functions.json"), {})
+        for app_file in sorted(apps_dir.glob("*/app.json"))
+    ]
+    app_files.append(
+        (
+            BENCHMARK_APP_DIR / "app.json",
+            BENCHMARK_APP_DIR / "functions.json",
+            {"mock_upstream_url": mock_upstream_url},
+        )
+    )
+    for app_file, functions_file, variables in app_files:
+        app_upsert = AppUpsert.model_validate(json.loads(_render(app_file, variables)))
+        functions_upsert = [
+            FunctionUpsert.model_validate(function)
+            for function in json.loads(_render(functions_file, variables))
+        ]
+        crud.apps.create_app(
+            db_session,
+            app_upsert,
+            embeddings.generate_app_embedding(
+                AppEmbeddingFields.model_validate(app_upsert.model_dump()), embedding_provider
+            ),
+            embedding_model=embedding_provider.model_id,
+        )
+        crud.functions.create_functions(
+            db_session,
+            functions_upsert,
+            embeddings.generate_function_embeddings(
+                [
+                    FunctionEmbeddingFields.model_validate(function_upsert.model_dump())
+                    for function_upsert in functions_upsert
+                ],
+                embedding_provider,
+            ),
+            embedding_model=embedding_provider.model_id,
+        )
+        app_names.append(app_upsert.name)
+        function_names.extend(function_upsert.name for function_upsert in functions_upsert)
+    logger.info(f"Seeded apps, num_apps={len(app_names)}, num_functions={len(function_names)}")
+
+    crud.plans.create(
+        db_session,
+        name="free",
+        stripe_product_id="benchmark_product",
+        stripe_monthly_price_id="benchmark_monthly_price",
+        stripe_yearly_price_id="benchmark_yearly_price",
+        features=PlanFeatures(
+            linked_accounts=UNLIMITED,
+            api_calls_monthly=UNLIMITED,
+            agent_credentials=UNLIMITED,
+            developer_seats=UNLIMITED,
+            custom_oauth=True,
+            log_retention_days=7,
+            projects=UNLIMITED,
+        ),
+        is_public=True,
+    )
+    project = crud.projects.create_project(
+        db_session,
+        org_id=uuid.uuid4(),
+        name="Benchmark Project",
+        visibility_access=Visibility.PUBLIC,
+    )
+    agent = crud.projects.create_agent(
+        db_session,
+        project.id,
+        name="Benchmark Agent",
+        description="Agent of the load tests",
+        allowed_apps=app_names,
+        custom_instructions={},
+    )
+    crud.app_configurations.create_app_configuration(
+        db_session,
+        project.id,
+        AppConfigurationCreate(app_name=BENCHMARK_APP_NAME, security_scheme=SecurityScheme.API_KEY),
+    )
+    linked_account_owner_ids = [f"benchmark_user_{i}" for i in range(num_linked_accounts)]
+    for linked_account_owner_id in linked_account_owner_ids:
+        crud.linked_accounts.create_linked_account(
+            db_session,
+            project.id,
+            BENCHMARK_APP_NAME,
+            linked_account_owner_id,
+            SecurityScheme.API_KEY,
+            APIKeySchemeCredentials(secret_key=f"{linked_account_owner_id}_secret_key"),
+            enabled=True,
+        )
+    db_session.commit()
+
+    return BenchmarkData(
+        api_key=agent.api_keys[0].key,
+        app_names=app_names,
+        function_names=function_names,
+        benchmark_function_names=[
+            name for name in function_names if name.startswith(f"{BENCHMARK_APP_NAME}__")
+        ],
+        linked_account_owner_ids=linked_account_owner_ids,
+    )
+
+
+def _render(template_file: Path, variables: dict[str, str]) -> str:
+    # NOTE: the app files of the catalog may contain (unrendered) secret placeholders, which are
+    # kept as they are, only the files of the benchmark app are rendered
+    if not variables:
+        return template_file.read_text()
+    rendered: str = Template(template_file.read_text(), undefined=StrictUndefined).render(variables)
+    return rendered
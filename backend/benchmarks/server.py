@@ -0,0 +1,62 @@
+"""
+Runs aci.server.main:app with the local stand-ins installed, in a process of its own, so that the
+load generator doesn't compete with the server for the event loop (or the GIL).
+
+The number of SQL statements executed by the server is exposed on DB_QUERY_COUNT_PATH, so that the
+load test can report the DB queries per request.
+"""
+
+import threading
+from typing import Any
+
+import click
+import uvicorn
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from benchmarks.stand_ins import install_stand_ins
+
+DB_QUERY_COUNT_PATH = "/benchmark/db-query-count"
+
+
+class DBQueryCounter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def before_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        # NOTE: the sync routes and dependencies run in the threadpool
+        with self._lock:
+            self.count += 1
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8100, show_default=True)
+@click.option("--embedding-latency-ms", type=float, default=0.0, show_default=True)
+def main(host: str, port: int, embedding_latency_ms: float) -> None:
+    install_stand_ins(embedding_latency_seconds=embedding_latency_ms / 1000)
+
+    db_query_counter = DBQueryCounter()
+    # NOTE: listening on the Engine class counts the statements of every engine of the process
+    event.listen(Engine, "before_cursor_execute", db_query_counter.before_cursor_execute)
+
+    from aci.server.main import app
+
+    @app.get(DB_QUERY_COUNT_PATH, tags=["benchmark"], include_in_schema=False)
+    async def get_db_query_count() -> dict:
+        return {"count": db_query_counter.count}
+
+    uvicorn.run(app, host=host, port=port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Local stand-ins for the external dependencies of the server, so that load tests measure the server
+(and the DB) rather than KMS, the embedding API or the upstream APIs of the functions:
+
+- a raw AES keyring with a fixed key instead of the AWS KMS keyring
+- an embedding provider returning deterministic pseudo-random embeddings
+- a mock upstream HTTP server the functions of the benchmark app are executed against
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import time
+from functools import cache
+from typing import TYPE_CHECKING
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from aci.common import encryption
+from aci.common.db.sql_models import EMBEDDING_DIMENSION
+from aci.common.embedding_providers import EmbeddingProvider
+from aci.common.enums import EmbeddingProviderType
+from aci.server import utils as server_utils
+
+if TYPE_CHECKING:
+    from aws_cryptographic_material_providers.mpl.references import IKeyring  # type: ignore
+
+# NOTE: only for local benchmarks, the data encrypted with it is not secret
+LOCAL_KEYRING_WRAPPING_KEY = bytes(32)
+FAKE_EMBEDDING_MODEL = "benchmark-fake"
+
+
+@cache
+def get_local_keyring() -> "IKeyring":
+    from aws_cryptographic_material_providers.mpl import (  # type: ignore
+        AwsCryptographicMaterialProviders,
+    )
+    from aws_cryptographic_material_providers.mpl.config import (  # type: ignore
+        MaterialProvidersConfig,
+    )
+    from aws_cryptographic_material_providers.mpl.models import (  # type: ignore
+        AesWrappingAlg,
+        CreateRawAesKeyringInput,
+    )
+
+    mat_prov = AwsCryptographicMaterialProviders(config=MaterialProvidersConfig())
+    keyring: IKeyring = mat_prov.create_raw_aes_keyring(
+        input=CreateRawAesKeyringInput(
+            key_namespace="aci-benchmarks",
+            key_name="local",
+            wrapping_key=LOCAL_KEYRING_WRAPPING_KEY,
+            wrapping_alg=AesWrappingAlg.ALG_AES256_GCM_IV12_TAG16,
+        )
+    )
+    return keyring
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    """
+    Returns a pseudo-random unit vector seeded by the text, so the same text always gets the same
+    embedding. Optionally sleeps for latency_seconds per call, like a round trip to an embedding API.
+    """
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION, latency_seconds: float = 0.0):
+        super().__init__(FAKE_EMBEDDING_MODEL, dimension)
+        self.latency_seconds = latency_seconds
+
+    @property
+    def provider_type(self) -> EmbeddingProviderType:
+        return EmbeddingProviderType.LOCAL
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return [self._embed_text(text) for text in texts]
+
+    def _embed_text(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+        rng = random.Random(seed)
+        vector = [rng.gauss(0, 1) for _ in range(self.dimension)]
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector]
+
+
+def install_stand_ins(embedding_latency_seconds: float = 0.0) -> None:
+    """
+    Replace the KMS keyring and the embedding provider of the current process with the stand-ins.
+    Must be called by every process that encrypts or decrypts credentials (i.e., the seeding and
+    the server), as data encrypted with the local keyring can only be decrypted with it.
+    """
+    # NOTE: the functions are looked up as module attributes on every call, patching them is enough
+    encryption._get_kms_keyring = get_local_keyring
+    embedding_provider = FakeEmbeddingProvider(latency_seconds=embedding_latency_seconds)
+    server_utils.get_embedding_provider = lambda: embedding_provider  # type: ignore[assignment]
+
+
+def create_mock_upstream_app(latency_seconds: float, response_size: int) -> Starlette:
+    """
+    An upstream API that answers every request with a JSON object of about response_size bytes
+    after latency_seconds.
+    """
+    # the "items" of the response are 100 byte strings
+    payload = {"items": ["x" * 98] * max(response_size // 100, 1)}
+
+    async def handle(request: Request) -> JSONResponse:
+        await asyncio.sleep(latency_seconds)
+        return JSONResponse(payload)
+
+    return Starlette(
+        routes=[Route("/{path:path}", handle, methods=["GET", "POST", "PUT", "PATCH", "DELETE"])]
+    )
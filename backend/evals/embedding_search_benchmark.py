@@ -0,0 +1,164 @@
+import logging
+import random
+import statistics
+import time
+
+import click
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from aci.common import utils
+from aci.common.db import crud
+from aci.common.db.sql_models import Function
+from aci.common.enums import EmbeddingSearchMode
+from aci.server import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+console = Console()
+
+# the quantized indexes of the approximate search modes, see the
+# add_quantized_embedding_indexes migration
+INDEX_NAMES = {
+    EmbeddingSearchMode.HALFVEC: "ix_functions_embedding_halfvec",
+    EmbeddingSearchMode.BINARY: "ix_functions_embedding_binary",
+}
+
+
+class EmbeddingSearchBenchmark:
+    """
+    Benchmarks the function search of every embedding search mode against the functions in the DB.
+
+    The queries are the embeddings of randomly sampled functions with gaussian noise added, so that
+    they are close to but not exactly at a stored embedding (like the embedding of an intent). The
+    exact search results are the ground truth for recall@k.
+    """
+
+    def __init__(self, db_session: Session, k: int, noise: float, seed: int):
+        self.db_session = db_session
+        self.k = k
+        self.noise = noise
+        self.random = random.Random(seed)
+
+    def _sample_queries(self, num_queries: int) -> list[list[float]]:
+        # NOTE: setseed makes the sample reproducible for the same seed and catalog
+        self.db_session.execute(select(func.setseed(self.random.random())))
+        embeddings = self.db_session.execute(
+            select(Function.embedding).order_by(func.random()).limit(num_queries)
+        ).scalars()
+        return [
+            [value + self.random.gauss(0, self.noise) for value in embedding]
+            for embedding in embeddings
+        ]
+
+    def _search(
+        self, query: list[float], embedding_search_mode: EmbeddingSearchMode
+    ) -> tuple[list[str], float]:
+        start_time = time.perf_counter()
+        functions = crud.functions.search_functions(
+            self.db_session,
+            False,
+            True,
+            None,
+            None,
+            query,
+            self.k,
+            0,
+            embedding_search_mode=embedding_search_mode,
+        )
+        latency = time.perf_counter() - start_time
+        # NOTE: roll back the hnsw.ef_search set for the transaction
+        self.db_session.rollback()
+        return [function.name for function in functions], latency
+
+    def _get_index_size(self, index_name: str) -> int | None:
+        size: int | None = self.db_session.execute(
+            text("SELECT pg_relation_size(to_regclass(:index_name))"), {"index_name": index_name}
+        ).scalar_one()
+        return size
+
+    def run(
+        self, num_queries: int, embedding_search_modes: list[EmbeddingSearchMode]
+    ) -> list[dict]:
+        queries = self._sample_queries(num_queries)
+        if not queries:
+            raise click.ClickException("No functions in the DB to benchmark with")
+        exact_results = [self._search(query, EmbeddingSearchMode.EXACT)[0] for query in queries]
+
+        results = []
+        for embedding_search_mode in embedding_search_modes:
+            recalls = []
+            latencies = []
+            for query, exact_result in zip(queries, exact_results, strict=True):
+                result, latency = self._search(query, embedding_search_mode)
+                recalls.append(len(set(result) & set(exact_result)) / max(len(exact_result), 1))
+                latencies.append(latency)
+
+            index_name = INDEX_NAMES.get(embedding_search_mode)
+            results.append(
+                {
+                    "mode": embedding_search_mode,
+                    "recall_at_k": statistics.mean(recalls),
+                    "latency_p50_ms": statistics.median(latencies) * 1000,
+                    "latency_p95_ms": utils.percentile(latencies, 95) * 1000,
+                    "index_size_bytes": self._get_index_size(index_name) if index_name else None,
+                }
+            )
+
+        return results
+
+
+@click.command()
+@click.option("--num-queries", type=int, default=200, show_default=True)
+@click.option("--k", type=int, default=10, show_default=True, help="Number of results per query")
+@click.option(
+    "--noise",
+    type=float,
+    default=0.02,
+    show_default=True,
+    help="Standard deviation of the gaussian noise added to the sampled embeddings",
+)
+@click.option("--seed", type=int, default=42, show_default=True)
+@click.option(
+    "--mode",
+    "modes",
+    type=click.Choice([mode.value for mode in EmbeddingSearchMode]),
+    multiple=True,
+    help="Embedding search modes to benchmark, defaults to all",
+)
+def main(num_queries: int, k: int, noise: float, seed: int, modes: tuple[str, ...]) -> None:
+    """
+    Report recall@k, latency and index size of every embedding search mode.
+    The approximate modes require the quantized indexes and iterative index scans (pgvector >= 0.8.0).
+    """
+    with utils.create_db_session(config.DB_FULL_URL) as db_session:
+        benchmark = EmbeddingSearchBenchmark(db_session, k, noise, seed)
+        results = benchmark.run(
+            num_queries, [EmbeddingSearchMode(mode) for mode in modes or EmbeddingSearchMode]
+        )
+        table_size = db_session.execute(text("SELECT pg_table_size('functions')")).scalar_one()
+
+    table = Table(
+        "Mode",
+        f"Recall@{k}",
+        "p50 (ms)",
+        "p95 (ms)",
+        "Index size",
+        title=f"Function search, {num_queries} queries, functions table size={table_size} bytes",
+    )
+    for result in results:
+        table.add_row(
+            result["mode"],
+            f"{result['recall_at_k']:.3f}",
+            f"{result['latency_p50_ms']:.2f}",
+            f"{result['latency_p95_ms']:.2f}",
+            str(result["index_size_bytes"]) if result["index_size_bytes"] is not None else "-",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,13 @@ import click
 import pandas as pd
 import wandb
 
-from evals.search_evaluator import SearchEvaluator
+from aci.common.enums import EmbeddingSearchMode
+from evals.search_evaluator import (
+    DEFAULT_CONCURRENCY,
+    LATENCY_PERCENTILES,
+    InProcessSearchEvaluator,
+    SearchEvaluator,
+)
 from evals.synthetic_intent_generator import SyntheticIntentGenerator
 
 logging.basicConfig(level=logging.INFO)
@@ -28,8 +34,7 @@ class EvaluationPipeline:
 
     def __init__(
         self,
-        search_server_url: str,
-        search_api_key: str,
+        evaluator: SearchEvaluator,
         openai_api_key: str,
         wandb_token: str,
         model: str = "gpt-4o-mini",
@@ -39,8 +44,7 @@ class EvaluationPipeline:
         Initialize the pipeline with configuration.
 
         Args:
-            search_server_url: Base URL of the search API
-            search_api_key: API key for search API
+            evaluator: Evaluator of the search (through the search API or in process)
             openai_api_key: OpenAI API key
             wandb_token: Weights & Biases API token
             model: OpenAI model to use for generation
@@ -56,10 +60,7 @@ class EvaluationPipeline:
             prompt_type=prompt_type,
             openai_api_key=openai_api_key,
         )
-        self.evaluator = SearchEvaluator(
-            api_url=search_server_url,
-            api_key=search_api_key,
-        )
+        self.evaluator = evaluator
 
     def _load_dataset_from_wandb(self, artifact_name: str, dataset_filename: str) -> pd.DataFrame:
         """
@@ -141,6 +142,14 @@ class EvaluationPipeline:
         logger.info(f"MRR: {metrics['mrr']:.3f}")
         logger.info(f"Top-K Accuracy: {metrics['top_k_accuracy']}")
         logger.info(f"Average Response Time: {metrics['avg_response_time']:.2f}s")
+        logger.info(
+            "Response Time Percentiles: "
+            + ", ".join(
+                f"p{percentile}={metrics[f'p{percentile}_response_time']:.2f}s"
+                for percentile in LATENCY_PERCENTILES
+            )
+        )
+        logger.info(f"Errors: {metrics['errors']}")
         logger.info(f"Total Samples: {metrics['total_samples']}")
         logger.info(f"Correct Predictions: {metrics['correct_predictions']}")
 
@@ -182,6 +191,9 @@ class EvaluationPipeline:
                 "evaluation_samples": evaluation_samples,
                 "dataset_artifact": dataset_artifact,
                 "dataset_filename": dataset_filename,
+                "search_concurrency": self.evaluator.concurrency,
+                "search_in_process": isinstance(self.evaluator, InProcessSearchEvaluator),
+                "embedding_search_mode": getattr(self.evaluator, "embedding_search_mode", None),
             },
         )
 
@@ -228,12 +240,33 @@ class EvaluationPipeline:
 )
 @click.option("--generation-limit", type=int, help="Limit number of samples to generate")
 @click.option("--evaluation-samples", type=int, help="Limit number of samples to evaluate")
+@click.option(
+    "--concurrency",
+    type=int,
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    help="Maximum number of searches in flight at a time",
+)
+@click.option(
+    "--in-process",
+    is_flag=True,
+    help="Search in process against the DB of the server config (SERVER_DB_*), "
+    "instead of through the search API",
+)
+@click.option(
+    "--embedding-search-mode",
+    type=click.Choice(list(EmbeddingSearchMode)),
+    help="Embedding search mode of the in process search (default: SERVER_EMBEDDING_SEARCH_MODE)",
+)
 def main(
     mode: str,
     dataset_artifact: str,
     generation_limit: int | None,
     evaluation_samples: int | None,
     dataset_filename: str,
+    concurrency: int,
+    in_process: bool,
+    embedding_search_mode: str | None,
 ) -> None:
     """Main entry point for the evaluation pipeline."""
     # Get API keys from environment
@@ -242,15 +275,39 @@ def main(
     openai_api_key = os.getenv("EVALS_OPENAI_KEY")
     wandb_token = os.getenv("EVALS_WANDB_KEY")
 
-    if not all([search_server_url, search_api_key, openai_api_key, wandb_token]):
+    if not all([openai_api_key, wandb_token]):
         raise click.ClickException(
-            "EVALS_SERVER_URL, EVALS_ACI_API_KEY, EVALS_OPENAI_KEY, and EVALS_WANDB_KEY must be set in environment"
+            "EVALS_OPENAI_KEY and EVALS_WANDB_KEY must be set in environment"
+        )
+
+    evaluator: SearchEvaluator
+    if in_process:
+        # NOTE: imported here, the server config requires the SERVER_* environment variables
+        from aci.server import config
+        from aci.server.utils import get_embedding_provider
+
+        evaluator = InProcessSearchEvaluator(
+            db_url=config.DB_FULL_URL,
+            embedding_provider=get_embedding_provider(),
+            embedding_search_mode=EmbeddingSearchMode(
+                embedding_search_mode or config.EMBEDDING_SEARCH_MODE
+            ),
+            concurrency=concurrency,
+        )
+    else:
+        if not all([search_server_url, search_api_key]):
+            raise click.ClickException(
+                "EVALS_SERVER_URL and EVALS_ACI_API_KEY must be set in environment"
+            )
+        evaluator = SearchEvaluator(
+            api_url=str(search_server_url),
+            api_key=str(search_api_key),
+            concurrency=concurrency,
         )
 
     # Create pipeline
     pipeline = EvaluationPipeline(
-        search_server_url=str(search_server_url),
-        search_api_key=str(search_api_key),
+        evaluator=evaluator,
         openai_api_key=str(openai_api_key),
         wandb_token=str(wandb_token),
     )
@@ -0,0 +1,81 @@
+import functools
+import json
+import timeit
+from typing import Any
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from aci.server import config
+from aci.server.bounded_json import dumps_bounded
+
+console = Console()
+
+
+def _dumps_and_truncate(value: Any, max_size: int) -> str:
+    """
+    How log fields were encoded before the bounded encoder: the full JSON text is encoded, only
+    to be truncated.
+    """
+    data = json.dumps(value, default=str)
+    data_size = len(data.encode("utf-8"))
+    if data_size > max_size:
+        return (
+            data.encode("utf-8")[: max_size - 100].decode("utf-8", errors="replace")
+            + f"... [truncated, size={data_size}]"
+        )
+    return data
+
+
+def _create_payloads(scale: int) -> dict[str, Any]:
+    """
+    Payloads shaped like function execution results, from a typical small response up to
+    multi-megabyte upstream responses.
+    """
+    return {
+        "small object": {"id": 1, "name": "Alice", "email": "alice@example.com", "tags": ["a"]},
+        "1k records": [
+            {"id": i, "subject": f"Email {i}", "snippet": "Lorem ipsum " * 5}
+            for i in range(1_000 * scale)
+        ],
+        "100k records": [
+            {"id": i, "subject": f"Email {i}", "snippet": "Lorem ipsum " * 5}
+            for i in range(100_000 * scale)
+        ],
+        "10MB string": {"content": "x" * (10_000_000 * scale)},
+    }
+
+
+@click.command()
+@click.option("--repeat", type=int, default=20, show_default=True)
+@click.option("--scale", type=int, default=1, show_default=True, help="Multiplier of the sizes")
+def main(repeat: int, scale: int) -> None:
+    """
+    Compare the time to encode log fields of various sizes with the bounded JSON encoder against
+    json.dumps followed by truncation, at MAX_LOG_FIELD_SIZE.
+    """
+    table = Table(
+        "Payload",
+        "JSON size",
+        "json.dumps + truncate (ms)",
+        "dumps_bounded (ms)",
+        title=f"Log field encoding, max size={config.MAX_LOG_FIELD_SIZE} bytes, best of {repeat}",
+    )
+    for name, payload in _create_payloads(scale).items():
+        row = [name, f"{len(json.dumps(payload))} bytes"]
+        for encode in [_dumps_and_truncate, dumps_bounded]:
+            seconds = min(
+                timeit.repeat(
+                    functools.partial(encode, payload, config.MAX_LOG_FIELD_SIZE),
+                    number=1,
+                    repeat=repeat,
+                )
+            )
+            row.append(f"{seconds * 1000:.3f}")
+        table.add_row(*row)
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+import click
+import httpx
+from fastapi import FastAPI
+from rich.console import Console
+from rich.table import Table
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp
+
+from aci.server import config
+from aci.server.middleware.admission import AdmissionMiddleware
+from aci.server.middleware.interceptor import InterceptorMiddleware
+
+console = Console()
+
+
+class BaseHTTPMiddlewareWrapper(BaseHTTPMiddleware):
+    """
+    A pass-through BaseHTTPMiddleware around a middleware, which adds the task and stream wrapping
+    of BaseHTTPMiddleware that the middlewares had before they were rewritten as pure ASGI.
+    """
+
+    def __init__(self, app: ASGIApp, wrapped: Callable[[ASGIApp], ASGIApp]) -> None:
+        super().__init__(wrapped(app))
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        return await call_next(request)
+
+
+def _create_app(implementation: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/noop")
+    async def noop() -> dict:
+        return {}
+
+    # same order as in aci.server.main, the admission stage is the outer middleware
+    if implementation == "asgi":
+        app.add_middleware(InterceptorMiddleware)
+        app.add_middleware(AdmissionMiddleware)
+    elif implementation == "base-http":
+        app.add_middleware(BaseHTTPMiddlewareWrapper, wrapped=InterceptorMiddleware)
+        app.add_middleware(BaseHTTPMiddlewareWrapper, wrapped=AdmissionMiddleware)
+    return app
+
+
+async def _measure_throughput(app: FastAPI, num_requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # warm up
+        await client.get("/noop")
+
+        async def worker(num_worker_requests: int) -> None:
+            for _ in range(num_worker_requests):
+                response = await client.get("/noop")
+                response.raise_for_status()
+
+        start_time = time.perf_counter()
+        await asyncio.gather(
+            *(
+                worker(num_requests // concurrency + (i < num_requests % concurrency))
+                for i in range(concurrency)
+            )
+        )
+        return num_requests / (time.perf_counter() - start_time)
+
+
+@click.command()
+@click.option("--num-requests", type=int, default=5000, show_default=True)
+@click.option("--concurrency", type=int, default=20, show_default=True)
+@click.option(
+    "--log-requests",
+    is_flag=True,
+    help="Keep the request and response logs of the interceptor (disabled to measure overhead)",
+)
+def main(num_requests: int, concurrency: int, log_requests: bool) -> None:
+    """
+    Compare the throughput of a no-op route through the pure ASGI admission and interceptor
+    middlewares against the same middlewares wrapped in BaseHTTPMiddleware, in process.
+    """
+    # the rate limits are still checked for every request, but must not reject any of them
+    config.RATE_LIMIT_IP_PER_SECOND = config.RATE_LIMIT_IP_PER_DAY = num_requests * 10
+    if not log_requests:
+        logging.getLogger("aci").setLevel(logging.WARNING)
+
+    table = Table(
+        "Implementation",
+        "Requests/s",
+        title=f"No-op route, {num_requests} requests, concurrency={concurrency}",
+    )
+    for implementation in ["none", "base-http", "asgi"]:
+        throughput = asyncio.run(
+            _measure_throughput(_create_app(implementation), num_requests, concurrency)
+        )
+        table.add_row(implementation, f"{throughput:.0f}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+import asyncio
 import logging
+import statistics
 import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 import httpx
@@ -7,12 +11,20 @@ import pandas as pd
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+from aci.common import utils
+from aci.common.db import crud
+from aci.common.embedding_providers import EmbeddingProvider
+from aci.common.enums import EmbeddingSearchMode
+
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_CONCURRENCY = 10
+LATENCY_PERCENTILES = (50, 90, 99)
+
 
 class SearchEvaluator:
     """
@@ -20,46 +32,81 @@ class SearchEvaluator:
 
     This evaluator:
     1. Takes a dataset of synthetic intents and their expected function matches
-    2. Sends each intent to the search API
-    3. Calculates various metrics including accuracy, MRR, and response time
+    2. Sends the intents to the search API, up to `concurrency` at a time over a shared client
+    3. Calculates various metrics including accuracy, MRR, and the response time distribution
     4. Tracks incorrect results for analysis
     """
 
-    def __init__(self, api_url: str, api_key: str):
+    def __init__(self, api_url: str, api_key: str, concurrency: int = DEFAULT_CONCURRENCY):
         """
         Initialize the evaluator with API configuration.
 
         Args:
             api_url: Base URL of the search API
             api_key: API key for authentication
+            concurrency: Maximum number of searches in flight at a time
         """
         self.api_url = api_url
         self.headers = {"X-API-KEY": api_key}
+        self.concurrency = concurrency
+        self._client: httpx.AsyncClient | None = None
+
+    @asynccontextmanager
+    async def _open(self) -> AsyncIterator[None]:
+        """
+        Open the client shared by the searches of an evaluation.
+        """
+        limits = httpx.Limits(
+            max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+        )
+        async with httpx.AsyncClient(headers=self.headers, limits=limits) as client:
+            self._client = client
+            try:
+                yield
+            finally:
+                self._client = None
 
-    def _search(self, intent: str, limit: int = 5) -> tuple[list[dict[str, Any]], float]:
+    async def _search(self, intent: str, limit: int = 5) -> list[dict[str, Any]]:
         """
-        Send a search request to the API and measure response time.
+        Send a search request to the API.
 
         Args:
             intent: The search query/intent
             limit: Maximum number of results to return
 
         Returns:
-            Tuple of (search results, response time in seconds)
-        """
-        try:
-            start_time = time.time()
-            with httpx.Client() as client:
-                response = client.get(
-                    f"{self.api_url}/v1/functions/search",
-                    params={"intent": intent, "limit": str(limit), "format": "basic"},
-                    headers=self.headers,
-                )
-            response.raise_for_status()
-            return response.json(), time.time() - start_time
-        except httpx.HTTPError as e:
-            logger.error(f"Error searching functions: {e}")
-            return [], 0.0
+            Search results (name and description of the functions)
+        """
+        assert self._client is not None, "the client is only available during an evaluation"
+        response = await self._client.get(
+            f"{self.api_url}/v1/functions/search",
+            params={"intent": intent, "limit": str(limit), "format": "basic"},
+        )
+        response.raise_for_status()
+        results: list[dict[str, Any]] = response.json()
+        return results
+
+    async def _timed_search(
+        self, intent: str, semaphore: asyncio.Semaphore
+    ) -> tuple[list[dict[str, Any]], float | None]:
+        """
+        Search for an intent and measure the response time.
+
+        Args:
+            intent: The search query/intent
+            semaphore: Semaphore bounding the number of searches in flight
+
+        Returns:
+            Tuple of (search results, response time in seconds or None if the search failed)
+        """
+        async with semaphore:
+            try:
+                start_time = time.perf_counter()
+                results = await self._search(intent)
+                return results, time.perf_counter() - start_time
+            except Exception as e:
+                logger.error(f"Error searching functions: {e}")
+                return [], None
 
     def _find_rank(self, results: list[dict[str, Any]], expected: str) -> int | None:
         """
@@ -79,7 +126,7 @@ class SearchEvaluator:
         )
 
     def _update_metrics(
-        self, metrics: dict[str, Any], rank: int | None, response_time: float
+        self, metrics: dict[str, Any], rank: int | None, response_time: float | None
     ) -> None:
         """
         Update running metrics with results from a single evaluation.
@@ -87,9 +134,12 @@ class SearchEvaluator:
         Args:
             metrics: Dictionary of running metrics to update
             rank: Rank of the expected function (1-based) or None
-            response_time: Response time in seconds
+            response_time: Response time in seconds, or None if the search failed
         """
-        metrics["response_time"] += response_time
+        if response_time is None:
+            metrics["errors"] += 1
+        else:
+            metrics["response_times"].append(response_time)
         if rank:
             metrics["mrr"] += 1.0 / rank
             for k in metrics["top_k"]:
@@ -110,21 +160,28 @@ class SearchEvaluator:
         Returns:
             Dictionary of final metrics
         """
+        response_times: list[float] = metrics["response_times"]
         return {
             "accuracy": metrics["top_k"][1] / num_samples,
             "mrr": metrics["mrr"] / num_samples,
             "top_k_accuracy": {k: v / num_samples for k, v in metrics["top_k"].items()},
-            "avg_response_time": metrics["response_time"] / num_samples,
+            "avg_response_time": statistics.mean(response_times) if response_times else 0.0,
+            **{
+                f"p{percentile}_response_time": utils.percentile(response_times, percentile)
+                for percentile in LATENCY_PERCENTILES
+            },
             "total_samples": num_samples,
+            "errors": metrics["errors"],
             "correct_predictions": metrics["top_k"][1],
             "incorrect_results": incorrect_results,
         }
 
-    def evaluate_dataset(
+    async def evaluate_dataset_async(
         self, dataset: pd.DataFrame, num_samples: int | None = None
     ) -> dict[str, Any]:
         """
-        Evaluate search performance on a dataset of synthetic intents.
+        Evaluate search performance on a dataset of synthetic intents, searching for up to
+        `concurrency` intents at a time.
 
         Args:
             dataset: DataFrame containing synthetic intents and expected functions
@@ -135,20 +192,27 @@ class SearchEvaluator:
         """
         if num_samples is None:
             num_samples = len(dataset)
+        rows = [row for _, row in dataset.head(num_samples).iterrows()]
 
         # Initialize metrics
-        metrics = {"correct": 0, "mrr": 0.0, "response_time": 0.0, "top_k": {1: 0, 3: 0, 5: 0}}
+        metrics = {"mrr": 0.0, "errors": 0, "response_times": [], "top_k": {1: 0, 3: 0, 5: 0}}
         incorrect_results = []
 
-        # Evaluate each sample
-        for _, row in tqdm(
-            dataset.head(num_samples).iterrows(),
-            desc="Evaluating intents",
-            total=num_samples,
-        ):
-            # Get search results
-            results, response_time = self._search(row["synthetic_output"])
+        # Search for every intent, the results are kept in the order of the dataset
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._open():
+            with tqdm(desc="Evaluating intents", total=len(rows)) as progress_bar:
 
+                async def search(intent: str) -> tuple[list[dict[str, Any]], float | None]:
+                    result = await self._timed_search(intent, semaphore)
+                    progress_bar.update()
+                    return result
+
+                search_results = await asyncio.gather(
+                    *(search(row["synthetic_output"]) for row in rows)
+                )
+
+        for row, (results, response_time) in zip(rows, search_results, strict=True):
             # Process results
             found = False
             results = [
@@ -175,3 +239,82 @@ class SearchEvaluator:
                 )
 
         return self._calculate_final_metrics(metrics, num_samples, incorrect_results)
+
+    def evaluate_dataset(
+        self, dataset: pd.DataFrame, num_samples: int | None = None
+    ) -> dict[str, Any]:
+        """
+        Evaluate search performance on a dataset of synthetic intents (see evaluate_dataset_async).
+
+        Args:
+            dataset: DataFrame containing synthetic intents and expected functions
+            num_samples: Number of samples to evaluate (default: all)
+
+        Returns:
+            Dictionary containing evaluation metrics
+        """
+        return asyncio.run(self.evaluate_dataset_async(dataset, num_samples))
+
+
+class InProcessSearchEvaluator(SearchEvaluator):
+    """
+    Evaluates function search in process: embeds the intents and calls
+    crud.functions.search_functions directly against a (local) DB, without a server in between,
+    so that changes to the indexes, the embedding search mode or the embedding model can be
+    A/B tested quickly.
+
+    Functions are searched like the search API does for a public project without app filters
+    (public and active functions of all apps). The response time includes the intent embedding.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        embedding_provider: EmbeddingProvider,
+        embedding_search_mode: EmbeddingSearchMode,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        """
+        Initialize the evaluator with the DB and search configuration.
+
+        Args:
+            db_url: URL of the DB to search
+            embedding_provider: Embedding provider the intents are embedded with
+            embedding_search_mode: Embedding search mode of the search
+            concurrency: Maximum number of searches in flight at a time (each in a thread of its
+                own, with a DB session of its own)
+        """
+        super().__init__(api_url="", api_key="", concurrency=concurrency)
+        self.db_url = db_url
+        self.embedding_provider = embedding_provider
+        self.embedding_search_mode = embedding_search_mode
+
+    @asynccontextmanager
+    async def _open(self) -> AsyncIterator[None]:
+        # nothing to open, every search opens a DB session of its own
+        yield
+
+    async def _search(self, intent: str, limit: int = 5) -> list[dict[str, Any]]:
+        # NOTE: the embedding and the DB calls are blocking, and a DB session can't be shared
+        # between threads, so every search runs in a thread with a session of its own
+        return await asyncio.to_thread(self._search_sync, intent, limit)
+
+    def _search_sync(self, intent: str, limit: int) -> list[dict[str, Any]]:
+        intent_embedding = self.embedding_provider.embed([intent])[0]
+        with utils.create_db_session(self.db_url) as db_session:
+            functions = crud.functions.search_functions(
+                db_session,
+                True,
+                True,
+                None,
+                None,
+                intent_embedding,
+                limit,
+                0,
+                embedding_model=self.embedding_provider.model_id,
+                embedding_search_mode=self.embedding_search_mode,
+            )
+            return [
+                {"name": function.name, "description": function.description}
+                for function in functions
+            ]